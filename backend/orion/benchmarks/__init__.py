@@ -0,0 +1,3 @@
+"""
+ORION Benchmarks - Synthetic corpora and stage timings for the clustering pipeline
+"""
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+ORION Normalization Parity - Batch text normalisation vs preprocess_text
+
+prepare_texts normalises forces in batches (text_normalization.py). This script
+checks that the output matches OrionPreprocessor.preprocess_text applied force
+by force, byte for byte, and times both paths.
+
+Key Features:
+- Synthetic corpus plus edge cases: Unicode whitespace and case mappings,
+  NUL bytes, punctuation inside tokens, empty and missing fields
+- Per-path wall time and speed-up
+- Exit status 1 and the first differing forces on any mismatch
+
+Usage:
+    python normalization_parity.py --n-forces 100000
+    python normalization_parity.py --input forces.ndjson
+"""
+
+import os
+import sys
+import time
+import argparse
+import logging
+from typing import Any, Dict, List
+
+# Add the pipeline directory to the Python path to import its modules
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BENCHMARK_DIR)
+sys.path.insert(0, os.path.dirname(BENCHMARK_DIR))
+
+from synthetic_corpus import generate_corpus
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Texts where the vectorised path could plausibly diverge from the regex
+EDGE_CASES = [
+    "",
+    "   ",
+    "The AND the and",
+    "don't won't it's o'clock",
+    "snake_case kebab-case dot.separated",
+    "tab\tseparated\nnew\rline\x0bvertical\x0cfeed",
+    "unit\x1fseparator\x1crecord\x1dgroup\x1efile",
+    "non breaking em　ideographic line\x85next",
+    "Café naïve über Ångström",
+    "Kelvin İstanbul ſpecial ﬁle straße",
+    "ΣΟΦΙΑ МОСКВА 東京 \U0001f680rocket",
+    "nul\x00inside\x00tokens and \x00 alone",
+    "ab cd efg 12 123 a1b2",
+    "themselves yourselves THEMSELVES themselvesx",
+    "x" * 5000,
+]
+
+
+def edge_case_forces() -> List[Dict[str, Any]]:
+    """Forces built from EDGE_CASES, in every field and with missing fields."""
+    forces = [{"id": f"edge_{i}", "title": text, "text": text, "tags": text} for i, text in enumerate(EDGE_CASES)]
+    forces += [
+        {"id": "edge_missing"},
+        {"id": "edge_none", "title": None, "text": None, "tags": None},
+        {"id": "edge_numbers", "title": 2030, "text": 4.5, "tags": ["ai", "Energy Transition"]},
+    ]
+    return forces
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ORION Normalization Parity")
+    parser.add_argument("--input", default=None,
+                       help="Forces file (JSON/NDJSON) instead of the synthetic corpus")
+    parser.add_argument("--n-forces", type=int, default=100000,
+                       help="Synthetic corpus size")
+    parser.add_argument("--seed", type=int, default=0,
+                       help="Synthetic corpus seed")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    from orion_preprocessing import OrionPreprocessor
+    from results_io import load_forces
+
+    forces = load_forces(args.input) if args.input else generate_corpus(args.n_forces, seed=args.seed)
+    forces = forces + edge_case_forces()
+
+    preprocessor = OrionPreprocessor()
+
+    started = time.perf_counter()
+    batch = preprocessor.prepare_texts(forces)
+    batch_s = time.perf_counter() - started
+
+    started = time.perf_counter()
+    reference = [
+        preprocessor.preprocess_text(" ".join([
+            str(force.get("title", "") or ""),
+            str(force.get("text", "") or ""),
+            str(force.get("tags", "") or "")
+        ]))
+        for force in forces
+    ]
+    reference_s = time.perf_counter() - started
+
+    mismatches = [i for i, (a, b) in enumerate(zip(batch, reference)) if a != b]
+    if len(batch) != len(reference):
+        mismatches.append(min(len(batch), len(reference)))
+
+    print("\n" + "="*50)
+    print("NORMALIZATION PARITY")
+    print("="*50)
+    print(f"Forces: {len(forces)}")
+    print(f"preprocess_text loop: {reference_s:.3f}s")
+    print(f"prepare_texts batch:  {batch_s:.3f}s (x{reference_s / max(batch_s, 1e-9):.1f})")
+    if mismatches:
+        print(f"MISMATCH in {len(mismatches)} forces")
+        for i in mismatches[:5]:
+            print(f"  {forces[i].get('id')}: {reference[i]!r} != {batch[i] if i < len(batch) else None!r}")
+        sys.exit(1)
+    print("Outputs identical")
+
+
+if __name__ == "__main__":
+    main()
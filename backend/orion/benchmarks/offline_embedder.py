@@ -0,0 +1,74 @@
+"""
+ORION Offline Embedder - Deterministic stand-in for the Sentence Transformer
+
+Benchmarks must run on machines without network access (and without a
+downloaded model). HashingEmbedder exposes the subset of the
+SentenceTransformer.encode() interface the pipeline uses and produces dense,
+L2-normalised vectors with the same dimensionality as all-MiniLM-L6-v2.
+
+Vectors are a fixed Gaussian random projection of hashed unigram and bigram
+counts, so texts sharing words land close together and the downstream stages
+see realistic cluster structure. Timings of the embedding stage itself are
+not representative of the real model.
+"""
+
+from typing import Dict, List
+
+import numpy as np
+from sklearn.feature_extraction.text import HashingVectorizer
+
+OFFLINE_MODEL_NAME = "offline-hashing-384"
+EMBEDDING_DIM = 384
+HASH_FEATURES = 2 ** 18
+
+
+class HashingEmbedder:
+    """
+    Drop-in replacement for SentenceTransformer.encode() in offline benchmarks.
+    """
+
+    def __init__(self, dim: int = EMBEDDING_DIM, seed: int = 0):
+        self.dim = dim
+        self.seed = seed
+        self.vectorizer = HashingVectorizer(
+            n_features=HASH_FEATURES,
+            ngram_range=(1, 2),
+            alternate_sign=False,
+            norm="l2"
+        )
+        # Projection row per hashed feature id, generated on first use: the full
+        # HASH_FEATURES x dim matrix would be ~400 MB
+        self._rows: Dict[int, np.ndarray] = {}
+
+    def _projection(self, features: np.ndarray) -> np.ndarray:
+        """Projection rows for hashed feature ids (deterministic per id)."""
+        for feature in features:
+            if feature not in self._rows:
+                rng = np.random.default_rng((self.seed, int(feature)))
+                self._rows[feature] = rng.standard_normal(self.dim).astype(np.float32)
+        if len(features) == 0:
+            return np.zeros((0, self.dim), dtype=np.float32)
+        return np.stack([self._rows[f] for f in features])
+
+    def get_sentence_embedding_dimension(self) -> int:
+        return self.dim
+
+    def encode(
+        self,
+        sentences: List[str],
+        batch_size: int = 32,
+        show_progress_bar: bool = False,
+        convert_to_numpy: bool = True,
+        **kwargs
+    ) -> np.ndarray:
+        """
+        Embed texts; unused SentenceTransformer arguments are accepted and ignored.
+        """
+        if isinstance(sentences, str):
+            sentences = [sentences]
+
+        counts = self.vectorizer.transform(sentences).tocsr()
+        features = np.unique(counts.indices)
+        embeddings = np.asarray(counts[:, features] @ self._projection(features), dtype=np.float32)
+        norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+        return embeddings / np.maximum(norms, 1e-12)
@@ -0,0 +1,300 @@
+#!/usr/bin/env python3
+"""
+ORION Pipeline Benchmarks - Stage timings and peak memory on synthetic corpora
+
+Runs OrionPreprocessor.process_forces on deterministic synthetic corpora of
+increasing size and stores the per-stage profile of every run as JSON, so
+results can be compared across commits before importing a bigger scan.
+
+Key Features:
+- Default sizes 1k, 10k, 50k and 100k forces (see synthetic_corpus.py)
+- Every size runs in a fresh process, so peak RSS is per size
+- --offline swaps the Sentence Transformer for HashingEmbedder: no network or
+  model files needed
+- --compare prints per-stage wall-time ratios against an earlier results file
+- A small warm-up run precedes each measurement so numba JIT compilation
+  (pynndescent, UMAP) is not charged to the first stages
+- --umap-landmarks benchmarks landmark UMAP; --landmark-drift also fits full
+  UMAP layouts on the same embeddings and reports how far the landmark layouts drift
+- --consensus-seeds adds consensus clustering; its seed partitions appear as
+  extra louvain spans in the partition stage
+
+Usage:
+    python run_benchmarks.py --offline --sizes 1000 10000
+    python run_benchmarks.py --offline --compare results/benchmark-<old>.json
+    python run_benchmarks.py --offline --sizes 50000 --umap-landmarks 10000 --landmark-drift
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import subprocess
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+# Add the pipeline directory to the Python path to import its modules
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BENCHMARK_DIR)
+sys.path.insert(0, os.path.dirname(BENCHMARK_DIR))
+
+from synthetic_corpus import generate_corpus
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+DEFAULT_SIZES = [1000, 10000, 50000, 100000]
+WARMUP_FORCES = 300
+RESULTS_DIR = os.path.join(BENCHMARK_DIR, "results")
+RESULTS_VERSION = 1
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=BENCHMARK_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _package_versions() -> Dict[str, Optional[str]]:
+    from importlib import metadata
+
+    versions = {}
+    for package in ("numpy", "scipy", "scikit-learn", "umap-learn", "pynndescent",
+                    "networkx", "python-louvain", "sentence-transformers", "torch"):
+        try:
+            versions[package] = metadata.version(package)
+        except metadata.PackageNotFoundError:
+            versions[package] = None
+    return versions
+
+
+def landmark_drift(preprocessor, forces: List[Dict[str, Any]], results: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Drift of a landmark-mode run's layouts from full UMAP fits on the same embeddings.
+
+    Returns:
+        Dict: Per layout ("3d", "2d") the layout_drift() report plus full_fit_s
+    """
+    from orion_preprocessing import UMAP_2D_PARAMS, UMAP_3D_PARAMS
+    from landmark_umap import layout_drift
+
+    texts = preprocessor.prepare_texts(forces)
+    duplicates = preprocessor.deduplicate_texts(texts)
+    embeddings = preprocessor.generate_embeddings([texts[i] for i in duplicates.representatives])
+    knn_graph = preprocessor.build_knn_graph(embeddings)
+
+    landmarks, preprocessor.umap_landmarks = preprocessor.umap_landmarks, None
+    drift = {}
+    try:
+        for layout, params, columns in (
+            ("3d", UMAP_3D_PARAMS, ("umap3d_x", "umap3d_y", "umap3d_z")),
+            ("2d", UMAP_2D_PARAMS, ("umap2d_x", "umap2d_y"))
+        ):
+            started = time.perf_counter()
+            full, _ = preprocessor.fit_umap(embeddings, params, knn_graph)
+            full_fit_s = time.perf_counter() - started
+            landmark = np.column_stack([results[column] for column in columns])[duplicates.representatives]
+            drift[layout] = {
+                **layout_drift(full, landmark, random_state=preprocessor.random_state),
+                "full_fit_s": full_fit_s
+            }
+            logger.info(f"UMAP {layout} landmark drift: k-NN preservation "
+                        f"{drift[layout]['knn_preservation']:.3f}, Procrustes disparity "
+                        f"{drift[layout]['procrustes_disparity']:.4f}")
+    finally:
+        preprocessor.umap_landmarks = landmarks
+    return drift
+
+
+def run_size(n_forces: int, options: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Benchmark one corpus size. Runs in its own process.
+
+    Args:
+        n_forces: Corpus size
+        options: seed, offline, warmup, title_engine, community_backend,
+            target_clusters, n_jobs, umap_landmarks, landmark_drift, consensus_seeds
+
+    Returns:
+        Dict: Run summary with the full stage profile
+    """
+    from orion_preprocessing import OrionPreprocessor
+    from profiler import peak_rss_mb
+
+    started = time.perf_counter()
+    forces = generate_corpus(n_forces, seed=options["seed"])
+    corpus_s = time.perf_counter() - started
+
+    preprocessor = OrionPreprocessor(
+        random_state=options["seed"],
+        n_jobs=options["n_jobs"],
+        title_engine=options["title_engine"],
+        community_backend=options["community_backend"],
+        umap_landmarks=options["umap_landmarks"],
+        consensus_seeds=options["consensus_seeds"]
+    )
+    if options["offline"]:
+        from offline_embedder import HashingEmbedder, OFFLINE_MODEL_NAME
+
+        # Pre-set the embedder so initialize_models() neither downloads nor loads a model
+        preprocessor.model_name = OFFLINE_MODEL_NAME
+        preprocessor.embedder = HashingEmbedder(seed=options["seed"])
+
+    if options["warmup"]:
+        logger.info(f"Warm-up run on {WARMUP_FORCES} forces...")
+        preprocessor.process_forces(generate_corpus(WARMUP_FORCES, seed=options["seed"] + 1))
+
+    results = preprocessor.process_forces(forces, options["target_clusters"])
+    profile = results["profile"]
+
+    run = {
+        "n_forces": n_forces,
+        "corpus_s": corpus_s,
+        "total_wall_s": profile["total_wall_s"],
+        "total_cpu_s": profile["total_cpu_s"],
+        "peak_rss_mb": peak_rss_mb(),
+        "n_clusters": results["n_clusters"],
+        "resolution_used": results["resolution_used"],
+        "silhouette_score": results["silhouette_score"],
+        "stages": {
+            stage["name"]: {
+                key: stage.get(key)
+                for key in ("wall_s", "cpu_s", "peak_rss_delta_mb", "items_per_s")
+            }
+            for stage in profile["stages"]
+        },
+        "profile": profile
+    }
+    if "cluster_consensus" in results:
+        run["cluster_consensus"] = results["cluster_consensus"]
+    if options["umap_landmarks"] and options["landmark_drift"]:
+        run["umap_drift"] = landmark_drift(preprocessor, forces, results)
+    return run
+
+
+def run_benchmarks(sizes: List[int], options: Dict[str, Any]) -> Dict[str, Any]:
+    """Benchmark every size in a fresh worker process."""
+    runs = []
+    context = multiprocessing.get_context("spawn")
+    for n_forces in sizes:
+        logger.info(f"Benchmarking {n_forces} forces...")
+        with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+            run = executor.submit(run_size, n_forces, options).result()
+        logger.info(f"{n_forces} forces: {run['total_wall_s']:.1f}s, peak RSS {run['peak_rss_mb']:.0f} MB")
+        runs.append(run)
+
+    return {
+        "version": RESULTS_VERSION,
+        "commit": _git_commit(),
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "options": options,
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "packages": _package_versions()
+        },
+        "runs": runs
+    }
+
+
+def format_comparison(baseline: Dict[str, Any], current: Dict[str, Any]) -> str:
+    """Per-stage wall-time ratio (current / baseline) for sizes present in both."""
+    baseline_runs = {run["n_forces"]: run for run in baseline["runs"]}
+    lines = [f"baseline {baseline.get('commit')} -> current {current.get('commit')} (wall time ratio)"]
+    for run in current["runs"]:
+        previous = baseline_runs.get(run["n_forces"])
+        if previous is None:
+            continue
+        lines.append(f"{run['n_forces']} forces:")
+        for name, stage in run["stages"].items():
+            before = previous["stages"].get(name)
+            if before and before["wall_s"]:
+                lines.append(f"  {name:<12} {before['wall_s']:>9.3f}s -> {stage['wall_s']:>9.3f}s "
+                             f"x{stage['wall_s'] / before['wall_s']:.2f}")
+        lines.append(f"  {'peak RSS':<12} {previous['peak_rss_mb']:>8.0f}MB -> {run['peak_rss_mb']:>8.0f}MB")
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ORION Pipeline Benchmarks")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES,
+                       help="Corpus sizes to benchmark")
+    parser.add_argument("--seed", type=int, default=0,
+                       help="Corpus and pipeline random seed")
+    parser.add_argument("--offline", action="store_true",
+                       help="Use the deterministic hashing embedder instead of the Sentence Transformer")
+    parser.add_argument("--no-warmup", action="store_true",
+                       help="Skip the warm-up run (timings then include JIT compilation)")
+    parser.add_argument("--title-engine", default="ctfidf",
+                       help="Cluster title engine to benchmark")
+    parser.add_argument("--community-backend", default="networkx",
+                       help="Community detection backend to benchmark (networkx, louvain, leiden)")
+    parser.add_argument("--target-clusters", type=int, default=None,
+                       help="Target number of clusters (default: fixed resolution)")
+    parser.add_argument("--n-jobs", type=int, default=None,
+                       help="Worker processes for parallel stages")
+    parser.add_argument("--umap-landmarks", type=int, default=None,
+                       help="Benchmark landmark UMAP with this many landmarks")
+    parser.add_argument("--landmark-drift", action="store_true",
+                       help="Also fit full UMAP layouts and report landmark drift (slow)")
+    parser.add_argument("--consensus-seeds", type=int, default=0,
+                       help="Benchmark consensus clustering over this many seeds")
+    parser.add_argument("--output", default=None,
+                       help="Results JSON (default: results/benchmark-<commit>.json)")
+    parser.add_argument("--compare", default=None,
+                       help="Earlier results JSON to compare against")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    options = {
+        "seed": args.seed,
+        "offline": args.offline,
+        "warmup": not args.no_warmup,
+        "title_engine": args.title_engine,
+        "community_backend": args.community_backend,
+        "target_clusters": args.target_clusters,
+        "n_jobs": args.n_jobs,
+        "umap_landmarks": args.umap_landmarks,
+        "landmark_drift": args.landmark_drift,
+        "consensus_seeds": args.consensus_seeds
+    }
+    results = run_benchmarks(args.sizes, options)
+
+    output = args.output or os.path.join(RESULTS_DIR, f"benchmark-{results['commit'] or 'local'}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(results, f, indent=2)
+
+    print("\n" + "="*50)
+    print("BENCHMARK SUMMARY")
+    print("="*50)
+    for run in results["runs"]:
+        print(f"{run['n_forces']:>7} forces: {run['total_wall_s']:>8.1f}s wall, "
+              f"{run['peak_rss_mb']:>7.0f} MB peak RSS, {run['n_clusters']} clusters")
+        for name, stage in run["stages"].items():
+            print(f"    {name:<12} {stage['wall_s']:>8.3f}s")
+        for layout, drift in run.get("umap_drift", {}).items():
+            print(f"    umap{layout} drift: k-NN preservation {drift['knn_preservation']:.3f}, "
+                  f"Procrustes {drift['procrustes_disparity']:.4f} (full fit {drift['full_fit_s']:.1f}s)")
+    print(f"Results saved to: {output}")
+
+    if args.compare:
+        with open(args.compare, "r") as f:
+            print(format_comparison(json.load(f), results))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+ORION Startup Benchmarks - Time from process start to useful work
+
+Heavy libraries (torch, UMAP, KeyBERT, scikit-learn) are imported by the
+pipeline stages that use them, not when orion_preprocessing.py starts. This
+script times short commands in fresh interpreter processes so regressions in
+startup time show up across commits.
+
+Scenarios:
+- import: import orion_preprocessing
+- help: orion_preprocessing.py --help
+- inspect_artifact: orion_preprocessing.py --inspect-artifact on a small artifact
+- assign_startup: imports of an assign-only run plus loading its artifact
+  (this one needs UMAP, because the artifact holds fitted UMAP models)
+
+Key Features:
+- Every repeat runs in a new interpreter; median and minimum wall time per scenario
+- Slowest modules by cumulative import time (python -X importtime)
+- --compare prints per-scenario ratios against an earlier results file
+
+Usage:
+    python startup_benchmark.py
+    python startup_benchmark.py --repeats 20 --compare results/startup-<old>.json
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import statistics
+import subprocess
+import tempfile
+import logging
+from datetime import datetime, timezone
+from typing import Any, Dict, List
+
+import numpy as np
+
+# Add the pipeline directory to the Python path to import its modules
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+PIPELINE_DIR = os.path.dirname(BENCHMARK_DIR)
+sys.path.insert(0, BENCHMARK_DIR)
+sys.path.insert(0, PIPELINE_DIR)
+
+from run_benchmarks import RESULTS_DIR, _git_commit
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+DEFAULT_REPEATS = 10
+ARTIFACT_FORCES = 200
+SLOWEST_IMPORTS = 10
+RESULTS_VERSION = 1
+
+
+def write_sample_artifact(path: str, seed: int = 0) -> None:
+    """Small but complete features artifact, with fitted UMAP models."""
+    import umap
+    from features_artifact import save_features_artifact, compute_cluster_centroids
+
+    rng = np.random.default_rng(seed)
+    embeddings = rng.normal(size=(ARTIFACT_FORCES, 32)).astype(np.float32)
+    labels = rng.integers(0, 4, size=ARTIFACT_FORCES)
+    models = {
+        n_components: umap.UMAP(n_components=n_components, n_neighbors=10, random_state=seed).fit(embeddings)
+        for n_components in (2, 3)
+    }
+    save_features_artifact(path, {
+        "model_name": "startup-benchmark",
+        "ids": [f"force_{i}" for i in range(ARTIFACT_FORCES)],
+        "embeddings": embeddings,
+        "cluster_labels": labels,
+        "cluster_titles": {int(k): f"Cluster {k}" for k in np.unique(labels)},
+        "umap_2d": models[2],
+        "umap_3d": models[3],
+        **compute_cluster_centroids(embeddings, labels)
+    })
+
+
+def scenarios(artifact_path: str) -> Dict[str, List[str]]:
+    """Command line per scenario, run from the pipeline directory."""
+    script = os.path.join(PIPELINE_DIR, "orion_preprocessing.py")
+    return {
+        "import": [sys.executable, "-c", "import orion_preprocessing"],
+        "help": [sys.executable, script, "--help"],
+        "inspect_artifact": [sys.executable, script, "--inspect-artifact", artifact_path],
+        "assign_startup": [
+            sys.executable, "-c",
+            "import orion_preprocessing, features_artifact; "
+            f"features_artifact.load_features_artifact({artifact_path!r})"
+        ]
+    }
+
+
+def time_command(command: List[str], repeats: int) -> Dict[str, Any]:
+    """Wall time of a command over fresh processes."""
+    timings = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        subprocess.run(command, cwd=PIPELINE_DIR, check=True,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        timings.append(time.perf_counter() - started)
+    return {
+        "median_s": statistics.median(timings),
+        "min_s": min(timings),
+        "max_s": max(timings),
+        "repeats": repeats
+    }
+
+
+def slowest_imports(limit: int = SLOWEST_IMPORTS) -> List[Dict[str, Any]]:
+    """Modules with the largest cumulative import time when importing orion_preprocessing."""
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import orion_preprocessing"],
+        cwd=PIPELINE_DIR, capture_output=True, text=True, check=True
+    )
+    imports = []
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, module = line.split("|")
+        imports.append({"module": module.strip(), "cumulative_s": int(cumulative) / 1e6})
+    return sorted(imports, key=lambda i: i["cumulative_s"], reverse=True)[:limit]
+
+
+def format_comparison(baseline: Dict[str, Any], current: Dict[str, Any]) -> str:
+    """Per-scenario median ratio (current / baseline)."""
+    lines = [f"baseline {baseline.get('commit')} -> current {current.get('commit')} (median wall time ratio)"]
+    for name, timing in current["scenarios"].items():
+        before = baseline["scenarios"].get(name)
+        if before and before["median_s"]:
+            lines.append(f"  {name:<17} {before['median_s']:>7.3f}s -> {timing['median_s']:>7.3f}s "
+                         f"x{timing['median_s'] / before['median_s']:.2f}")
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ORION Startup Benchmarks")
+    parser.add_argument("--repeats", type=int, default=DEFAULT_REPEATS,
+                       help="Fresh processes per scenario")
+    parser.add_argument("--output", default=None,
+                       help="Results JSON (default: results/startup-<commit>.json)")
+    parser.add_argument("--compare", default=None,
+                       help="Earlier startup results JSON to compare against")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    with tempfile.TemporaryDirectory() as directory:
+        artifact_path = os.path.join(directory, "features.pkl")
+        write_sample_artifact(artifact_path)
+
+        timings = {}
+        for name, command in scenarios(artifact_path).items():
+            logger.info(f"Timing {name}...")
+            timings[name] = time_command(command, args.repeats)
+
+    results = {
+        "version": RESULTS_VERSION,
+        "commit": _git_commit(),
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count()
+        },
+        "scenarios": timings,
+        "slowest_imports": slowest_imports()
+    }
+
+    output = args.output or os.path.join(RESULTS_DIR, f"startup-{results['commit'] or 'local'}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(results, f, indent=2)
+
+    print("\n" + "="*50)
+    print("STARTUP SUMMARY")
+    print("="*50)
+    for name, timing in results["scenarios"].items():
+        print(f"{name:<17} median {timing['median_s']:>7.3f}s, min {timing['min_s']:>7.3f}s")
+    print("Slowest imports (cumulative):")
+    for entry in results["slowest_imports"]:
+        print(f"    {entry['module']:<40} {entry['cumulative_s']:>7.3f}s")
+    print(f"Results saved to: {output}")
+
+    if args.compare:
+        with open(args.compare, "r") as f:
+            print(format_comparison(json.load(f), results))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+"""
+ORION Synthetic Corpus - Deterministic driving-force datasets for benchmarks
+
+Generates force records shaped like the ones the Node service sends to
+orion_preprocessing.py (id, title, text, tags) plus the STEEP category and
+driving-force type stored with every force.
+
+Key Features:
+- Fully deterministic for a given (n_forces, seed)
+- Latent topics, each anchored in one STEEP category, so the corpus has real
+  cluster structure for UMAP and Louvain to find
+- Log-normal title / text lengths and a variable tag count, in the range of
+  real scans (short titles, paragraph-length descriptions)
+- STEEP and type mixes follow typical scan proportions (Trends and Weak Signals
+  dominate, Wildcards are rare)
+
+Usage:
+    python synthetic_corpus.py --n-forces 10000 --output forces_10k.ndjson
+"""
+
+import json
+import argparse
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+# STEEP category -> share of forces
+STEEP_MIX = {
+    "Social": 0.22,
+    "Technological": 0.30,
+    "Economic": 0.20,
+    "Environmental": 0.15,
+    "Political": 0.13
+}
+
+# Driving-force type (M/T/WS/WC/S) -> share of forces
+TYPE_MIX = {
+    "M": 0.08,   # Megatrends
+    "T": 0.37,   # Trends
+    "WS": 0.30,  # Weak Signals
+    "WC": 0.05,  # Wildcards
+    "S": 0.20    # Signals
+}
+
+STEEP_VOCABULARY = {
+    "Social": [
+        "demographic", "ageing", "urbanisation", "migration", "education", "wellbeing",
+        "community", "inequality", "identity", "lifestyle", "consumer", "generation",
+        "workforce", "household", "loneliness", "culture", "trust", "literacy",
+        "healthcare", "pandemic", "nutrition", "housing", "mobility", "family"
+    ],
+    "Technological": [
+        "artificial", "intelligence", "automation", "robotics", "quantum", "blockchain",
+        "semiconductor", "biotechnology", "genomics", "sensor", "network", "cloud",
+        "platform", "algorithm", "battery", "satellite", "software", "digital",
+        "computing", "interface", "wearable", "drone", "cybersecurity", "metaverse"
+    ],
+    "Economic": [
+        "inflation", "productivity", "supply", "chain", "investment", "capital",
+        "labour", "market", "trade", "currency", "debt", "growth", "recession",
+        "pricing", "subscription", "startup", "venture", "insurance", "banking",
+        "payments", "commodity", "logistics", "retail", "manufacturing"
+    ],
+    "Environmental": [
+        "climate", "emissions", "carbon", "biodiversity", "drought", "flooding",
+        "renewable", "solar", "wind", "hydrogen", "recycling", "circular", "water",
+        "ocean", "forest", "pollution", "heatwave", "adaptation", "resilience",
+        "agriculture", "soil", "plastic", "wildfire", "ecosystem"
+    ],
+    "Political": [
+        "regulation", "geopolitics", "election", "sovereignty", "sanctions", "policy",
+        "governance", "legislation", "privacy", "taxation", "subsidy", "treaty",
+        "conflict", "security", "democracy", "populism", "standards", "antitrust",
+        "compliance", "diplomacy", "borders", "defence", "accountability", "reform"
+    ]
+}
+
+# Domain-neutral foresight words shared by all topics
+GENERAL_VOCABULARY = [
+    "future", "shift", "emerging", "rising", "decline", "impact", "scenario", "change",
+    "adoption", "pressure", "risk", "opportunity", "disruption", "transition", "scale",
+    "new", "global", "local", "accelerating", "uncertain", "signal", "driver", "demand",
+    "capacity", "access", "cost", "model", "system", "strategy", "innovation"
+]
+
+# Function words, so text preprocessing has stopwords to remove
+FUNCTION_WORDS = [
+    "the", "of", "and", "to", "in", "a", "is", "for", "on", "with", "as", "by",
+    "are", "this", "that", "from", "will", "be", "more", "their", "its", "across"
+]
+
+# Word-part pools used to coin topic-specific terms, widening the vocabulary
+_PREFIXES = ["agri", "bio", "cyber", "eco", "fin", "geo", "hydro", "info", "micro",
+             "nano", "neuro", "omni", "photo", "proto", "socio", "techno", "tele", "urban"]
+_SUFFIXES = ["care", "chain", "craft", "flow", "grid", "hub", "lab", "link", "logic",
+             "mesh", "net", "scape", "sense", "shift", "sphere", "stack", "tech", "ware"]
+
+# Length distributions (log-normal in words, clipped)
+TITLE_WORDS = {"mean": 6.0, "sigma": 0.35, "min": 2, "max": 16}
+TEXT_WORDS = {"mean": 70.0, "sigma": 0.55, "min": 12, "max": 400}
+TAG_COUNT = {"mean": 3.0, "max": 8}
+
+
+def _choice(rng: np.random.Generator, mix: Dict[str, float], size: int) -> np.ndarray:
+    keys = list(mix)
+    probabilities = np.array([mix[k] for k in keys])
+    return np.array(keys)[rng.choice(len(keys), size=size, p=probabilities / probabilities.sum())]
+
+
+def _lengths(rng: np.random.Generator, spec: Dict[str, float], size: int) -> np.ndarray:
+    mu = np.log(spec["mean"]) - spec["sigma"] ** 2 / 2
+    lengths = rng.lognormal(mu, spec["sigma"], size=size).round().astype(int)
+    return np.clip(lengths, spec["min"], spec["max"])
+
+
+def default_n_topics(n_forces: int) -> int:
+    """Latent topic count: grows with corpus size like real scans do."""
+    return int(np.clip(round(2.0 * np.sqrt(n_forces) / 3.0), 8, 300))
+
+
+def _make_topics(rng: np.random.Generator, n_topics: int) -> List[Dict[str, Any]]:
+    """Topics per STEEP category in proportion to STEEP_MIX (at least one each)."""
+    topics = []
+    for steep, share in STEEP_MIX.items():
+        for _ in range(max(1, int(round(share * n_topics)))):
+            topics.append(_make_topic(rng, steep))
+    return topics
+
+
+def _make_topic(rng: np.random.Generator, steep: str) -> Dict[str, Any]:
+    """Eight words from the STEEP pool plus four coined terms."""
+    core = list(rng.choice(STEEP_VOCABULARY[steep], size=8, replace=False))
+    coined = [
+        f"{_PREFIXES[rng.integers(len(_PREFIXES))]}{_SUFFIXES[rng.integers(len(_SUFFIXES))]}"
+        for _ in range(4)
+    ]
+    return {"steep": steep, "words": core + coined}
+
+
+def _words(rng: np.random.Generator, topic: Dict[str, Any], n_words: int) -> List[str]:
+    """Mix of topic, STEEP, general and function words."""
+    sources = rng.choice(4, size=n_words, p=[0.40, 0.15, 0.15, 0.30])
+    pools = [
+        topic["words"],
+        STEEP_VOCABULARY[topic["steep"]],
+        GENERAL_VOCABULARY,
+        FUNCTION_WORDS
+    ]
+    return [pools[s][rng.integers(len(pools[s]))] for s in sources]
+
+
+def _sentences(words: List[str], rng: np.random.Generator) -> str:
+    """Join words into capitalised sentences of 8-20 words."""
+    sentences = []
+    start = 0
+    while start < len(words):
+        end = start + int(rng.integers(8, 21))
+        sentence = " ".join(words[start:end])
+        sentences.append(sentence[:1].upper() + sentence[1:] + ".")
+        start = end
+    return " ".join(sentences)
+
+
+def generate_corpus(n_forces: int, seed: int = 0, n_topics: Optional[int] = None) -> List[Dict[str, Any]]:
+    """
+    Generate a deterministic synthetic force corpus.
+
+    Args:
+        n_forces: Number of forces
+        seed: Random seed; the same (n_forces, seed) always gives the same corpus
+        n_topics: Latent topics (default: default_n_topics(n_forces))
+
+    Returns:
+        List: Force dicts with id, title, text, tags, steep, type and topic
+    """
+    rng = np.random.default_rng(seed)
+    topics = _make_topics(rng, n_topics or default_n_topics(n_forces))
+
+    # STEEP category per force, then a topic within it with Zipf-like sizes
+    # (a few large themes, a long tail of small ones)
+    steeps = _choice(rng, STEEP_MIX, n_forces)
+    topic_of = np.empty(n_forces, dtype=int)
+    for steep in STEEP_MIX:
+        candidates = np.array([t for t, topic in enumerate(topics) if topic["steep"] == steep])
+        members = np.where(steeps == steep)[0]
+        weights = 1.0 / np.arange(1, len(candidates) + 1) ** 0.8
+        topic_of[members] = rng.choice(candidates, size=len(members), p=weights / weights.sum())
+    types = _choice(rng, TYPE_MIX, n_forces)
+    title_lengths = _lengths(rng, TITLE_WORDS, n_forces)
+    text_lengths = _lengths(rng, TEXT_WORDS, n_forces)
+    tag_counts = np.minimum(rng.poisson(TAG_COUNT["mean"], size=n_forces), TAG_COUNT["max"])
+
+    forces = []
+    for i in range(n_forces):
+        topic = topics[topic_of[i]]
+        title = " ".join(_words(rng, topic, int(title_lengths[i]))).title()
+        text = _sentences(_words(rng, topic, int(text_lengths[i])), rng)
+        tag_pool = topic["words"] + STEEP_VOCABULARY[topic["steep"]][:6]
+        tags = list(rng.choice(tag_pool, size=int(tag_counts[i]), replace=False)) if tag_counts[i] else []
+
+        forces.append({
+            "id": f"synthetic-{seed}-{i:07d}",
+            "title": title,
+            "text": text,
+            "tags": " ".join(str(t) for t in tags),
+            "steep": topic["steep"],
+            "type": str(types[i]),
+            "topic": int(topic_of[i])
+        })
+
+    return forces
+
+
+def write_ndjson(forces: List[Dict[str, Any]], path: str) -> None:
+    """Write forces one JSON object per line, the format orion_preprocessing reads."""
+    with open(path, "w") as f:
+        for force in forces:
+            f.write(json.dumps(force) + "\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic ORION force corpus")
+    parser.add_argument("--n-forces", type=int, required=True, help="Number of forces")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed")
+    parser.add_argument("--output", required=True, help="Output NDJSON file")
+    args = parser.parse_args()
+
+    forces = generate_corpus(args.n_forces, seed=args.seed)
+    write_ndjson(forces, args.output)
+    print(f"Wrote {len(forces)} forces to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
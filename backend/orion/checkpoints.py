@@ -0,0 +1,169 @@
+"""
+ORION Stage Checkpoints - Fingerprinted on-disk artifacts per pipeline stage
+
+process_forces runs as a sequence of named stages. With a checkpoint directory
+configured, every stage output is written to disk under a fingerprint of the
+input data and of all stage parameters up to and including that stage. A rerun
+with the same inputs and parameters loads the stored outputs and only computes
+stages whose fingerprint changed (and everything after them).
+
+Key Features:
+- Chained SHA256 fingerprints: changing a stage's parameters invalidates that
+  stage and all later ones, never earlier ones
+- Atomic writes (temporary file + rename) so a crash never leaves a torn checkpoint
+- Unreadable checkpoints are discarded and recomputed
+- One file per stage; older fingerprints of the same stage are removed
+- Memory-mapped embedding files are stored by reference (path, shape, dtype);
+  a checkpoint whose file has gone is treated as unreadable
+
+Layout:
+    <checkpoint_dir>/<stage>-<fingerprint>.pkl
+"""
+
+import os
+import json
+import glob
+import pickle
+import hashlib
+import logging
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+
+try:
+    from .embedding_store import is_mapped_file, open_mapped
+except ImportError:
+    from embedding_store import is_mapped_file, open_mapped
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Pipeline stages in execution order
+PIPELINE_STAGES = [
+    "texts",
+    "dedup",
+    "embeddings",
+    "knn",
+    "umap",
+    "partition",
+    "align",
+    "titles",
+    "metrics"
+]
+
+# Fields of a force that influence the pipeline
+FINGERPRINT_FIELDS = ("id", "title", "text", "tags")
+
+
+def fingerprint_forces(forces_data: List[Dict[str, Any]]) -> str:
+    """
+    SHA256 over the fields of every force that feed the pipeline.
+    """
+    digest = hashlib.sha256()
+    for force in forces_data:
+        record = [str(force.get(field, "") or "") for field in FINGERPRINT_FIELDS]
+        digest.update(json.dumps(record, ensure_ascii=False).encode("utf-8"))
+        digest.update(b"\n")
+    return digest.hexdigest()
+
+
+class _CheckpointPickler(pickle.Pickler):
+    """Pickles whole-file memory mappings as references to their file."""
+
+    def persistent_id(self, obj: Any) -> Any:
+        if isinstance(obj, np.memmap) and is_mapped_file(obj):
+            return ("memmap", os.path.abspath(obj.filename), obj.shape, obj.dtype.str)
+        return None
+
+
+class _CheckpointUnpickler(pickle.Unpickler):
+    """Reopens memory mappings referenced by _CheckpointPickler."""
+
+    def persistent_load(self, pid: Any) -> Any:
+        kind, path, shape, dtype = pid
+        if kind != "memmap":
+            raise pickle.UnpicklingError(f"Unknown persistent reference: {kind}")
+        return open_mapped(path, shape, dtype)
+
+
+def _fingerprint_params(params: Dict[str, Any]) -> str:
+    return json.dumps(params, sort_keys=True, default=str)
+
+
+class StageCheckpointer:
+    """
+    Runs pipeline stages, loading or saving their outputs by fingerprint.
+    """
+
+    def __init__(self, checkpoint_dir: Optional[str], input_fingerprint: str = ""):
+        self.checkpoint_dir = checkpoint_dir
+        self._chain = input_fingerprint
+        self.resumed: List[str] = []
+        self.computed: List[str] = []
+
+        if checkpoint_dir:
+            os.makedirs(checkpoint_dir, exist_ok=True)
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.checkpoint_dir)
+
+    def _path(self, stage: str, fingerprint: str) -> str:
+        return os.path.join(self.checkpoint_dir, f"{stage}-{fingerprint[:24]}.pkl")
+
+    def _load(self, path: str) -> Any:
+        with open(path, "rb") as f:
+            return _CheckpointUnpickler(f).load()
+
+    def _save(self, stage: str, path: str, value: Any) -> None:
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            _CheckpointPickler(f, protocol=pickle.HIGHEST_PROTOCOL).dump(value)
+        os.replace(tmp_path, path)
+
+        # Keep a single checkpoint per stage
+        for stale in glob.glob(os.path.join(self.checkpoint_dir, f"{stage}-*.pkl")):
+            if stale != path:
+                os.remove(stale)
+
+    def run(self, stage: str, params: Dict[str, Any], compute: Callable[[], Any]) -> Any:
+        """
+        Return the stage output, from its checkpoint when the fingerprint matches.
+
+        Args:
+            stage: Stage name (one of PIPELINE_STAGES)
+            params: Everything besides upstream outputs that affects this stage
+            compute: Function producing the stage output
+
+        Returns:
+            Any: Stage output
+        """
+        if stage not in PIPELINE_STAGES:
+            raise ValueError(f"Unknown pipeline stage: {stage}")
+
+        if not self.enabled:
+            self.computed.append(stage)
+            return compute()
+
+        digest = hashlib.sha256()
+        digest.update(self._chain.encode("utf-8"))
+        digest.update(stage.encode("utf-8"))
+        digest.update(_fingerprint_params(params).encode("utf-8"))
+        fingerprint = digest.hexdigest()
+        self._chain = fingerprint
+
+        path = self._path(stage, fingerprint)
+        if os.path.exists(path):
+            try:
+                value = self._load(path)
+                logger.info(f"Checkpoint: resumed stage '{stage}' from {path}")
+                self.resumed.append(stage)
+                return value
+            except Exception as e:
+                logger.warning(f"Checkpoint for stage '{stage}' is unreadable ({e}), recomputing")
+
+        value = compute()
+        self._save(stage, path, value)
+        logger.info(f"Checkpoint: saved stage '{stage}' to {path}")
+        self.computed.append(stage)
+        return value
@@ -0,0 +1,253 @@
+"""
+ORION Cluster Classifier - Nearest-cluster tagging of incoming signals
+
+Newly scanned signals used to wait for the nightly recompute before they
+belonged to a cluster. assign_forces can place them sooner, but it loads the
+full features artifact (all embeddings and the pickled UMAP models). This
+module keeps only what tagging needs: one centroid and one medoid per cluster
+of the final partition, plus a per-cluster profile of how similar members are
+to their centroid. That data goes into a small .npz file next to the artifact.
+
+Key Features:
+- float32 centroid and medoid tables; loading needs only numpy (no UMAP,
+  KeyBERT or pickle)
+- Batch classification as one matrix product per chunk of signals
+- Per signal: nearest cluster, its cosine similarity, the margin to the
+  runner-up cluster and an outlier score (the share of the cluster's members
+  that are closer to the centroid than the signal)
+- Medoids are exact under cosine similarity: the member with the largest
+  summed similarity to the other members is the one closest to the centroid
+"""
+
+import os
+import json
+import logging
+from typing import Any, Dict, Optional, Sequence
+
+import numpy as np
+
+try:
+    from .embedding_store import row_chunks
+    from .features_artifact import compute_cluster_centroids, normalize_rows
+except ImportError:
+    from embedding_store import row_chunks
+    from features_artifact import compute_cluster_centroids, normalize_rows
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Constants
+CLASSIFIER_VERSION = 1
+# Member-similarity quantiles kept per cluster (every 5%)
+PROFILE_LEVELS = np.linspace(0.0, 1.0, 21)
+# Signals less similar to their centroid than this share of the members are outliers
+DEFAULT_OUTLIER_THRESHOLD = 0.95
+_METADATA_KEY = "__classifier__"
+
+
+class ClassifierError(Exception):
+    """Raised when a cluster classifier is missing, malformed or incompatible"""
+    pass
+
+
+def cluster_classifier_path(artifact_path: str) -> str:
+    """Where the cluster classifier of a features artifact is stored."""
+    return f"{os.path.splitext(artifact_path)[0]}.classifier.npz"
+
+
+class ClusterClassifier:
+    """
+    Centroid table of a partition, with the member-similarity profile of each cluster.
+
+    Row i of centroids, medoids and profiles belongs to cluster labels[i].
+    """
+
+    def __init__(
+        self,
+        labels: np.ndarray,
+        centroids: np.ndarray,
+        medoids: np.ndarray,
+        profiles: np.ndarray,
+        cluster_titles: Dict[int, str],
+        medoid_ids: Sequence[Any],
+        model_name: Optional[str] = None,
+        embedding_id: Optional[str] = None
+    ):
+        self.labels = np.asarray(labels, dtype=np.int64)
+        self.centroids = np.asarray(centroids, dtype=np.float32)
+        self.medoids = np.asarray(medoids, dtype=np.float32)
+        self.profiles = np.asarray(profiles, dtype=np.float32)
+        self.cluster_titles = {int(k): v for k, v in cluster_titles.items()}
+        self.medoid_ids = list(medoid_ids)
+        self.model_name = model_name
+        self.embedding_id = embedding_id
+
+    @property
+    def n_clusters(self) -> int:
+        return len(self.labels)
+
+    def classify(
+        self,
+        embeddings: np.ndarray,
+        outlier_threshold: float = DEFAULT_OUTLIER_THRESHOLD,
+        chunk_size: int = 4096
+    ) -> Dict[str, np.ndarray]:
+        """
+        Tag embeddings with their nearest cluster.
+
+        Args:
+            embeddings: Signal embeddings (n_signals x dim)
+            outlier_threshold: outlier_score above which a signal is flagged
+            chunk_size: Signals per similarity block
+
+        Returns:
+            Dict: 'labels', 'similarity' (cosine to the centroid), 'margin'
+            (to the second nearest centroid), 'outlier_score' (0..1) and
+            'outlier' per signal
+        """
+        n_signals = len(embeddings)
+        nearest = np.empty(n_signals, dtype=np.int64)
+        similarity = np.empty(n_signals, dtype=np.float32)
+        margin = np.empty(n_signals, dtype=np.float32)
+
+        for rows in row_chunks(n_signals, chunk_size):
+            block = normalize_rows(embeddings[rows]) @ self.centroids.T
+            nearest[rows] = block.argmax(axis=1)
+            similarity[rows] = block[np.arange(len(block)), nearest[rows]]
+            if self.n_clusters > 1:
+                runner_up = np.partition(block, self.n_clusters - 2, axis=1)[:, self.n_clusters - 2]
+                margin[rows] = similarity[rows] - runner_up
+            else:
+                margin[rows] = similarity[rows]
+
+        # Share of members closer to the centroid, read off the cluster's quantiles
+        outlier_score = np.empty(n_signals, dtype=np.float32)
+        for cluster in np.unique(nearest):
+            members = nearest == cluster
+            outlier_score[members] = 1.0 - np.interp(similarity[members], self.profiles[cluster], PROFILE_LEVELS)
+
+        return {
+            'labels': self.labels[nearest],
+            'similarity': similarity,
+            'margin': margin,
+            'outlier_score': outlier_score,
+            'outlier': outlier_score > outlier_threshold
+        }
+
+    def summary(self) -> Dict[str, Any]:
+        """Small JSON-serialisable description of the classifier."""
+        return {
+            'version': CLASSIFIER_VERSION,
+            'model_name': self.model_name,
+            'embedding_id': self.embedding_id,
+            'n_clusters': self.n_clusters,
+            'embedding_dim': int(self.centroids.shape[1])
+        }
+
+
+def build_cluster_classifier(
+    embeddings: np.ndarray,
+    cluster_labels: np.ndarray,
+    cluster_titles: Dict[int, str],
+    ids: Optional[Sequence[Any]] = None,
+    model_name: Optional[str] = None,
+    embedding_id: Optional[str] = None
+) -> ClusterClassifier:
+    """
+    Build the classifier of a final partition.
+
+    Args:
+        embeddings: Embedding matrix (n_points x dim), may be memory-mapped
+        cluster_labels: Cluster label per point
+        cluster_titles: Title per cluster label
+        ids: Force id per point (for the medoid ids; default: row numbers)
+        model_name: Sentence Transformer the embeddings come from
+        embedding_id: Embedding runtime identifier (model + backend)
+
+    Returns:
+        ClusterClassifier: Ready to classify and save
+    """
+    cluster_labels = np.asarray(cluster_labels)
+    table = compute_cluster_centroids(embeddings, cluster_labels)
+    labels, centroids = table['centroid_labels'], table['centroids']
+    cluster_of = np.searchsorted(labels, cluster_labels)
+
+    # Cosine similarity of every point to its own centroid, row chunk by row chunk
+    similarity = np.empty(len(cluster_labels), dtype=np.float32)
+    for rows in row_chunks(len(cluster_labels)):
+        similarity[rows] = np.einsum('ij,ij->i', normalize_rows(embeddings[rows]), centroids[cluster_of[rows]])
+
+    order = np.lexsort((similarity, cluster_of))
+    bounds = np.searchsorted(cluster_of[order], np.arange(len(labels) + 1))
+    profiles = np.empty((len(labels), len(PROFILE_LEVELS)), dtype=np.float32)
+    medoid_rows = np.empty(len(labels), dtype=np.int64)
+    for cluster in range(len(labels)):
+        members = order[bounds[cluster]:bounds[cluster + 1]]
+        profiles[cluster] = np.quantile(similarity[members], PROFILE_LEVELS)
+        medoid_rows[cluster] = members[-1]
+
+    medoids = normalize_rows(np.asarray(embeddings[medoid_rows]))
+    logger.info(f"Cluster classifier: {len(labels)} clusters, {centroids.shape[1]}-d centroids and medoids")
+    return ClusterClassifier(
+        labels,
+        centroids,
+        medoids,
+        profiles,
+        cluster_titles,
+        [ids[row] if ids is not None else int(row) for row in medoid_rows],
+        model_name=model_name,
+        embedding_id=embedding_id
+    )
+
+
+def save_cluster_classifier(path: str, classifier: ClusterClassifier) -> None:
+    """
+    Write a classifier as .npz (arrays plus a JSON metadata entry, no pickle).
+    """
+    metadata = {
+        **classifier.summary(),
+        'cluster_titles': {str(k): v for k, v in classifier.cluster_titles.items()},
+        'medoid_ids': classifier.medoid_ids
+    }
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        np.savez(
+            f,
+            labels=classifier.labels,
+            centroids=classifier.centroids,
+            medoids=classifier.medoids,
+            profiles=classifier.profiles,
+            **{_METADATA_KEY: np.array(json.dumps(metadata))}
+        )
+    os.replace(tmp_path, path)
+    logger.info(f"Saved cluster classifier ({classifier.n_clusters} clusters) to {path}")
+
+
+def load_cluster_classifier(path: str) -> ClusterClassifier:
+    """
+    Load a classifier written by save_cluster_classifier().
+
+    Raises:
+        ClassifierError: If the file is missing or incompatible
+    """
+    if not os.path.exists(path):
+        raise ClassifierError(f"Cluster classifier not found: {path}")
+    with np.load(path, allow_pickle=False) as archive:
+        if _METADATA_KEY not in archive.files:
+            raise ClassifierError(f"{path} is not a cluster classifier")
+        metadata = json.loads(str(archive[_METADATA_KEY]))
+        if metadata['version'] > CLASSIFIER_VERSION:
+            raise ClassifierError(
+                f"Cluster classifier version {metadata['version']} is newer than supported version {CLASSIFIER_VERSION}"
+            )
+        return ClusterClassifier(
+            archive['labels'],
+            archive['centroids'],
+            archive['medoids'],
+            archive['profiles'],
+            {int(k): v for k, v in metadata['cluster_titles'].items()},
+            metadata['medoid_ids'],
+            model_name=metadata['model_name'],
+            embedding_id=metadata['embedding_id']
+        )
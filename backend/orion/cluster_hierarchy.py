@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+"""
+ORION Cluster Hierarchy - Precomputed partitions at several resolutions
+
+Analysts switch between coarse and fine groupings of the same forces. Instead
+of rerunning the pipeline for every --target-clusters value, a run with
+--hierarchy-levels keeps the community partitions of a ladder of resolutions,
+ordered from coarse to fine and linked by parent clusters, and stores them in
+the features artifact. Any level is then a lookup.
+
+The ladder costs one extra partition per level in the resolution search pool,
+so it is opt-in (DEFAULT_HIERARCHY_LEVELS = 0).
+
+Key Features:
+- Levels from a log-spaced ladder over a much wider resolution range than the
+  target-count search (HIERARCHY_BOUNDS), so they run from a handful of broad
+  groups to many small ones; partitions the search computed are reused
+- One level per distinct cluster count, always including the selected partition
+- Levels ordered by cluster count, not resolution: the count does not grow
+  monotonically with resolution on every backend (python-louvain stops
+  aggregating early at low resolutions, so its bottom rungs can be finer than
+  its top ones), so parent links never rely on it
+- Parent links between consecutive levels (the coarser cluster holding most of
+  each finer cluster's members) with the share of points that agree with them
+- Labels for any level by index, cluster count or resolution in O(n)
+- Plain arrays in the artifact, so older artifacts simply have no hierarchy
+
+Usage:
+    python cluster_hierarchy.py --artifact features.pkl
+    python cluster_hierarchy.py --artifact features.pkl --n-clusters 12 --output labels.json
+"""
+
+import os
+import sys
+import json
+import argparse
+import logging
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Constants
+# Levels of the cluster hierarchy; 0 disables it (each level is one more partition)
+DEFAULT_HIERARCHY_LEVELS = 0
+# Resolution range of the ladder; the target-count search only covers 0.8-3.0
+HIERARCHY_BOUNDS = (0.05, 10.0)
+
+
+def hierarchy_resolutions(n_levels: int) -> List[float]:
+    """Log-spaced ladder of n_levels resolutions over HIERARCHY_BOUNDS, ascending."""
+    return [round(float(r), 6) for r in np.geomspace(*HIERARCHY_BOUNDS, n_levels)]
+
+
+def _dense(labels: np.ndarray) -> np.ndarray:
+    """Relabel to 0..k-1 in order of label value."""
+    return np.unique(labels, return_inverse=True)[1].astype(np.int32)
+
+
+def parent_links(fine: np.ndarray, coarse: np.ndarray) -> Dict[str, Any]:
+    """
+    Link every cluster of a finer partition to the coarser cluster holding most
+    of its members.
+
+    Args:
+        fine: Dense labels of the finer partition
+        coarse: Dense labels of the coarser partition (same points)
+
+    Returns:
+        Dict: 'parents' (coarse cluster per fine cluster) and 'agreement'
+        (share of points whose coarse cluster is their fine cluster's parent)
+    """
+    overlap = np.zeros((fine.max() + 1, coarse.max() + 1), dtype=np.int64)
+    np.add.at(overlap, (fine, coarse), 1)
+    parents = overlap.argmax(axis=1).astype(np.int32)
+    agreement = overlap.max(axis=1).sum() / max(len(fine), 1)
+    return {'parents': parents, 'agreement': float(agreement)}
+
+
+class ClusterHierarchy:
+    """
+    Partitions of the same points at several resolutions, coarse to fine.
+
+    labels[i] holds the cluster labels of level i; parents[i] maps each
+    cluster of level i to a cluster of level i - 1 (parents[0] is empty).
+    Labels are dense, except at the selected level after relabel_selected().
+    """
+
+    def __init__(
+        self,
+        resolutions: np.ndarray,
+        labels: np.ndarray,
+        parents: List[np.ndarray],
+        agreement: np.ndarray,
+        selected: int
+    ):
+        self.resolutions = np.asarray(resolutions, dtype=np.float64)
+        self.labels = np.asarray(labels, dtype=np.int32)
+        self.parents = [np.asarray(p, dtype=np.int32) for p in parents]
+        self.agreement = np.asarray(agreement, dtype=np.float64)
+        self.selected = int(selected)
+
+    @property
+    def n_levels(self) -> int:
+        return len(self.resolutions)
+
+    @property
+    def n_clusters(self) -> List[int]:
+        return [int(len(np.unique(level))) for level in self.labels]
+
+    def level_for(self, n_clusters: Optional[int] = None, resolution: Optional[float] = None) -> int:
+        """
+        Index of the level closest to a cluster count or a resolution
+        (the selected level when neither is given). Ties go to the coarser level.
+        """
+        if n_clusters is not None:
+            return int(np.argmin([abs(k - n_clusters) for k in self.n_clusters]))
+        if resolution is not None:
+            return int(np.argmin(np.abs(self.resolutions - resolution)))
+        return self.selected
+
+    def labels_at(self, level: int) -> np.ndarray:
+        """Cluster label per point at one level."""
+        if not 0 <= level < self.n_levels:
+            raise IndexError(f"Hierarchy has {self.n_levels} levels, level {level} requested")
+        return self.labels[level]
+
+    def expand(self, rows: np.ndarray) -> "ClusterHierarchy":
+        """
+        Hierarchy over other points, each taking the labels of a point of this
+        one (e.g. duplicate forces taking their representative's clusters).
+        """
+        return ClusterHierarchy(self.resolutions, self.labels[:, rows], self.parents, self.agreement, self.selected)
+
+    def relabel_selected(self, labels: np.ndarray) -> "ClusterHierarchy":
+        """
+        Hierarchy whose selected level uses other IDs for the same clusters
+        (e.g. IDs kept from a previous run), with the links to the neighbouring
+        levels rebuilt for those IDs.
+        """
+        levels = self.labels.copy()
+        levels[self.selected] = labels
+        parents = list(self.parents)
+        agreement = self.agreement.copy()
+        for level in (self.selected, self.selected + 1):
+            if 0 < level < self.n_levels:
+                links = parent_links(levels[level], levels[level - 1])
+                parents[level] = links['parents']
+                agreement[level] = links['agreement']
+        return ClusterHierarchy(self.resolutions, levels, parents, agreement, self.selected)
+
+    def levels(self) -> List[Dict[str, Any]]:
+        """JSON-compatible description of every level."""
+        return [
+            {
+                "level": i,
+                "resolution": float(self.resolutions[i]),
+                "n_clusters": n_clusters,
+                "parent_agreement": float(self.agreement[i]) if i else None,
+                "selected": i == self.selected
+            }
+            for i, n_clusters in enumerate(self.n_clusters)
+        ]
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Arrays to store in the features artifact."""
+        return {
+            'hierarchy_resolutions': self.resolutions,
+            'hierarchy_labels': self.labels,
+            'hierarchy_parents': self.parents,
+            'hierarchy_agreement': self.agreement,
+            'hierarchy_selected': self.selected
+        }
+
+    @classmethod
+    def from_artifact(cls, artifact: Dict[str, Any]) -> Optional["ClusterHierarchy"]:
+        """The hierarchy stored in a features artifact, or None for older artifacts."""
+        if 'hierarchy_labels' not in artifact:
+            return None
+        return cls(
+            artifact['hierarchy_resolutions'],
+            artifact['hierarchy_labels'],
+            artifact['hierarchy_parents'],
+            artifact['hierarchy_agreement'],
+            artifact['hierarchy_selected']
+        )
+
+
+def build_hierarchy(partitions: Dict[float, np.ndarray], selected_resolution: float) -> ClusterHierarchy:
+    """
+    Order partitions from coarse to fine and link consecutive levels.
+
+    Levels are ordered by cluster count, whatever their resolutions: a higher
+    resolution may give fewer clusters, depending on the backend and graph.
+    Partitions with the same number of clusters collapse into one level: the
+    selected resolution wins, otherwise the lowest resolution.
+
+    Args:
+        partitions: Labels per resolution
+        selected_resolution: Resolution of the partition the pipeline reports
+
+    Returns:
+        ClusterHierarchy: One level per distinct cluster count
+    """
+    by_count: Dict[int, float] = {}
+    for resolution in sorted(partitions):
+        n_clusters = len(np.unique(partitions[resolution]))
+        if n_clusters not in by_count or resolution == selected_resolution:
+            by_count[n_clusters] = resolution
+    counts = sorted(by_count)
+
+    resolutions = [by_count[k] for k in counts]
+    labels = [_dense(partitions[r]) for r in resolutions]
+    parents = [np.zeros(0, dtype=np.int32)]
+    agreement = [1.0]
+    for coarse, fine in zip(labels, labels[1:]):
+        links = parent_links(fine, coarse)
+        parents.append(links['parents'])
+        agreement.append(links['agreement'])
+
+    hierarchy = ClusterHierarchy(
+        np.array(resolutions),
+        np.vstack(labels) if labels else np.zeros((0, 0), dtype=np.int32),
+        parents,
+        np.array(agreement),
+        resolutions.index(selected_resolution)
+    )
+    logger.info(f"Cluster hierarchy: {hierarchy.n_levels} levels with "
+                f"{', '.join(str(k) for k in hierarchy.n_clusters)} clusters")
+    return hierarchy
+
+
+def main():
+    """
+    Print an artifact's hierarchy levels, or write the labels of one level
+    """
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    from features_artifact import load_features_artifact
+
+    parser = argparse.ArgumentParser(description="ORION Cluster Hierarchy Lookup")
+    parser.add_argument("--artifact", required=True,
+                       help="Features artifact written by orion_preprocessing.py --artifact")
+    parser.add_argument("--n-clusters", type=int, default=None,
+                       help="Level closest to this many clusters")
+    parser.add_argument("--resolution", type=float, default=None,
+                       help="Level closest to this resolution")
+    parser.add_argument("--output", default=None,
+                       help="JSON file for the level's ids and labels (default: list the levels)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    artifact = load_features_artifact(args.artifact)
+    hierarchy = ClusterHierarchy.from_artifact(artifact)
+    if hierarchy is None:
+        logger.error(f"Artifact {args.artifact} has no cluster hierarchy; rerun the pipeline with --hierarchy-levels")
+        sys.exit(1)
+
+    if not args.output:
+        print(json.dumps(hierarchy.levels(), indent=2))
+        return
+
+    level = hierarchy.level_for(args.n_clusters, args.resolution)
+    with open(args.output, "w") as f:
+        json.dump({
+            "id": list(artifact['ids']),
+            "cluster_labels": hierarchy.labels_at(level).tolist(),
+            **hierarchy.levels()[level]
+        }, f)
+    logger.info(f"Level {level} ({hierarchy.n_clusters[level]} clusters) written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,248 @@
+"""
+ORION Deduplication - Exact and near-duplicate collapsing before embedding
+
+Scan imports often contain the same force several times, verbatim or with
+small edits. Every copy used to be embedded, laid out by UMAP and clustered.
+This module groups duplicate preprocessed texts so downstream stages run on
+one representative per group and results are fanned back out to every row.
+
+Key Features:
+- Exact duplicates: identical preprocessed text
+- Near duplicates: MinHash signatures over word shingles, LSH banding for
+  candidate pairs, verified by estimated Jaccard similarity
+- Vectorised NumPy MinHash (multiply-shift hash family, no per-permutation Python loop)
+- Deterministic: shingles hashed with CRC32, permutations from a fixed seed
+- The representative of a group is its first row, so output order is stable
+- Duplicate-group report for analysts
+"""
+
+import zlib
+import logging
+from typing import Any, Dict, List
+
+import numpy as np
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Constants
+DEDUP_MODES = ("off", "exact", "near")
+DEFAULT_THRESHOLD = 0.9
+DEFAULT_NUM_PERM = 64
+DEFAULT_BANDS = 16
+SHINGLE_SIZE = 2
+# Shingle x permutation hashes computed per chunk (bounds memory)
+HASH_CHUNK_ELEMENTS = 1 << 22
+
+_SHIFT = np.uint64(32)
+
+
+class DuplicateGroups:
+    """
+    Mapping between all rows and their unique representatives.
+
+    Attributes:
+        representatives: Sorted row indices kept for downstream stages
+        inverse: For every row, the position of its representative in representatives
+        exact: For every row, whether it is an exact copy of its representative
+        similarity: For every row, estimated Jaccard similarity to its representative
+    """
+
+    def __init__(
+        self,
+        representatives: np.ndarray,
+        inverse: np.ndarray,
+        exact: np.ndarray,
+        similarity: np.ndarray
+    ):
+        self.representatives = representatives
+        self.inverse = inverse
+        self.exact = exact
+        self.similarity = similarity
+
+    @classmethod
+    def identity(cls, n_rows: int) -> "DuplicateGroups":
+        """No collapsing: every row represents itself."""
+        rows = np.arange(n_rows)
+        return cls(rows, rows.copy(), np.ones(n_rows, dtype=bool), np.ones(n_rows, dtype=np.float32))
+
+    @property
+    def n_rows(self) -> int:
+        return len(self.inverse)
+
+    @property
+    def n_unique(self) -> int:
+        return len(self.representatives)
+
+    @property
+    def sizes(self) -> np.ndarray:
+        """Rows per representative (1 for forces without duplicates)."""
+        return np.bincount(self.inverse, minlength=self.n_unique)
+
+    def expand(self, values: np.ndarray) -> np.ndarray:
+        """Fan per-representative values back out to every row."""
+        return np.asarray(values)[self.inverse]
+
+    def groups(self) -> List[Dict[str, Any]]:
+        """
+        Groups with more than one row, largest first.
+
+        Returns:
+            List: Dicts with representative (row), members (rows, representative
+            included), exact (all members identical) and min_similarity
+        """
+        counts = self.sizes
+        order = np.argsort(self.inverse, kind="stable")
+        bounds = np.concatenate([[0], np.cumsum(counts)])
+
+        report = []
+        for position in np.where(counts > 1)[0]:
+            members = order[bounds[position]:bounds[position + 1]]
+            report.append({
+                "representative": int(self.representatives[position]),
+                "members": members.tolist(),
+                "exact": bool(self.exact[members].all()),
+                "min_similarity": float(self.similarity[members].min())
+            })
+        report.sort(key=lambda group: (-len(group["members"]), group["representative"]))
+        return report
+
+
+def _shingle_hashes(text: str, size: int = SHINGLE_SIZE) -> np.ndarray:
+    """CRC32 of each distinct word shingle; short texts form a single shingle."""
+    words = text.split()
+    if len(words) <= size:
+        shingles = {" ".join(words)}
+    else:
+        shingles = {" ".join(words[i:i + size]) for i in range(len(words) - size + 1)}
+    return np.fromiter((zlib.crc32(s.encode("utf-8")) for s in shingles), dtype=np.uint64, count=len(shingles))
+
+
+def minhash_signatures(texts: List[str], num_perm: int = DEFAULT_NUM_PERM, seed: int = 0) -> np.ndarray:
+    """
+    MinHash signature per text.
+
+    Args:
+        texts: Preprocessed texts
+        num_perm: Signature length (hash functions)
+        seed: Seed for the hash functions
+
+    Returns:
+        np.ndarray: (n_texts, num_perm) uint64 signatures
+    """
+    # Multiply-shift hashes of the 32-bit shingle ids: (a * x + b) mod 2^64 >> 32, a odd
+    rng = np.random.default_rng(seed)
+    multipliers = rng.integers(0, np.iinfo(np.int64).max, size=num_perm, dtype=np.int64).astype(np.uint64) | np.uint64(1)
+    increments = rng.integers(0, np.iinfo(np.int64).max, size=num_perm, dtype=np.int64).astype(np.uint64)
+    shingles = [_shingle_hashes(text) for text in texts]
+    signatures = np.empty((len(texts), num_perm), dtype=np.uint64)
+
+    start = 0
+    while start < len(texts):
+        # Take texts until the chunk's shingle x permutation matrix is full
+        stop, n_hashes = start, 0
+        while stop < len(texts) and (stop == start or n_hashes + len(shingles[stop]) * num_perm <= HASH_CHUNK_ELEMENTS):
+            n_hashes += len(shingles[stop]) * num_perm
+            stop += 1
+
+        chunk = np.concatenate(shingles[start:stop])
+        offsets = np.cumsum([0] + [len(s) for s in shingles[start:stop - 1]])
+        hashed = (chunk[:, None] * multipliers[None, :] + increments[None, :]) >> _SHIFT
+        signatures[start:stop] = np.minimum.reduceat(hashed, offsets, axis=0)
+        start = stop
+
+    return signatures
+
+
+def _lsh_candidate_pairs(signatures: np.ndarray, bands: int) -> np.ndarray:
+    """
+    Pairs (row, anchor) sharing an LSH bucket; anchor is the lowest row in the bucket.
+    """
+    n, num_perm = signatures.shape
+    rows_per_band = num_perm // bands
+    pairs = []
+    for band in range(bands):
+        block = signatures[:, band * rows_per_band:(band + 1) * rows_per_band]
+        _, bucket = np.unique(block, axis=0, return_inverse=True)
+        bucket = bucket.ravel()
+        order = np.argsort(bucket, kind="stable")
+        sorted_buckets = bucket[order]
+        is_first = np.concatenate([[True], sorted_buckets[1:] != sorted_buckets[:-1]])
+        anchors = order[np.maximum.accumulate(np.where(is_first, np.arange(n), 0))]
+        linked = anchors != order
+        pairs.append(np.stack([order[linked], anchors[linked]], axis=1))
+
+    if not pairs:
+        return np.empty((0, 2), dtype=np.int64)
+    return np.unique(np.concatenate(pairs), axis=0)
+
+
+def find_duplicates(
+    texts: List[str],
+    mode: str = "near",
+    threshold: float = DEFAULT_THRESHOLD,
+    num_perm: int = DEFAULT_NUM_PERM,
+    bands: int = DEFAULT_BANDS,
+    seed: int = 0
+) -> DuplicateGroups:
+    """
+    Group exact and (optionally) near-duplicate texts.
+
+    Args:
+        texts: Preprocessed texts, one per row
+        mode: "off", "exact" or "near"
+        threshold: Minimum estimated Jaccard similarity of word shingles for near duplicates
+        num_perm: MinHash signature length
+        bands: LSH bands (num_perm must be divisible by bands)
+        seed: Seed for the MinHash hash functions
+
+    Returns:
+        DuplicateGroups: Representatives and the row -> representative mapping
+    """
+    if mode not in DEDUP_MODES:
+        raise ValueError(f"Unknown dedup mode {mode!r}, expected one of {DEDUP_MODES}")
+    if num_perm % bands:
+        raise ValueError(f"num_perm ({num_perm}) must be divisible by bands ({bands})")
+
+    n_rows = len(texts)
+    if mode == "off" or n_rows == 0:
+        return DuplicateGroups.identity(n_rows)
+
+    # Exact duplicates: first occurrence of each text
+    first_row: Dict[str, int] = {}
+    exact_of = np.fromiter((first_row.setdefault(text, i) for i, text in enumerate(texts)), dtype=np.int64, count=n_rows)
+    unique_rows = np.unique(exact_of)
+    root = exact_of.copy()
+    similarity = np.ones(n_rows, dtype=np.float32)
+
+    if mode == "near" and len(unique_rows) > 1:
+        signatures = minhash_signatures([texts[i] for i in unique_rows], num_perm=num_perm, seed=seed)
+        pairs = _lsh_candidate_pairs(signatures, bands)
+        if len(pairs):
+            estimated = (signatures[pairs[:, 0]] == signatures[pairs[:, 1]]).mean(axis=1)
+            pairs = pairs[estimated >= threshold]
+
+        if len(pairs):
+            from scipy.sparse import coo_matrix
+            from scipy.sparse.csgraph import connected_components
+
+            n_unique = len(unique_rows)
+            graph = coo_matrix((np.ones(len(pairs)), (pairs[:, 0], pairs[:, 1])), shape=(n_unique, n_unique))
+            _, component = connected_components(graph, directed=False)
+            # Representative of a component: its lowest row (unique_rows is sorted)
+            component_root = np.full(component.max() + 1, n_unique)
+            np.minimum.at(component_root, component, np.arange(n_unique))
+            near_root = component_root[component]
+
+            position_of = np.searchsorted(unique_rows, exact_of)
+            root = unique_rows[near_root[position_of]]
+            similarity = (
+                signatures[position_of] == signatures[near_root[position_of]]
+            ).mean(axis=1).astype(np.float32)
+
+    representatives, inverse = np.unique(root, return_inverse=True)
+    result = DuplicateGroups(representatives, inverse.ravel(), exact_of == root, similarity)
+    logger.info(f"Deduplication ({mode}): {n_rows} rows -> {result.n_unique} unique "
+                f"({int(np.sum(exact_of != np.arange(n_rows)))} exact copies, "
+                f"{int(np.sum(exact_of != root))} near duplicates)")
+    return result
@@ -0,0 +1,357 @@
+#!/usr/bin/env python3
+"""
+ORION Embedding Backends - Selectable CPU inference runtimes for the sentence embedder
+
+SentenceTransformer(model).encode runs fp32 PyTorch with a fixed batch size of
+32. On CPU-only hosts most of that time is spent in fp32 matrix multiplies and
+on padding tokens. This module loads the embedder on a selectable runtime and
+encodes with length-sorted, token-budgeted batches.
+
+Key Features:
+- Backends: "torch" (fp32 PyTorch, the reference), "onnx" (ONNX Runtime fp32)
+  and "onnx-int8" (dynamically quantized int8 ONNX Runtime)
+- int8 weights matched to the CPU (AVX-512 VNNI, AVX2 or ARM64); taken from the
+  model repository when published there, otherwise exported and quantized once
+  into a local directory
+- Configurable max sequence length
+- Length-sorted batching under a token budget: short texts share large
+  batches, long texts get small ones, and padding stays minimal
+- Parity check reporting cosine drift, neighbour recall and throughput
+  against the fp32 reference
+
+Usage:
+    python embedding_backends.py --input forces.ndjson --backend onnx-int8 --sample-size 2000
+"""
+
+import os
+import re
+import sys
+import time
+import platform
+import argparse
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Constants
+EMBEDDING_BACKENDS = ("torch", "onnx", "onnx-int8")
+DEFAULT_TOKEN_BUDGET = 8192
+MAX_BATCH_SIZE = 256
+# Rough WordPiece tokens per whitespace word, plus [CLS]/[SEP]
+TOKENS_PER_WORD = 1.3
+SPECIAL_TOKENS = 2
+
+# Pre-quantized files published in sentence-transformers model repositories
+ONNX_INT8_FILES = {
+    "avx512_vnni": "onnx/model_qint8_avx512_vnni.onnx",
+    "avx2": "onnx/model_quint8_avx2.onnx",
+    "arm64": "onnx/model_qint8_arm64.onnx"
+}
+DEFAULT_QUANTIZED_DIR = os.path.join(os.path.expanduser("~"), ".cache", "orion", "onnx-int8")
+
+
+class EmbeddingBackendError(Exception):
+    """Raised when an embedding backend cannot be loaded"""
+    pass
+
+
+def cpu_quantization_target() -> str:
+    """int8 kernel family for this CPU: avx512_vnni, avx2 or arm64."""
+    if platform.machine().lower() in ("arm64", "aarch64"):
+        return "arm64"
+    try:
+        with open("/proc/cpuinfo", "r") as f:
+            flags = f.read()
+    except OSError:
+        return "avx2"
+    return "avx512_vnni" if "avx512_vnni" in flags else "avx2"
+
+
+def _load_onnx_int8(model_name: str, quantized_dir: Optional[str], **model_kwargs) -> Any:
+    from sentence_transformers import SentenceTransformer
+
+    target = cpu_quantization_target()
+    try:
+        return SentenceTransformer(
+            model_name,
+            backend="onnx",
+            model_kwargs={"file_name": ONNX_INT8_FILES[target]},
+            **model_kwargs
+        )
+    except Exception as e:
+        logger.info(f"No published {target} int8 ONNX file for {model_name} ({e}); quantizing locally")
+
+    # Export to ONNX, quantize once and reuse the local copy afterwards
+    from sentence_transformers import export_dynamic_quantized_onnx_model
+
+    slug = re.sub(r"[^A-Za-z0-9_.-]+", "_", model_name).strip("_.")
+    directory = os.path.join(quantized_dir or DEFAULT_QUANTIZED_DIR, slug)
+    file_name = ONNX_INT8_FILES[target]
+    if not os.path.exists(os.path.join(directory, file_name)):
+        onnx_model = SentenceTransformer(model_name, backend="onnx", **model_kwargs)
+        onnx_model.save_pretrained(directory)
+        export_dynamic_quantized_onnx_model(onnx_model, target, directory)
+    return SentenceTransformer(directory, backend="onnx", model_kwargs={"file_name": file_name}, **model_kwargs)
+
+
+def load_embedder(
+    model_name: str,
+    backend: str = "torch",
+    max_seq_length: Optional[int] = None,
+    quantized_dir: Optional[str] = None,
+    **model_kwargs
+) -> Any:
+    """
+    Load a SentenceTransformer on the requested runtime.
+
+    Args:
+        model_name: Hub model name or local path
+        backend: One of EMBEDDING_BACKENDS
+        max_seq_length: Truncate inputs to this many tokens (default: model setting)
+        quantized_dir: Where locally quantized int8 models are kept
+        **model_kwargs: Passed to SentenceTransformer (e.g. device)
+
+    Returns:
+        SentenceTransformer: Loaded model
+    """
+    if backend not in EMBEDDING_BACKENDS:
+        raise ValueError(f"Unknown embedding backend {backend!r}, expected one of {EMBEDDING_BACKENDS}")
+
+    from sentence_transformers import SentenceTransformer
+
+    try:
+        if backend == "torch":
+            model = SentenceTransformer(model_name, **model_kwargs)
+        elif backend == "onnx":
+            model = SentenceTransformer(model_name, backend="onnx", **model_kwargs)
+        else:
+            model = _load_onnx_int8(model_name, quantized_dir, **model_kwargs)
+    except ImportError as e:
+        raise EmbeddingBackendError(
+            f"Backend {backend!r} needs ONNX Runtime support: pip install 'sentence-transformers[onnx]' ({e})"
+        )
+
+    if max_seq_length:
+        model.max_seq_length = max_seq_length
+    logger.info(f"Loaded {model_name} on {backend} (max_seq_length={getattr(model, 'max_seq_length', None)})")
+    return model
+
+
+def estimate_token_lengths(embedder: Any, texts: List[str]) -> np.ndarray:
+    """
+    Cheap token count estimate per text (no second tokenizer pass), capped at
+    the embedder's max_seq_length.
+    """
+    words = np.fromiter((len(text.split()) for text in texts), dtype=np.float64, count=len(texts))
+    lengths = np.ceil(words * TOKENS_PER_WORD).astype(np.int64) + SPECIAL_TOKENS
+    max_seq_length = getattr(embedder, "max_seq_length", None)
+    return np.minimum(lengths, max_seq_length) if max_seq_length else lengths
+
+
+def token_budget_batches(
+    sorted_lengths: np.ndarray,
+    token_budget: int = DEFAULT_TOKEN_BUDGET,
+    max_batch_size: int = MAX_BATCH_SIZE
+) -> List[Tuple[int, int]]:
+    """
+    Split lengths sorted longest-first into (start, stop) batches whose padded
+    size (batch size x longest text) stays within the token budget.
+    """
+    batches = []
+    start = 0
+    n = len(sorted_lengths)
+    while start < n:
+        # The first text of a batch is its longest
+        size = max(1, min(max_batch_size, token_budget // max(int(sorted_lengths[start]), 1)))
+        stop = min(n, start + size)
+        batches.append((start, stop))
+        start = stop
+    return batches
+
+
+def encode_texts(
+    embedder: Any,
+    texts: List[str],
+    token_budget: int = DEFAULT_TOKEN_BUDGET,
+    max_batch_size: int = MAX_BATCH_SIZE
+) -> np.ndarray:
+    """
+    Encode texts in length-sorted, token-budgeted batches.
+
+    Args:
+        embedder: Object with a SentenceTransformer-compatible encode()
+        texts: Texts to encode
+        token_budget: Maximum padded tokens per batch
+        max_batch_size: Upper bound on texts per batch
+
+    Returns:
+        np.ndarray: float32 embeddings in input order
+    """
+    if not texts:
+        dim = embedder.get_sentence_embedding_dimension()
+        return np.zeros((0, dim), dtype=np.float32)
+
+    started = time.perf_counter()
+    lengths = estimate_token_lengths(embedder, texts)
+    order = np.argsort(-lengths, kind="stable")
+    batches = token_budget_batches(lengths[order], token_budget, max_batch_size)
+
+    embeddings = None
+    next_report = 0.1
+    for batch_index, (start, stop) in enumerate(batches):
+        rows = order[start:stop]
+        vectors = embedder.encode(
+            [texts[i] for i in rows],
+            batch_size=len(rows),
+            show_progress_bar=False,
+            convert_to_numpy=True
+        )
+        if embeddings is None:
+            embeddings = np.empty((len(texts), vectors.shape[1]), dtype=np.float32)
+        embeddings[rows] = vectors
+
+        if stop / len(texts) >= next_report:
+            logger.info(f"Encoded {stop}/{len(texts)} texts ({batch_index + 1}/{len(batches)} batches)")
+            next_report = np.floor(stop / len(texts) * 10) / 10 + 0.1
+
+    elapsed = time.perf_counter() - started
+    logger.info(f"Encoded {len(texts)} texts in {elapsed:.2f}s ({len(texts) / max(elapsed, 1e-9):.1f} docs/s)")
+    return embeddings
+
+
+def cosine_drift(reference: np.ndarray, candidate: np.ndarray, n_neighbors: int = 10) -> Dict[str, float]:
+    """
+    Compare candidate embeddings against reference embeddings of the same texts.
+
+    Returns:
+        Dict: mean/min cosine similarity per text, mean/p99/max drift (1 - cosine),
+        and recall of each text's reference top-n_neighbors under the candidate
+    """
+    def unit(vectors):
+        vectors = np.asarray(vectors, dtype=np.float64)
+        return vectors / np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+
+    reference, candidate = unit(reference), unit(candidate)
+    cosine = np.sum(reference * candidate, axis=1)
+    drift = 1.0 - cosine
+
+    report = {
+        "n_texts": int(len(cosine)),
+        "mean_cosine": float(cosine.mean()),
+        "min_cosine": float(cosine.min()),
+        "mean_drift": float(drift.mean()),
+        "p99_drift": float(np.percentile(drift, 99)),
+        "max_drift": float(drift.max())
+    }
+
+    k = min(n_neighbors, len(cosine) - 1)
+    if k > 0:
+        def top_k(vectors):
+            similarity = vectors @ vectors.T
+            np.fill_diagonal(similarity, -np.inf)
+            return np.argpartition(-similarity, k, axis=1)[:, :k]
+
+        ref_neighbors, cand_neighbors = top_k(reference), top_k(candidate)
+        overlap = [len(np.intersect1d(a, b)) for a, b in zip(ref_neighbors, cand_neighbors)]
+        report[f"recall_at_{k}"] = float(np.mean(overlap) / k)
+
+    return report
+
+
+def parity_check(
+    model_name: str,
+    texts: List[str],
+    backend: str = "onnx-int8",
+    sample_size: int = 2000,
+    max_seq_length: Optional[int] = None,
+    token_budget: int = DEFAULT_TOKEN_BUDGET,
+    random_state: int = 0,
+    reference: Optional[Any] = None
+) -> Dict[str, Any]:
+    """
+    Encode a sample with the fp32 torch reference and the candidate backend and
+    compare embeddings and throughput. An already loaded torch model can be
+    passed as reference; its max_seq_length is restored afterwards.
+
+    Returns:
+        Dict: cosine_drift() report plus docs/s for both backends and the speedup
+    """
+    rng = np.random.default_rng(random_state)
+    if len(texts) > sample_size:
+        texts = [texts[i] for i in np.sort(rng.choice(len(texts), sample_size, replace=False))]
+
+    timings = {}
+    embeddings = {}
+    reference_length = reference.max_seq_length if reference is not None else None
+    try:
+        for name in ("torch", backend):
+            if name == "torch" and reference is not None:
+                model = reference
+                if max_seq_length:
+                    model.max_seq_length = max_seq_length
+            else:
+                model = load_embedder(model_name, name, max_seq_length=max_seq_length)
+            encode_texts(model, texts[:min(len(texts), 64)], token_budget)  # warm-up
+            started = time.perf_counter()
+            embeddings[name] = encode_texts(model, texts, token_budget)
+            timings[name] = len(texts) / max(time.perf_counter() - started, 1e-9)
+    finally:
+        if reference is not None:
+            reference.max_seq_length = reference_length
+
+    report = cosine_drift(embeddings["torch"], embeddings[backend])
+    report.update({
+        "backend": backend,
+        "reference_docs_per_s": timings["torch"],
+        "backend_docs_per_s": timings[backend],
+        "speedup": timings[backend] / timings["torch"]
+    })
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ORION embedding backend parity check")
+    parser.add_argument("--input", required=True, help="Forces file (NDJSON or JSON array)")
+    parser.add_argument("--backend", choices=EMBEDDING_BACKENDS, default="onnx-int8",
+                       help="Backend compared against the fp32 torch reference")
+    parser.add_argument("--sample-size", type=int, default=2000, help="Texts to encode")
+    parser.add_argument("--max-seq-length", type=int, default=None, help="Token limit per text")
+    parser.add_argument("--token-budget", type=int, default=DEFAULT_TOKEN_BUDGET,
+                       help="Padded tokens per batch")
+    parser.add_argument("--model-path", default=None,
+                       help="Local directory with a copy of the model (nothing is downloaded)")
+    args = parser.parse_args()
+
+    # Texts are prepared exactly as the pipeline prepares them
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    from orion_preprocessing import OrionPreprocessor
+    from results_io import load_forces
+
+    preprocessor = OrionPreprocessor(embedding_backend="torch", model_path=args.model_path)
+    preprocessor.initialize_models(load_keybert=False)
+    texts = preprocessor.prepare_texts(load_forces(args.input))
+
+    report = parity_check(
+        preprocessor.model_source,
+        texts,
+        backend=args.backend,
+        sample_size=args.sample_size,
+        max_seq_length=args.max_seq_length,
+        token_budget=args.token_budget,
+        reference=preprocessor.embedder
+    )
+
+    print("\n" + "="*50)
+    print(f"EMBEDDING PARITY: {args.backend} vs torch fp32")
+    print("="*50)
+    for key, value in report.items():
+        print(f"{key:<22} {value:.6f}" if isinstance(value, float) else f"{key:<22} {value}")
+    print("="*50)
+
+
+if __name__ == "__main__":
+    main()
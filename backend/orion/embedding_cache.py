@@ -0,0 +1,214 @@
+"""
+ORION Embedding Cache - Content-addressed on-disk store for sentence embeddings
+
+This module keeps sentence embeddings between preprocessing runs so that only
+texts which have never been encoded before are sent to the embedding model.
+
+Key Features:
+- Entries keyed by SHA256 of the model name plus the preprocessed text
+- Vectors stored in a flat float32 file that is read through np.memmap
+- Append-only writes (vectors first, keys second) so a crashed run never
+  leaves a key pointing at a missing vector
+- One sub-directory per model so different embedders never collide
+
+Layout:
+    <cache_dir>/<model_slug>/meta.json     - model name and embedding dimension
+    <cache_dir>/<model_slug>/keys.txt      - one hex digest per line, row order
+    <cache_dir>/<model_slug>/vectors.f32   - row-major float32 vectors
+
+Environment Variables:
+- ORION_EMBEDDING_CACHE: Default cache directory used by orion_preprocessing.py
+"""
+
+import os
+import re
+import json
+import hashlib
+import logging
+from typing import Dict, List, Optional
+
+import numpy as np
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Constants
+VECTOR_DTYPE = np.dtype("<f4")
+META_FILE = "meta.json"
+KEYS_FILE = "keys.txt"
+VECTORS_FILE = "vectors.f32"
+
+
+class EmbeddingCacheError(Exception):
+    """Raised when the cache on disk does not match the requested model"""
+    pass
+
+
+def _model_slug(model_name: str) -> str:
+    """Turn a model name or path into a safe directory name."""
+    slug = re.sub(r"[^A-Za-z0-9_.-]+", "_", model_name).strip("_.")
+    return slug or "model"
+
+
+class EmbeddingCache:
+    """
+    Persistent, content-addressed embedding store for a single model.
+    """
+
+    def __init__(self, cache_dir: str, model_name: str):
+        self.model_name = model_name
+        self.directory = os.path.join(cache_dir, _model_slug(model_name))
+        self.dim: Optional[int] = None
+        self._index: Dict[str, int] = {}
+        self._vectors: Optional[np.memmap] = None
+
+        os.makedirs(self.directory, exist_ok=True)
+        self._load()
+
+    @property
+    def _meta_path(self) -> str:
+        return os.path.join(self.directory, META_FILE)
+
+    @property
+    def _keys_path(self) -> str:
+        return os.path.join(self.directory, KEYS_FILE)
+
+    @property
+    def _vectors_path(self) -> str:
+        return os.path.join(self.directory, VECTORS_FILE)
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def key(self, text: str) -> str:
+        """
+        Content address for a preprocessed text under this cache's model.
+        """
+        digest = hashlib.sha256()
+        digest.update(self.model_name.encode("utf-8"))
+        digest.update(b"\0")
+        digest.update(text.encode("utf-8"))
+        return digest.hexdigest()
+
+    def _load(self) -> None:
+        """Read metadata and keys, repairing a torn tail from an interrupted write."""
+        if not os.path.exists(self._meta_path):
+            return
+
+        with open(self._meta_path, "r") as f:
+            meta = json.load(f)
+
+        if meta.get("model_name") != self.model_name:
+            raise EmbeddingCacheError(
+                f"Cache at {self.directory} belongs to model {meta.get('model_name')!r}, "
+                f"not {self.model_name!r}"
+            )
+        self.dim = int(meta["dim"])
+
+        keys: List[str] = []
+        torn_keys = False
+        if os.path.exists(self._keys_path):
+            with open(self._keys_path, "r") as f:
+                content = f.read()
+            # A partially written final line has no trailing newline - drop it
+            keys = content.split("\n")[:-1] if content else []
+            torn_keys = bool(content) and not content.endswith("\n")
+
+        row_bytes = self.dim * VECTOR_DTYPE.itemsize
+        vectors_size = os.path.getsize(self._vectors_path) if os.path.exists(self._vectors_path) else 0
+        n_rows = min(len(keys), vectors_size // row_bytes)
+
+        if torn_keys or n_rows != len(keys) or vectors_size != n_rows * row_bytes:
+            logger.warning(f"Repairing embedding cache tail: keeping {n_rows} consistent rows")
+            keys = keys[:n_rows]
+            with open(self._keys_path, "w") as f:
+                f.write("".join(k + "\n" for k in keys))
+            if os.path.exists(self._vectors_path):
+                with open(self._vectors_path, "r+b") as f:
+                    f.truncate(n_rows * row_bytes)
+
+        self._index = {k: i for i, k in enumerate(keys)}
+        self._vectors = None
+        logger.info(f"Embedding cache loaded: {n_rows} vectors (dim={self.dim}) from {self.directory}")
+
+    def _mapped_vectors(self) -> Optional[np.memmap]:
+        """Memory-map the vector file, remapping when rows were appended."""
+        if not self._index or self.dim is None:
+            return None
+        if self._vectors is None or self._vectors.shape[0] != len(self._index):
+            self._vectors = np.memmap(
+                self._vectors_path,
+                dtype=VECTOR_DTYPE,
+                mode="r",
+                shape=(len(self._index), self.dim)
+            )
+        return self._vectors
+
+    def lookup(self, keys: List[str]) -> np.ndarray:
+        """
+        Map keys to cache rows.
+
+        Args:
+            keys: Content addresses produced by key()
+
+        Returns:
+            np.ndarray: Row index per key, -1 where the key is not cached
+        """
+        return np.array([self._index.get(k, -1) for k in keys], dtype=np.int64)
+
+    def get(self, rows: np.ndarray) -> np.ndarray:
+        """
+        Copy cached vectors for the given rows into a regular float32 array.
+        """
+        vectors = self._mapped_vectors()
+        if vectors is None:
+            raise KeyError("Embedding cache is empty")
+        return np.asarray(vectors[rows], dtype=np.float32)
+
+    def add(self, keys: List[str], vectors: np.ndarray) -> None:
+        """
+        Append new entries. Keys already present are skipped.
+
+        Args:
+            keys: Content addresses for each row of vectors
+            vectors: 2D array of embeddings aligned with keys
+        """
+        vectors = np.asarray(vectors, dtype=VECTOR_DTYPE)
+        if vectors.ndim != 2 or len(keys) != vectors.shape[0]:
+            raise ValueError("keys and vectors must have matching lengths")
+
+        if self.dim is None:
+            self.dim = int(vectors.shape[1])
+            with open(self._meta_path, "w") as f:
+                json.dump({"model_name": self.model_name, "dim": self.dim, "dtype": VECTOR_DTYPE.str}, f)
+        elif vectors.shape[1] != self.dim:
+            raise EmbeddingCacheError(f"Embedding dimension {vectors.shape[1]} does not match cache dimension {self.dim}")
+
+        new_rows = []
+        new_keys = []
+        seen = set()
+        for i, k in enumerate(keys):
+            if k in self._index or k in seen:
+                continue
+            seen.add(k)
+            new_rows.append(i)
+            new_keys.append(k)
+
+        if not new_keys:
+            return
+
+        # Vectors first: a crash between the two writes leaves orphan vectors,
+        # which _load() truncates, never keys without vectors
+        with open(self._vectors_path, "ab") as f:
+            f.write(np.ascontiguousarray(vectors[new_rows]).tobytes())
+            f.flush()
+            os.fsync(f.fileno())
+        with open(self._keys_path, "a") as f:
+            f.write("".join(k + "\n" for k in new_keys))
+
+        start = len(self._index)
+        for offset, k in enumerate(new_keys):
+            self._index[k] = start + offset
+        self._vectors = None
+
+        logger.info(f"Embedding cache: added {len(new_keys)} vectors (total {len(self._index)})")
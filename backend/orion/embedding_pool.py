@@ -0,0 +1,237 @@
+"""
+ORION Embedding Pool - Multi-process sentence embedding for large corpora
+
+A single encode() call in one PyTorch process does not keep a 32-vCPU host
+busy: intra-op parallelism flattens out well before that. The pool runs
+several embedder processes side by side, each pinned to its own cores with
+its own thread cap, and streams their shards into one preallocated array.
+
+Key Features:
+- Shards of the text list encoded by N spawned worker processes
+- Each worker pinned to a disjoint core subset (sched_setaffinity, Linux) with
+  torch / OpenMP threads capped to the size of that subset
+- Workers write their rows straight into a shared-memory float32 array (or
+  into a memory-mapped embedding file); only timings travel back through the
+  result queue
+- Per-shard callback (wall/CPU time, worker pid) for progress and profiling
+- Same loader and length-sorted batching as the single-process path
+"""
+
+import os
+import time
+import logging
+import multiprocessing
+from multiprocessing import shared_memory
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+try:
+    from .embedding_backends import DEFAULT_TOKEN_BUDGET, load_embedder, encode_texts
+except ImportError:
+    from embedding_backends import DEFAULT_TOKEN_BUDGET, load_embedder, encode_texts
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Constants
+DEFAULT_SHARD_SIZE = 2048
+# Below this many texts the pool start-up (one model load per worker) does not pay off
+MIN_POOL_TEXTS = 5000
+
+# Embedder held by each worker process (set by the pool initializer)
+_WORKER_EMBEDDER = None
+_WORKER_TOKEN_BUDGET = DEFAULT_TOKEN_BUDGET
+
+
+def available_cores() -> List[int]:
+    """CPU ids this process may run on."""
+    try:
+        return sorted(os.sched_getaffinity(0))
+    except AttributeError:
+        return list(range(os.cpu_count() or 1))
+
+
+def _init_worker(slot_counter, cores_per_worker: int, load_options: Dict[str, Any], token_budget: int) -> None:
+    """Pool initializer: pin this worker to its cores, cap threads, load the model."""
+    global _WORKER_EMBEDDER, _WORKER_TOKEN_BUDGET
+
+    with slot_counter.get_lock():
+        slot = slot_counter.value
+        slot_counter.value += 1
+
+    cores = available_cores()
+    if cores_per_worker * (slot + 1) <= len(cores):
+        cores = cores[slot * cores_per_worker:(slot + 1) * cores_per_worker]
+        if hasattr(os, "sched_setaffinity"):
+            os.sched_setaffinity(0, cores)
+
+    threads = str(min(cores_per_worker, len(cores)))
+    for variable in ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS"):
+        os.environ[variable] = threads
+    try:
+        import torch
+        torch.set_num_threads(int(threads))
+    except ImportError:
+        pass
+
+    _WORKER_EMBEDDER = load_embedder(**load_options)
+    _WORKER_TOKEN_BUDGET = token_budget
+
+
+def _worker_dimension() -> int:
+    return _WORKER_EMBEDDER.get_sentence_embedding_dimension()
+
+
+def _encode_shard(shard: int, start: int, texts: List[str], target: Tuple[str, str], shape) -> Dict[str, Any]:
+    """
+    Encode one shard and write it into rows [start, start + len(texts)) of the
+    output, given as ("shm", shared memory name) or ("file", memmap path).
+    """
+    started_at = time.time()
+    wall_start = time.perf_counter()
+    cpu_start = time.process_time()
+
+    vectors = encode_texts(_WORKER_EMBEDDER, texts, token_budget=_WORKER_TOKEN_BUDGET)
+
+    kind, name = target
+    if kind == "file":
+        output = np.memmap(name, dtype=np.float32, mode="r+", shape=shape)
+        output[start:start + len(texts)] = vectors
+        output.flush()
+        del output
+    else:
+        memory = shared_memory.SharedMemory(name=name)
+        try:
+            output = np.ndarray(shape, dtype=np.float32, buffer=memory.buf)
+            output[start:start + len(texts)] = vectors
+            del output
+        finally:
+            memory.close()
+
+    return {
+        "shard": shard,
+        "n_texts": len(texts),
+        "started_at": started_at,
+        "wall_s": time.perf_counter() - wall_start,
+        "cpu_s": time.process_time() - cpu_start,
+        "pid": os.getpid()
+    }
+
+
+class EmbeddingPool:
+    """
+    Worker processes with warm embedders, used as a context manager.
+    """
+
+    def __init__(
+        self,
+        model_name: str,
+        backend: str = "torch",
+        max_seq_length: Optional[int] = None,
+        n_workers: int = 2,
+        cores_per_worker: Optional[int] = None,
+        token_budget: int = DEFAULT_TOKEN_BUDGET,
+        shard_size: int = DEFAULT_SHARD_SIZE
+    ):
+        self.n_workers = max(1, n_workers)
+        self.cores_per_worker = cores_per_worker or max(1, len(available_cores()) // self.n_workers)
+        self.shard_size = shard_size
+        self._load_options = {"model_name": model_name, "backend": backend, "max_seq_length": max_seq_length}
+        self._token_budget = token_budget
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._dim: Optional[int] = None
+
+    def __enter__(self) -> "EmbeddingPool":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def _start(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            context = multiprocessing.get_context("spawn")
+            logger.info(f"Starting {self.n_workers} embedding workers "
+                        f"({self.cores_per_worker} cores each)...")
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.n_workers,
+                mp_context=context,
+                initializer=_init_worker,
+                initargs=(context.Value("i", 0), self.cores_per_worker, self._load_options, self._token_budget)
+            )
+            self._dim = self._executor.submit(_worker_dimension).result()
+        return self._executor
+
+    @property
+    def dimension(self) -> int:
+        """Embedding dimension (starts the workers)."""
+        self._start()
+        return self._dim
+
+    def encode(
+        self,
+        texts: List[str],
+        on_shard: Optional[Callable[[Dict[str, Any]], None]] = None,
+        out: Optional[np.memmap] = None
+    ) -> np.ndarray:
+        """
+        Encode texts across the workers.
+
+        Args:
+            texts: Texts to encode
+            on_shard: Called in this process with each finished shard's timing
+                (shard, n_texts, started_at, wall_s, cpu_s, pid, done, n_shards)
+            out: Writable memory mapping of a whole (len(texts) x dimension)
+                float32 file; workers write into it directly and it is returned
+
+        Returns:
+            np.ndarray: float32 embeddings in input order
+        """
+        executor = self._start()
+        shape = (len(texts), self._dim)
+        if not texts:
+            return np.zeros(shape, dtype=np.float32) if out is None else out
+        if out is not None:
+            if out.shape != shape or out.offset != 0:
+                raise ValueError(f"Output mapping {out.shape} does not match {shape}")
+            self._run_shards(executor, texts, ("file", out.filename), shape, on_shard)
+            return out
+
+        memory = shared_memory.SharedMemory(create=True, size=max(1, len(texts) * self._dim * 4))
+        try:
+            self._run_shards(executor, texts, ("shm", memory.name), shape, on_shard)
+            return np.ndarray(shape, dtype=np.float32, buffer=memory.buf).copy()
+        finally:
+            memory.close()
+            memory.unlink()
+
+    def _run_shards(
+        self,
+        executor: ProcessPoolExecutor,
+        texts: List[str],
+        target: Tuple[str, str],
+        shape,
+        on_shard: Optional[Callable[[Dict[str, Any]], None]]
+    ) -> None:
+        starts = list(range(0, len(texts), self.shard_size))
+        futures = [
+            executor.submit(_encode_shard, shard, start, texts[start:start + self.shard_size], target, shape)
+            for shard, start in enumerate(starts)
+        ]
+        try:
+            for done, future in enumerate(as_completed(futures), start=1):
+                timing = future.result()
+                logger.info(f"Embedding shard {timing['shard'] + 1}/{len(starts)} done "
+                            f"({timing['n_texts']} texts, {timing['wall_s']:.1f}s, pid {timing['pid']})")
+                if on_shard is not None:
+                    on_shard({**timing, "done": done, "n_shards": len(starts)})
+        except Exception:
+            for future in futures:
+                future.cancel()
+            raise
@@ -0,0 +1,135 @@
+"""
+ORION Embedding Store - Out-of-core embedding matrices backed by np.memmap
+
+For very large scans the embedding matrix is the biggest single allocation
+of the pipeline, and several stages used to hold their own float32/float64
+copies of it. In out-of-core mode embeddings are written chunk by chunk into
+a flat float32 file and every later stage (k-NN, UMAP, silhouette, titles,
+centroids) reads them through a copy-on-write memory mapping, so the operating
+system pages rows in and out instead of the process holding them all.
+
+Key Features:
+- One row-major float32 file per embedding matrix, named by a content key
+  (embedding model + texts), so reruns on the same corpus reuse the name
+- Chunked writes; the embedding pool writes its shards straight into the file
+- Mapped matrices are checkpointed by reference (path, shape, dtype) rather
+  than copied into the checkpoint pickle
+- Helpers for chunked row iteration so consumers never materialise a full copy
+
+Layout:
+    <store_dir>/embeddings-<key>.f32   - row-major float32 vectors
+"""
+
+import os
+import hashlib
+import logging
+from typing import Iterator, List, Tuple
+
+import numpy as np
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Constants
+VECTOR_DTYPE = np.dtype("<f4")
+# Rows encoded, copied or normalised per step when walking a mapped matrix
+DEFAULT_CHUNK_ROWS = 16384
+
+
+def content_key(model_id: str, texts: List[str]) -> str:
+    """
+    SHA256 over the embedding model id and the texts, in order.
+    """
+    digest = hashlib.sha256(model_id.encode("utf-8"))
+    for text in texts:
+        digest.update(b"\n")
+        digest.update(text.encode("utf-8"))
+    return digest.hexdigest()
+
+
+def row_chunks(n_rows: int, chunk_rows: int = DEFAULT_CHUNK_ROWS) -> Iterator[slice]:
+    """Consecutive row slices covering [0, n_rows)."""
+    for start in range(0, n_rows, chunk_rows):
+        yield slice(start, min(start + chunk_rows, n_rows))
+
+
+def is_mapped_file(array: np.ndarray) -> bool:
+    """
+    True when array is a memory mapping of an entire file, i.e. it can be
+    reopened from (filename, shape, dtype) alone.
+    """
+    if not isinstance(array, np.memmap) or not getattr(array, "filename", None):
+        return False
+    try:
+        return (
+            array.offset == 0
+            and array.flags.c_contiguous
+            and array.nbytes == os.path.getsize(array.filename)
+        )
+    except OSError:
+        return False
+
+
+def open_mapped(path: str, shape: Tuple[int, ...], dtype: str = VECTOR_DTYPE.str) -> np.memmap:
+    """
+    Map an existing embedding file copy-on-write: pages are read from the file
+    and the file is never modified, but the array is writable, which numba-compiled
+    consumers (pynndescent, UMAP) require.
+
+    Raises:
+        FileNotFoundError: The file was removed
+        ValueError: The file is shorter than shape requires
+    """
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"Embedding file not found: {path}")
+    return np.memmap(path, dtype=np.dtype(dtype), mode="c", shape=tuple(shape))
+
+
+class EmbeddingStore:
+    """
+    Directory of memory-mapped embedding matrices.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def path(self, name: str) -> str:
+        return os.path.join(self.directory, f"{name}.f32")
+
+    def create(self, name: str, n_rows: int, dim: int) -> np.ndarray:
+        """
+        Allocate a writable (n_rows x dim) float32 matrix backed by a file.
+
+        Empty matrices cannot be mapped and are returned as regular arrays.
+        """
+        if n_rows == 0:
+            return np.zeros((0, dim), dtype=VECTOR_DTYPE)
+        logger.info(f"Embedding store: mapping {n_rows} x {dim} float32 "
+                    f"({n_rows * dim * VECTOR_DTYPE.itemsize / 2**20:.0f} MB) at {self.path(name)}")
+        return np.memmap(self.path(name), dtype=VECTOR_DTYPE, mode="w+", shape=(n_rows, dim))
+
+    def finalize(self, array: np.ndarray) -> np.ndarray:
+        """
+        Flush a matrix returned by create() and reopen it copy-on-write.
+        """
+        if not isinstance(array, np.memmap):
+            return array
+        array.flush()
+        return open_mapped(array.filename, array.shape, array.dtype.str)
+
+    def remove(self, name: str) -> None:
+        """Delete a matrix file; open mappings stay valid until released."""
+        try:
+            os.remove(self.path(name))
+        except FileNotFoundError:
+            pass
+
+    def discard(self, array: np.ndarray) -> None:
+        """Delete the file behind a matrix of this store (no-op for in-RAM arrays)."""
+        filename = getattr(array, "filename", None)
+        if filename and os.path.dirname(os.path.abspath(filename)) == os.path.abspath(self.directory):
+            try:
+                os.remove(filename)
+            except FileNotFoundError:
+                pass
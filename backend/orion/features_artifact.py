@@ -0,0 +1,319 @@
+"""
+ORION Features Artifact - Persisted model state from a full preprocessing run
+
+The JSON/pickle results written by orion_preprocessing.py only carry labels and
+coordinates. This module stores the additional state needed to place new forces
+into an existing clustering without recomputing it.
+
+Key Features:
+- Embeddings (float32) once per duplicate group, with the group of every force
+  (representative_of), and cluster labels for every force of the reference run
+- Fitted UMAP 2D/3D models so new rows can be projected with transform()
+- Per-cluster centroids in embedding space
+- Version tag so incompatible artifacts are rejected early
+- Summary of an artifact without importing UMAP, pynndescent or numba
+"""
+
+import os
+import pickle
+import logging
+from typing import Dict, Any, List, Tuple
+
+import numpy as np
+
+try:
+    from .embedding_store import row_chunks
+except ImportError:
+    from embedding_store import row_chunks
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Constants
+# Version 2: 'embeddings' holds one row per duplicate group (see point_embeddings)
+ARTIFACT_VERSION = 2
+# Modules whose classes are only stubbed when an artifact is inspected
+DEFERRED_MODULES = ("umap", "pynndescent", "numba", "sklearn", "scipy")
+REQUIRED_ARTIFACT_KEYS = [
+    'version',
+    'model_name',
+    'ids',
+    'embeddings',
+    'cluster_labels',
+    'cluster_titles',
+    'centroids',
+    'centroid_labels',
+    'umap_2d',
+    'umap_3d'
+]
+# In-memory only: normalised vote reference of a loaded artifact (never saved)
+VOTE_REFERENCE_KEY = '_vote_reference'
+
+
+class ArtifactError(Exception):
+    """Raised when a features artifact is missing, malformed or incompatible"""
+    pass
+
+
+def normalize_rows(vectors: np.ndarray) -> np.ndarray:
+    """
+    L2-normalise rows so that dot products equal cosine similarities.
+    """
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+def compute_cluster_centroids(embeddings: np.ndarray, cluster_labels: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    Compute normalised per-cluster mean embeddings.
+
+    Args:
+        embeddings: Embedding matrix (n_forces x dim)
+        cluster_labels: Cluster label per force
+
+    Returns:
+        Dict: 'centroid_labels' (n_clusters,) and 'centroids' (n_clusters x dim, float32)
+    """
+    cluster_labels = np.asarray(cluster_labels)
+    centroid_labels, inverse = np.unique(cluster_labels, return_inverse=True)
+
+    # Row chunks, so memory-mapped embeddings are never copied whole
+    sums = np.zeros((len(centroid_labels), embeddings.shape[1]), dtype=np.float64)
+    for rows in row_chunks(len(embeddings)):
+        np.add.at(sums, inverse[rows], normalize_rows(embeddings[rows]))
+    centroids = normalize_rows(sums)
+
+    return {
+        'centroid_labels': centroid_labels.astype(np.int64),
+        'centroids': centroids.astype(np.float32)
+    }
+
+
+def point_embeddings(artifact: Dict[str, Any]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Stored embeddings per point (one per duplicate group) of an artifact.
+
+    Args:
+        artifact: Artifact dictionary of any supported version
+
+    Returns:
+        Tuple: (embeddings per point, point of every force row, row each point
+        was taken from)
+    """
+    n_rows = len(artifact['ids'])
+    embeddings = artifact['embeddings']
+    if 'representative_of' not in artifact:
+        # Version 1 without deduplication: every row is its own point
+        rows = np.arange(n_rows)
+        return embeddings, rows, rows
+    representatives = np.asarray(artifact['representatives'])
+    if artifact['version'] < 2:
+        # Version 1 stored every row's embedding
+        embeddings = np.asarray(embeddings)[representatives]
+    return embeddings, np.asarray(artifact['representative_of']), representatives
+
+
+def vote_reference(artifact: Dict[str, Any]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Normalised embeddings and cluster labels per point of an artifact, the
+    reference of nearest_neighbor_vote(). Computed once per loaded artifact
+    and kept in it, so repeated assignments against a cached artifact (daemon
+    mode) do not renormalise the reference every time.
+
+    Returns:
+        Tuple: (L2-normalised embeddings per point, cluster label per point)
+    """
+    if VOTE_REFERENCE_KEY not in artifact:
+        embeddings, _, representatives = point_embeddings(artifact)
+        artifact[VOTE_REFERENCE_KEY] = (
+            normalize_rows(embeddings),
+            np.asarray(artifact['cluster_labels'])[representatives]
+        )
+    return artifact[VOTE_REFERENCE_KEY]
+
+
+def save_features_artifact(path: str, artifact: Dict[str, Any]) -> None:
+    """
+    Write a features artifact to disk.
+
+    Args:
+        path: Destination pickle file
+        artifact: Artifact dictionary (see REQUIRED_ARTIFACT_KEYS)
+    """
+    artifact = dict(artifact)
+    artifact.setdefault('version', ARTIFACT_VERSION)
+    artifact.pop(VOTE_REFERENCE_KEY, None)
+
+    missing = [key for key in REQUIRED_ARTIFACT_KEYS if key not in artifact]
+    if missing:
+        raise ArtifactError(f"Artifact is missing required keys: {missing}")
+
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+
+    # Write to a temporary file first so a crash never leaves a truncated artifact
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        pickle.dump(artifact, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, path)
+
+    logger.info(f"Saved features artifact ({len(artifact['ids'])} forces) to {path}")
+
+
+def load_features_artifact(path: str) -> Dict[str, Any]:
+    """
+    Load and validate a features artifact.
+
+    Args:
+        path: Artifact pickle file
+
+    Returns:
+        Dict: Artifact dictionary
+
+    Raises:
+        ArtifactError: If the file is missing or incompatible
+    """
+    if not os.path.exists(path):
+        raise ArtifactError(f"Features artifact not found: {path}")
+
+    with open(path, 'rb') as f:
+        artifact = pickle.load(f)
+
+    if not isinstance(artifact, dict):
+        raise ArtifactError(f"Features artifact {path} is not a dictionary")
+
+    missing = [key for key in REQUIRED_ARTIFACT_KEYS if key not in artifact]
+    if missing:
+        raise ArtifactError(f"Features artifact {path} is missing keys: {missing}")
+
+    if artifact['version'] > ARTIFACT_VERSION:
+        raise ArtifactError(
+            f"Features artifact version {artifact['version']} is newer than supported version {ARTIFACT_VERSION}"
+        )
+
+    logger.info(f"Loaded features artifact ({len(artifact['ids'])} forces) from {path}")
+    return artifact
+
+
+class _Deferred:
+    """Stand-in for an object of a deferred module; keeps its pickled state."""
+
+    def __new__(cls, *args, **kwargs):
+        return object.__new__(cls)
+
+    def __init__(self, *args, **kwargs):
+        self.args = args
+
+    def __setstate__(self, state: Any) -> None:
+        self.state = state
+
+    def __call__(self, *args, **kwargs) -> "_Deferred":
+        return _Deferred(*args)
+
+
+class _InspectionUnpickler(pickle.Unpickler):
+    """Unpickles an artifact with stubs for the classes of DEFERRED_MODULES."""
+
+    def find_class(self, module: str, name: str) -> Any:
+        if module.split(".")[0] in DEFERRED_MODULES:
+            return _Deferred
+        return super().find_class(module, name)
+
+
+def inspect_features_artifact(path: str) -> Dict[str, Any]:
+    """
+    Summarise an artifact without importing the libraries of its fitted models.
+    The UMAP models come back as stubs, so the result is for inspection only.
+
+    Args:
+        path: Artifact pickle file
+
+    Returns:
+        Dict: artifact_summary() of the artifact
+
+    Raises:
+        ArtifactError: If the file is missing or incompatible
+    """
+    if not os.path.exists(path):
+        raise ArtifactError(f"Features artifact not found: {path}")
+
+    with open(path, 'rb') as f:
+        artifact = _InspectionUnpickler(f).load()
+
+    if not isinstance(artifact, dict):
+        raise ArtifactError(f"Features artifact {path} is not a dictionary")
+    missing = [key for key in REQUIRED_ARTIFACT_KEYS if key not in artifact]
+    if missing:
+        raise ArtifactError(f"Features artifact {path} is missing keys: {missing}")
+    return artifact_summary(artifact)
+
+
+def nearest_neighbor_vote(
+    reference: np.ndarray,
+    reference_labels: np.ndarray,
+    queries: np.ndarray,
+    n_neighbors: int = 15,
+    chunk_size: int = 1024,
+    normalized: bool = False
+) -> Dict[str, np.ndarray]:
+    """
+    Assign each query to the label that dominates its cosine nearest neighbours.
+
+    Votes are weighted by similarity and tallied per chunk with one np.add.at
+    over (query, label) pairs. Queries are processed in chunks to bound the
+    size of the similarity matrix.
+
+    Args:
+        reference: Reference embeddings (n_ref x dim)
+        reference_labels: Label per reference row
+        queries: Query embeddings (n_query x dim)
+        n_neighbors: Number of neighbours that vote
+        chunk_size: Queries per similarity block
+        normalized: reference rows are already L2-normalised (see vote_reference())
+
+    Returns:
+        Dict: 'labels' and 'confidence' (winning vote share) per query
+    """
+    if not normalized:
+        reference = normalize_rows(reference)
+    queries = normalize_rows(queries)
+    classes, codes = np.unique(np.asarray(reference_labels), return_inverse=True)
+    codes = codes.ravel()
+    k = min(n_neighbors, len(reference))
+
+    labels = np.empty(len(queries), dtype=classes.dtype)
+    confidence = np.empty(len(queries), dtype=np.float32)
+
+    for start in range(0, len(queries), chunk_size):
+        block = queries[start:start + chunk_size] @ reference.T
+        top = np.argpartition(-block, k - 1, axis=1)[:, :k]
+        weights = np.maximum(np.take_along_axis(block, top, axis=1), 0.0) + 1e-6
+        rows = np.arange(len(block))
+
+        votes = np.zeros((len(block), len(classes)), dtype=np.float64)
+        np.add.at(votes, (np.repeat(rows, k), codes[top].ravel()), weights.ravel())
+        winners = votes.argmax(axis=1)
+        labels[start:start + len(block)] = classes[winners]
+        confidence[start:start + len(block)] = votes[rows, winners] / votes.sum(axis=1)
+
+    return {'labels': labels, 'confidence': confidence}
+
+
+def artifact_summary(artifact: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Small JSON-serialisable description of an artifact.
+    """
+    ids: List[str] = artifact['ids']
+    return {
+        'version': artifact['version'],
+        'model_name': artifact['model_name'],
+        'n_forces': len(ids),
+        'n_points': int(len(artifact['embeddings'])),
+        'n_clusters': int(len(artifact['centroid_labels'])),
+        'embedding_dim': int(artifact['embeddings'].shape[1]),
+        'resolution_used': artifact.get('resolution_used'),
+        'hierarchy_levels': len(artifact.get('hierarchy_resolutions', [])),
+        'consensus': 'cluster_stability' in artifact
+    }
@@ -0,0 +1,148 @@
+"""
+ORION k-NN Graph - One approximate nearest-neighbour index shared by all stages
+
+UMAP 3D, UMAP 2D and the Louvain graph each used to build their own neighbour
+structure (the Louvain one by brute force). This module builds a single
+NN-descent index over the embeddings and hands out views of it sized for each
+consumer.
+
+Key Features:
+- Approximate cosine k-NN via pynndescent (NN-descent), built once per run
+- precomputed_knn tuples for umap.UMAP at any k up to the index size
+- kneighbors_graph-compatible connectivity matrix for community detection
+- Plain arrays that can be persisted with the features artifact
+"""
+
+import logging
+from typing import Any, Optional, Tuple
+
+import numpy as np
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Largest neighbourhood used downstream (UMAP 3D uses 20, Louvain 15 + self)
+DEFAULT_GRAPH_NEIGHBORS = 20
+
+
+class KNNGraph:
+    """
+    Approximate k-NN result for a fixed set of points.
+
+    indices/distances include each point itself (normally in column 0),
+    matching what umap.UMAP computes internally. search_index is the
+    pynndescent.NNDescent index the graph came from, if it is still available.
+    """
+
+    def __init__(
+        self,
+        indices: np.ndarray,
+        distances: np.ndarray,
+        metric: str = "cosine",
+        search_index: Optional[Any] = None
+    ):
+        self.indices = np.asarray(indices, dtype=np.int32)
+        self.distances = np.asarray(distances, dtype=np.float32)
+        self.metric = metric
+        self.search_index = search_index
+
+    @property
+    def n_points(self) -> int:
+        return self.indices.shape[0]
+
+    @property
+    def n_neighbors(self) -> int:
+        return self.indices.shape[1]
+
+    def umap_knn(self, n_neighbors: int) -> Tuple[np.ndarray, np.ndarray, Optional[Any]]:
+        """
+        precomputed_knn argument for umap.UMAP with the given n_neighbors.
+        """
+        if n_neighbors > self.n_neighbors:
+            raise ValueError(f"Graph has {self.n_neighbors} neighbours, {n_neighbors} requested")
+        return (
+            self.indices[:, :n_neighbors],
+            self.distances[:, :n_neighbors],
+            self.search_index
+        )
+
+    def connectivity(self, n_neighbors: int = 15) -> Any:
+        """
+        Directed k-NN connectivity matrix (scipy csr_matrix) without self loops,
+        equivalent to NearestNeighbors(n_neighbors).kneighbors_graph(mode="connectivity").
+        """
+        from scipy.sparse import csr_matrix
+
+        if n_neighbors >= self.n_neighbors:
+            raise ValueError(f"Graph has {self.n_neighbors} neighbours (incl. self), {n_neighbors} requested")
+
+        # Drop each row's own index (usually column 0, but ties can move it)
+        not_self = self.indices != np.arange(self.n_points)[:, None]
+        not_self &= self.indices >= 0
+        order = np.argsort(~not_self, axis=1, kind="stable")[:, :n_neighbors]
+        cols = np.take_along_axis(self.indices, order, axis=1)
+
+        rows = np.repeat(np.arange(self.n_points), n_neighbors)
+        data = np.ones(rows.shape[0], dtype=np.float64)
+        return csr_matrix((data, (rows, cols.ravel())), shape=(self.n_points, self.n_points))
+
+    def to_dict(self) -> dict:
+        """Arrays to store in the features artifact (the search index is not persisted)."""
+        return {
+            'knn_indices': self.indices,
+            'knn_distances': self.distances,
+            'knn_metric': self.metric
+        }
+
+
+def nndescent_threads(n_jobs: Optional[int]) -> int:
+    """
+    n_jobs for NNDescent: numba threads, limited to what numba can start.
+    pynndescent passes the value to numba.set_num_threads, which rejects
+    anything above NUMBA_NUM_THREADS (the core count by default).
+    """
+    import numba
+
+    if not n_jobs or n_jobs < 0 or n_jobs >= numba.config.NUMBA_NUM_THREADS:
+        return -1
+    return n_jobs
+
+
+def build_knn_graph(
+    embeddings: np.ndarray,
+    n_neighbors: int = DEFAULT_GRAPH_NEIGHBORS,
+    metric: str = "cosine",
+    random_state: Optional[int] = None,
+    n_jobs: Optional[int] = None
+) -> KNNGraph:
+    """
+    Build an NN-descent index over the embeddings.
+
+    Args:
+        embeddings: Embedding matrix (n_points x dim)
+        n_neighbors: Neighbours per point, including the point itself
+        metric: Distance metric
+        random_state: Seed for NN-descent initialisation
+        n_jobs: Worker threads (None, or more than there are cores, uses all cores)
+
+    Returns:
+        KNNGraph: Shared neighbour graph
+    """
+    from pynndescent import NNDescent
+
+    n_neighbors = min(n_neighbors, len(embeddings))
+    logger.info(f"Building approximate {n_neighbors}-NN graph ({metric}) for {len(embeddings)} points...")
+
+    index = NNDescent(
+        embeddings,
+        n_neighbors=n_neighbors,
+        metric=metric,
+        random_state=random_state,
+        n_jobs=nndescent_threads(n_jobs),
+        low_memory=True,
+        compressed=False
+    )
+    indices, distances = index.neighbor_graph
+
+    logger.info(f"k-NN graph built: {indices.shape[0]} x {indices.shape[1]}")
+    return KNNGraph(indices, distances, metric=metric, search_index=index)
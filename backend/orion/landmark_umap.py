@@ -0,0 +1,227 @@
+"""
+ORION Landmark UMAP - Sample-fitted UMAP layouts for very large corpora
+
+Fitting UMAP on the full embedding matrix is the slowest stage beyond roughly
+50k forces, and the pipeline fits two layouts (3D and 2D). In landmark mode
+each layout is fitted on a stratified sample of the corpus and every other
+point is placed with the fitted model's transform(), which only optimises the
+new points against the fixed landmark layout.
+
+Key Features:
+- Landmarks stratified by preliminary MiniBatchKMeans clusters, so small themes
+  are represented in the fitted layout
+- Remaining points projected in fixed-size chunks, in parallel worker processes
+  (the fitted model is shipped to each worker once)
+- Deterministic for a given random_state, chunk size and sample size
+- Drift report against a full fit: k-NN preservation in the layout and
+  Procrustes disparity
+"""
+
+import os
+import time
+import pickle
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import numpy as np
+
+try:
+    from .quality_metrics import stratified_sample
+    from .resolution_search import default_n_jobs
+except ImportError:
+    from quality_metrics import stratified_sample
+    from resolution_search import default_n_jobs
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Constants
+DEFAULT_LANDMARKS = 20000
+# UMAP fitted on fewer points has no NN-descent index, and transform() then
+# computes brute-force distances through a Python callable (very slow)
+MIN_LANDMARKS = 4096
+# Rows per transform() call
+TRANSFORM_CHUNK_SIZE = 4096
+# Points compared when measuring drift (k-NN preservation is O(n log n) per layout)
+DRIFT_SAMPLE_SIZE = 20000
+DRIFT_NEIGHBORS = 15
+
+# Fitted model held by each worker process (set by the pool initializer)
+_WORKER_MODEL = None
+
+
+def _init_worker(model_bytes: bytes) -> None:
+    """Pool initializer: unpickle the fitted model once per worker."""
+    global _WORKER_MODEL
+    _WORKER_MODEL = pickle.loads(model_bytes)
+
+
+def _transform_chunk(chunk: int, vectors: np.ndarray) -> Tuple[int, np.ndarray, Dict[str, Any]]:
+    """Project one chunk with the worker's model and return its coordinates and timing."""
+    started_at = time.time()
+    wall_start = time.perf_counter()
+    cpu_start = time.process_time()
+    coords = _WORKER_MODEL.transform(vectors)
+    timing = {
+        "started_at": started_at,
+        "wall_s": time.perf_counter() - wall_start,
+        "cpu_s": time.process_time() - cpu_start,
+        "pid": os.getpid()
+    }
+    return chunk, np.asarray(coords, dtype=np.float32), timing
+
+
+def select_landmarks(
+    embeddings: np.ndarray,
+    sample_size: int,
+    random_state: Optional[int] = None,
+    n_strata: Optional[int] = None
+) -> np.ndarray:
+    """
+    Stratified landmark sample over preliminary k-means clusters.
+
+    Args:
+        embeddings: Embedding matrix (n_points x dim)
+        sample_size: Number of landmarks
+        random_state: Seed for k-means and sampling
+        n_strata: Preliminary clusters (default: one per ~200 landmarks, 8-100)
+
+    Returns:
+        np.ndarray: Sorted row indices of the landmarks
+    """
+    n_points = len(embeddings)
+    if sample_size < MIN_LANDMARKS:
+        logger.warning(f"Raising UMAP landmarks from {sample_size} to {MIN_LANDMARKS}")
+        sample_size = MIN_LANDMARKS
+    if sample_size >= n_points:
+        return np.arange(n_points)
+
+    from sklearn.cluster import MiniBatchKMeans
+
+    n_strata = n_strata or int(np.clip(sample_size // 200, 8, 100))
+    logger.info(f"Selecting {sample_size} UMAP landmarks from {n_points} points "
+                f"({n_strata} preliminary clusters)...")
+    strata = MiniBatchKMeans(
+        n_clusters=n_strata,
+        batch_size=4096,
+        n_init=3,
+        random_state=random_state
+    ).fit_predict(embeddings)
+    return stratified_sample(strata, sample_size, random_state)
+
+
+def fit_landmark_umap(
+    embeddings: np.ndarray,
+    params: Dict[str, Any],
+    landmarks: np.ndarray,
+    random_state: Optional[int] = None,
+    n_jobs: Optional[int] = None,
+    chunk_size: int = TRANSFORM_CHUNK_SIZE,
+    on_chunk: Optional[Callable[[Dict[str, Any]], None]] = None
+) -> Tuple[np.ndarray, Any]:
+    """
+    Fit UMAP on the landmarks and transform all other points.
+
+    Args:
+        embeddings: Embedding matrix (n_points x dim), may be memory-mapped
+        params: UMAP parameters (n_components, metric, n_neighbors, ...)
+        landmarks: Sorted row indices to fit on
+        random_state: UMAP seed
+        n_jobs: Worker processes for transform (default: all available cores)
+        chunk_size: Rows per transform call
+        on_chunk: Called with each finished chunk's timing
+            (chunk, n_points, started_at, wall_s, cpu_s, pid)
+
+    Returns:
+        Tuple: (n_points x n_components) float32 coordinates and the fitted model
+    """
+    import umap
+
+    n_points = len(embeddings)
+    model = umap.UMAP(random_state=random_state, **params)
+    logger.info(f"Fitting UMAP {params['n_components']}D on {len(landmarks)} landmarks...")
+    model.fit(np.asarray(embeddings[landmarks], dtype=np.float32))
+
+    coords = np.empty((n_points, params["n_components"]), dtype=np.float32)
+    coords[landmarks] = model.embedding_
+
+    others = np.setdiff1d(np.arange(n_points), landmarks)
+    chunks = [others[start:start + chunk_size] for start in range(0, len(others), chunk_size)]
+    n_workers = min(max(1, n_jobs or default_n_jobs()), len(chunks))
+    logger.info(f"Projecting {len(others)} points in {len(chunks)} chunks ({n_workers} workers)...")
+
+    def place(chunk: int, chunk_coords: np.ndarray, timing: Dict[str, Any]) -> None:
+        coords[chunks[chunk]] = chunk_coords
+        if on_chunk is not None:
+            on_chunk({"chunk": chunk, "n_points": len(chunks[chunk]), **timing})
+
+    if n_workers <= 1:
+        _init_worker(pickle.dumps(model))
+        for chunk, rows in enumerate(chunks):
+            place(*_transform_chunk(chunk, np.asarray(embeddings[rows], dtype=np.float32)))
+    else:
+        # Spawned, not forked: numba's threading layer is already running after the fit
+        with ProcessPoolExecutor(
+            max_workers=n_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(pickle.dumps(model),)
+        ) as executor:
+            futures = [
+                executor.submit(_transform_chunk, chunk, np.asarray(embeddings[rows], dtype=np.float32))
+                for chunk, rows in enumerate(chunks)
+            ]
+            for future in futures:
+                place(*future.result())
+
+    return coords, model
+
+
+def layout_drift(
+    reference: np.ndarray,
+    candidate: np.ndarray,
+    n_neighbors: int = DRIFT_NEIGHBORS,
+    sample_size: int = DRIFT_SAMPLE_SIZE,
+    random_state: Optional[int] = None
+) -> Dict[str, Any]:
+    """
+    How far a layout drifts from a reference layout of the same points.
+
+    Args:
+        reference: Coordinates from the full fit (n_points x n_components)
+        candidate: Coordinates to compare (same rows)
+        n_neighbors: Neighbours compared per point
+        sample_size: Points compared (uniform sample when the corpus is larger)
+        random_state: Seed for the sample
+
+    Returns:
+        Dict: knn_preservation (mean share of each point's reference-layout
+        neighbours that are also candidate-layout neighbours, 1.0 = identical),
+        procrustes_disparity (after optimal translation, scaling and rotation,
+        0.0 = identical) and n_points compared
+    """
+    from scipy.spatial import procrustes
+    from sklearn.neighbors import NearestNeighbors
+
+    reference = np.asarray(reference, dtype=np.float64)
+    candidate = np.asarray(candidate, dtype=np.float64)
+    if len(reference) > sample_size:
+        rows = np.sort(np.random.default_rng(random_state).choice(len(reference), size=sample_size, replace=False))
+        reference, candidate = reference[rows], candidate[rows]
+
+    k = min(n_neighbors, len(reference) - 1)
+    neighbours = [
+        NearestNeighbors(n_neighbors=k + 1).fit(layout).kneighbors(layout, return_distance=False)[:, 1:]
+        for layout in (reference, candidate)
+    ]
+    shared = [len(np.intersect1d(a, b, assume_unique=True)) for a, b in zip(*neighbours)]
+    _, _, disparity = procrustes(reference, candidate)
+
+    return {
+        "knn_preservation": float(np.mean(shared) / k),
+        "procrustes_disparity": float(disparity),
+        "n_neighbors": int(k),
+        "n_points": int(len(reference))
+    }
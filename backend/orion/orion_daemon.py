@@ -0,0 +1,448 @@
+#!/usr/bin/env python3
+"""
+ORION Preprocessing Daemon - Long-lived worker with warm models
+
+Spawning orion_preprocessing.py per clustering run pays for importing torch,
+UMAP and KeyBERT, the NLTK stopword check and loading the Sentence Transformer
+every time. This daemon loads them once and then serves jobs.
+
+Protocol: newline-delimited JSON-RPC 2.0, over stdin/stdout or a Unix socket.
+
+    -> {"jsonrpc": "2.0", "id": 1, "method": "process_forces",
+        "params": {"input": "forces.json", "output": "features.json", "target_clusters": 37}}
+    <- {"jsonrpc": "2.0", "method": "progress", "params": {"job": 1, "stage": "embeddings", ...}}
+    <- {"jsonrpc": "2.0", "id": 1, "result": {"output": "features.json", "n_clusters": 37, ...}}
+
+Methods:
+- ping: liveness check, reports whether models are loaded
+- process_forces: full pipeline (params: input or forces, output, target_clusters,
+  artifact, plus per-job options random_state, n_jobs, title_engine,
+  silhouette_sample_size, exact_silhouette, dedup, dedup_threshold, and align_to:
+  a previous artifact whose cluster IDs are kept; the reply then carries cluster_diff)
+- assign_forces: assign-only mode (params: input or forces, artifact, output)
+  Both accept profile_trace: path for a Chrome trace of the job's stage profile
+- hierarchy_labels: labels of one precomputed hierarchy level of an artifact
+  (params: artifact, n_clusters or resolution; neither lists the levels)
+- classify_forces: tag forces with the nearest cluster of the classifier stored
+  next to an artifact, with similarity, margin and outlier score (params: input
+  or forces, artifact, output); loads neither UMAP nor the artifact itself
+- similar_forces: top-k most similar forces from an artifact's similarity index
+  (params: artifact, force_id or text, k, and optional filters cluster, steep
+  and type, each a value or a list)
+- shutdown: stop serving after replying
+
+Jobs are serialised: models are shared, and each job already uses all cores.
+similar_forces and classify_forces are serialised separately, so on the socket
+they answer while a job runs. Every encode call, theirs and the job's, holds the
+warm preprocessor's embedder lock, so the shared model and embedding pool are
+never used by two threads at once: a query waits only while a job is encoding.
+Logs go to stderr so stdout carries only protocol messages.
+
+Usage:
+    python orion_daemon.py [--socket /tmp/orion.sock] [--embedding-cache DIR] [--model-path DIR]
+"""
+
+import os
+import sys
+import json
+import argparse
+import logging
+import threading
+import socketserver
+from typing import Dict, Any, Optional, Callable
+
+# Add the current directory to Python path to import our modules
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from orion_preprocessing import OrionPreprocessor, EMBEDDING_MODEL_NAME
+from features_artifact import load_features_artifact
+from cluster_hierarchy import ClusterHierarchy
+from cluster_classifier import ClusterClassifier, cluster_classifier_path, load_cluster_classifier
+from similarity_index import (
+    DEFAULT_TOP_K,
+    SimilarityIndex,
+    SimilarityIndexError,
+    load_similarity_index,
+    similarity_index_path
+)
+from results_io import load_forces, save_results, to_jsonable
+from profiler import write_chrome_trace
+from quality_metrics import DEFAULT_SILHOUETTE_SAMPLE_SIZE
+from embedding_backends import EMBEDDING_BACKENDS
+from community_backends import COMMUNITY_BACKENDS, DEFAULT_COMMUNITY_BACKEND
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Preprocessor options a job may override
+JOB_OPTIONS = (
+    "random_state",
+    "n_jobs",
+    "silhouette_sample_size",
+    "exact_silhouette",
+    "title_engine",
+    "dedup",
+    "dedup_threshold",
+    "umap_landmarks",
+    "community_backend",
+    "hierarchy_levels",
+    "consensus_seeds"
+)
+
+# Read-only lookups; they do not wait for a running pipeline job, only for its encode calls
+QUERY_METHODS = ("similar_forces", "classify_forces")
+
+# JSON-RPC error codes
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+JOB_FAILED = -32000
+
+
+class JobError(Exception):
+    """Raised for invalid job parameters"""
+    pass
+
+
+class PreprocessingDaemon:
+    """
+    Holds warm models and runs preprocessing jobs against them.
+    """
+
+    def __init__(self, options: Dict[str, Any]):
+        self.options = dict(options)
+        self.warm = OrionPreprocessor(**self.options)
+        self.job_lock = threading.Lock()
+        self.query_lock = threading.Lock()
+        self.stop_event = threading.Event()
+        self._artifact_cache: Dict[str, Any] = {}
+        self._similarity_cache: Dict[str, SimilarityIndex] = {}
+        self._classifier_cache: Dict[str, ClusterClassifier] = {}
+
+    def warm_up(self) -> None:
+        """Load every model up front so the first job starts immediately."""
+        self.warm.initialize_models(load_keybert=self.warm.title_engine == "keybert")
+        pool = self.warm.embedding_pool()
+        if pool is not None:
+            logger.info(f"Embedding pool ready: {pool.n_workers} workers, {pool.dimension}-d")
+        logger.info(f"Daemon ready: {self.warm.embedding_id} loaded")
+
+    def close(self) -> None:
+        """Stop the warm embedding workers."""
+        self.warm.close()
+
+    def _job_preprocessor(self, params: Dict[str, Any], progress: Callable[[str, Dict[str, Any]], None]) -> OrionPreprocessor:
+        """Fresh preprocessor for one job, sharing the warm models and embedding cache."""
+        options = {k: v for k, v in self.options.items() if k != "embedding_cache_dir"}
+        options.update({k: params[k] for k in JOB_OPTIONS if k in params})
+
+        preprocessor = OrionPreprocessor(**options)
+        preprocessor.share_models(self.warm)
+        preprocessor.embedding_cache = self.warm.embedding_cache
+        preprocessor.progress_callback = progress
+        return preprocessor
+
+    def _load_artifact(self, path: str) -> Dict[str, Any]:
+        """Artifacts are reused across jobs until the file changes."""
+        key = f"{os.path.abspath(path)}:{os.path.getmtime(path)}"
+        if key not in self._artifact_cache:
+            self._artifact_cache = {key: load_features_artifact(path)}
+        return self._artifact_cache[key]
+
+    def _load_classifier(self, artifact_path: str) -> ClusterClassifier:
+        """Cluster classifier of an artifact, reused until the file changes."""
+        path = cluster_classifier_path(artifact_path)
+        if not os.path.exists(path):
+            raise JobError(f"No cluster classifier at {path}; rerun the full pipeline with this artifact")
+        key = f"{os.path.abspath(path)}:{os.path.getmtime(path)}"
+        if key not in self._classifier_cache:
+            self._classifier_cache = {key: load_cluster_classifier(path)}
+        return self._classifier_cache[key]
+
+    def _load_similarity_index(self, artifact_path: str) -> SimilarityIndex:
+        """Similarity index of an artifact, built from the artifact if it has none; reused until it changes."""
+        path = similarity_index_path(artifact_path)
+        source = path if os.path.exists(path) else artifact_path
+        key = f"{os.path.abspath(source)}:{os.path.getmtime(source)}"
+        if key not in self._similarity_cache:
+            if source == path:
+                index = load_similarity_index(path)
+            else:
+                logger.info(f"No similarity index at {path}, building one from the artifact")
+                index = SimilarityIndex.from_artifact(self._load_artifact(artifact_path), n_jobs=self.warm.n_jobs)
+            index.warm_up()
+            self._similarity_cache = {key: index}
+        return self._similarity_cache[key]
+
+    @staticmethod
+    def _forces(params: Dict[str, Any]):
+        if "forces" in params:
+            if not isinstance(params["forces"], list):
+                raise JobError("'forces' must be a list of force objects")
+            return params["forces"]
+        if "input" in params:
+            return load_forces(params["input"])
+        raise JobError("Either 'forces' or 'input' is required")
+
+    @staticmethod
+    def _respond(results: Dict[str, Any], params: Dict[str, Any]) -> Dict[str, Any]:
+        """Write results to 'output' when given, otherwise return them inline."""
+        if params.get("profile_trace"):
+            write_chrome_trace(results["profile"], params["profile_trace"])
+        output = params.get("output")
+        if not output:
+            return to_jsonable(results)
+        save_results(results, output)
+        return {
+            "output": output,
+            "n_forces": len(results["id"]),
+            "n_clusters": results["n_clusters"],
+            "silhouette_score": results.get("silhouette_score"),
+            "resolution_used": results.get("resolution_used"),
+            "cluster_diff": results.get("cluster_diff"),
+            "profile": results.get("profile")
+        }
+
+    def process_forces(self, params: Dict[str, Any], progress) -> Dict[str, Any]:
+        forces = self._forces(params)
+        preprocessor = self._job_preprocessor(params, progress)
+        previous = self._load_artifact(params["align_to"]) if params.get("align_to") else None
+        results = preprocessor.process_forces(
+            forces,
+            params.get("target_clusters"),
+            artifact_path=params.get("artifact"),
+            previous_artifact=previous
+        )
+        return self._respond(results, params)
+
+    def assign_forces(self, params: Dict[str, Any], progress) -> Dict[str, Any]:
+        if not params.get("artifact"):
+            raise JobError("'artifact' is required for assign_forces")
+        forces = self._forces(params)
+        artifact = self._load_artifact(params["artifact"])
+        preprocessor = self._job_preprocessor(params, progress)
+        results = preprocessor.assign_forces(forces, artifact)
+        return self._respond(results, params)
+
+    def classify_forces(self, params: Dict[str, Any], progress) -> Dict[str, Any]:
+        if not params.get("artifact"):
+            raise JobError("'artifact' is required for classify_forces")
+        forces = self._forces(params)
+        classifier = self._load_classifier(params["artifact"])
+        preprocessor = self._job_preprocessor(params, progress)
+        # May run next to a pipeline job, so it leaves the shared embedding cache alone
+        preprocessor.embedding_cache = None
+        results = preprocessor.classify_forces(forces, classifier)
+        return self._respond(results, params)
+
+    def hierarchy_labels(self, params: Dict[str, Any], progress) -> Dict[str, Any]:
+        if not params.get("artifact"):
+            raise JobError("'artifact' is required for hierarchy_labels")
+        artifact = self._load_artifact(params["artifact"])
+        hierarchy = ClusterHierarchy.from_artifact(artifact)
+        if hierarchy is None:
+            raise JobError(f"Artifact {params['artifact']} has no cluster hierarchy; rerun with hierarchy_levels")
+        if params.get("n_clusters") is None and params.get("resolution") is None:
+            return {"levels": hierarchy.levels()}
+        level = hierarchy.level_for(params.get("n_clusters"), params.get("resolution"))
+        return {
+            "id": list(artifact["ids"]),
+            "cluster_labels": hierarchy.labels_at(level).tolist(),
+            **hierarchy.levels()[level]
+        }
+
+    def similar_forces(self, params: Dict[str, Any], progress) -> Dict[str, Any]:
+        if not params.get("artifact"):
+            raise JobError("'artifact' is required for similar_forces")
+        if not params.get("force_id") and not params.get("text"):
+            raise JobError("Either 'force_id' or 'text' is required")
+        index = self._load_similarity_index(params["artifact"])
+        filters = {
+            "cluster": params.get("cluster"),
+            "steep": params.get("steep"),
+            "force_type": params.get("type")
+        }
+        k = params.get("k", DEFAULT_TOP_K)
+        try:
+            if params.get("force_id"):
+                results = index.similar_to(params["force_id"], k, **filters)
+            else:
+                results = index.search(self.warm.embed_query(params["text"]), k, **filters)
+        except SimilarityIndexError as e:
+            raise JobError(str(e))
+        return {"query": params.get("force_id") or params["text"], "results": results}
+
+    def handle(self, line: str, send: Callable[[Dict[str, Any]], None]) -> None:
+        """
+        Handle one JSON-RPC request line, sending progress notifications and the reply.
+        """
+        def reply_error(request_id, code: int, message: str) -> None:
+            send({"jsonrpc": "2.0", "id": request_id, "error": {"code": code, "message": message}})
+
+        try:
+            request = json.loads(line)
+        except json.JSONDecodeError as e:
+            reply_error(None, PARSE_ERROR, f"Parse error: {e}")
+            return
+
+        if not isinstance(request, dict) or not isinstance(request.get("method"), str):
+            reply_error(None, INVALID_REQUEST, "Invalid request")
+            return
+
+        request_id = request.get("id")
+        method = request["method"]
+        params = request.get("params") or {}
+
+        def progress(stage: str, details: Dict[str, Any]) -> None:
+            send({"jsonrpc": "2.0", "method": "progress",
+                  "params": {"job": request_id, "stage": stage, **details}})
+
+        handlers = {
+            "process_forces": self.process_forces,
+            "assign_forces": self.assign_forces,
+            "classify_forces": self.classify_forces,
+            "hierarchy_labels": self.hierarchy_labels,
+            "similar_forces": self.similar_forces
+        }
+
+        if method == "ping":
+            result = {"status": "ok", "models_loaded": self.warm.embedder is not None, "pid": os.getpid()}
+        elif method == "shutdown":
+            self.stop_event.set()
+            result = {"status": "stopping"}
+        elif method in handlers:
+            if not isinstance(params, dict):
+                reply_error(request_id, INVALID_PARAMS, "params must be an object")
+                return
+            try:
+                with self.query_lock if method in QUERY_METHODS else self.job_lock:
+                    logger.info(f"Job {request_id}: {method}")
+                    result = handlers[method](params, progress)
+            except JobError as e:
+                reply_error(request_id, INVALID_PARAMS, str(e))
+                return
+            except Exception as e:
+                logger.error(f"Job {request_id} failed: {e}")
+                reply_error(request_id, JOB_FAILED, str(e))
+                return
+        else:
+            reply_error(request_id, METHOD_NOT_FOUND, f"Unknown method: {method}")
+            return
+
+        if request_id is not None:
+            send({"jsonrpc": "2.0", "id": request_id, "result": result})
+
+    def serve_stdio(self) -> None:
+        """Serve requests from stdin, one JSON object per line."""
+        write_lock = threading.Lock()
+        stdout = sys.stdout
+
+        def send(message: Dict[str, Any]) -> None:
+            with write_lock:
+                stdout.write(json.dumps(message) + "\n")
+                stdout.flush()
+
+        for line in sys.stdin:
+            if line.strip():
+                self.handle(line, send)
+            if self.stop_event.is_set():
+                break
+
+    def serve_socket(self, path: str) -> None:
+        """Serve requests on a Unix socket; each connection is a JSON-RPC stream."""
+        daemon = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                write_lock = threading.Lock()
+
+                def send(message: Dict[str, Any]) -> None:
+                    with write_lock:
+                        self.wfile.write((json.dumps(message) + "\n").encode("utf-8"))
+                        self.wfile.flush()
+
+                for raw in self.rfile:
+                    line = raw.decode("utf-8")
+                    if line.strip():
+                        daemon.handle(line, send)
+                    if daemon.stop_event.is_set():
+                        threading.Thread(target=self.server.shutdown, daemon=True).start()
+                        break
+
+        if os.path.exists(path):
+            os.unlink(path)
+
+        server = socketserver.ThreadingUnixStreamServer(path, Handler)
+        server.daemon_threads = True
+        logger.info(f"Listening on {path}")
+        try:
+            server.serve_forever()
+        finally:
+            server.server_close()
+            if os.path.exists(path):
+                os.unlink(path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ORION Preprocessing Daemon")
+    parser.add_argument("--socket", default=None,
+                       help="Unix socket path (default: JSON-RPC over stdin/stdout)")
+    parser.add_argument("--random-state", type=int, default=42,
+                       help="Default random state for jobs")
+    parser.add_argument("--n-jobs", type=int, default=None,
+                       help="Default worker processes for parallel stages")
+    parser.add_argument("--silhouette-sample-size", type=int, default=DEFAULT_SILHOUETTE_SAMPLE_SIZE,
+                       help="Default sample budget for the silhouette estimate")
+    parser.add_argument("--title-engine", default="keybert",
+                       help="Default cluster title engine")
+    parser.add_argument("--community-backend", choices=COMMUNITY_BACKENDS, default=DEFAULT_COMMUNITY_BACKEND,
+                       help="Default community detection backend")
+    parser.add_argument("--embedding-backend", choices=EMBEDDING_BACKENDS, default="torch",
+                       help="Embedding runtime loaded at start-up")
+    parser.add_argument("--model-path", default=None,
+                       help=f"Local directory with a copy of {EMBEDDING_MODEL_NAME} (nothing is downloaded)")
+    parser.add_argument("--max-seq-length", type=int, default=None,
+                       help="Truncate texts to this many tokens before embedding")
+    parser.add_argument("--embedding-workers", type=int, default=None,
+                       help="Worker processes for embedding large corpora")
+    parser.add_argument("--embedding-store", default=None,
+                       help="Directory for memory-mapped embeddings (out-of-core mode)")
+    parser.add_argument("--embedding-cache", default=os.environ.get("ORION_EMBEDDING_CACHE"),
+                       help="Directory for the persistent embedding cache (default: $ORION_EMBEDDING_CACHE)")
+
+    args = parser.parse_args()
+
+    daemon = PreprocessingDaemon({
+        "random_state": args.random_state,
+        "n_jobs": args.n_jobs,
+        "silhouette_sample_size": args.silhouette_sample_size,
+        "title_engine": args.title_engine,
+        "community_backend": args.community_backend,
+        "embedding_backend": args.embedding_backend,
+        "model_path": args.model_path,
+        "max_seq_length": args.max_seq_length,
+        "embedding_workers": args.embedding_workers,
+        "embedding_store_dir": args.embedding_store,
+        "embedding_cache_dir": args.embedding_cache
+    })
+
+    try:
+        daemon.warm_up()
+        if args.socket:
+            daemon.serve_socket(args.socket)
+        else:
+            daemon.serve_stdio()
+    except KeyboardInterrupt:
+        pass
+    except Exception as e:
+        logger.error(f"Daemon failed: {e}")
+        sys.exit(1)
+    finally:
+        daemon.close()
+
+    logger.info("Daemon stopped")
+
+
+if __name__ == "__main__":
+    main()
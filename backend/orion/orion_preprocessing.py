@@ -11,16 +11,24 @@ This script replaces the old TF-IDF + K-means approach with:
 
 Usage:
     python orion_preprocessing.py --input data.json --output features.pkl [--target-clusters 37]
+    python orion_preprocessing.py --input forces.ndjson --output features.npz
+    cat forces.ndjson | python orion_preprocessing.py --input - --output features.arrow
+    python orion_preprocessing.py --input big.ndjson --output features.npz --embedding-store /scratch/orion
+    python orion_preprocessing.py --input big.ndjson --output features.npz --umap-landmarks 20000
+    python orion_preprocessing.py --input forces.ndjson --output features.npz --model-path /models/all-MiniLM-L6-v2
+    python orion_preprocessing.py --inspect-artifact features.pkl
+    python orion_preprocessing.py --input signals.json --output tags.json --artifact features.pkl --classify-only
 """
 
 import os
+import re
 import sys
 import json
-import pickle
+import time
 import argparse
+import threading
 import numpy as np
-import pandas as pd
-from typing import Dict, List, Any, Tuple, Optional
+from typing import Dict, List, Any, Tuple, Optional, Callable
 import logging
 
 # Configure logging
@@ -28,60 +36,387 @@ logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(
 logger = logging.getLogger(__name__)
 
 try:
-    import nltk
-    from nltk.corpus import stopwords
-    from sentence_transformers import SentenceTransformer
-    import umap
-    from sklearn.neighbors import NearestNeighbors
-    from sklearn.metrics import silhouette_score
-    import networkx as nx
-    import community as community_louvain
-    from keybert import KeyBERT
-    import re
-except ImportError as e:
-    logger.error(f"Missing required dependency: {e}")
-    logger.error("Please install required packages:")
-    logger.error("pip install sentence-transformers umap-learn keybert python-louvain nltk networkx scikit-learn")
-    sys.exit(1)
+    # Try relative import first (when used as package)
+    from .embedding_cache import EmbeddingCache
+except ImportError:
+    # Fallback to absolute import (when run as a script)
+    from embedding_cache import EmbeddingCache
+
+try:
+    from .embedding_backends import EMBEDDING_BACKENDS, DEFAULT_TOKEN_BUDGET, load_embedder, encode_texts
+except ImportError:
+    from embedding_backends import EMBEDDING_BACKENDS, DEFAULT_TOKEN_BUDGET, load_embedder, encode_texts
+
+try:
+    from .embedding_pool import EmbeddingPool, MIN_POOL_TEXTS
+except ImportError:
+    from embedding_pool import EmbeddingPool, MIN_POOL_TEXTS
+
+try:
+    from .embedding_store import EmbeddingStore, content_key, row_chunks
+except ImportError:
+    from embedding_store import EmbeddingStore, content_key, row_chunks
+
+try:
+    from .features_artifact import (
+        compute_cluster_centroids,
+        save_features_artifact,
+        load_features_artifact,
+        nearest_neighbor_vote,
+        vote_reference,
+        artifact_summary,
+        inspect_features_artifact
+    )
+except ImportError:
+    from features_artifact import (
+        compute_cluster_centroids,
+        save_features_artifact,
+        load_features_artifact,
+        nearest_neighbor_vote,
+        vote_reference,
+        artifact_summary,
+        inspect_features_artifact
+    )
+
+try:
+    from .resolution_search import ResolutionSearch, DEFAULT_RESOLUTION
+except ImportError:
+    from resolution_search import ResolutionSearch, DEFAULT_RESOLUTION
+
+try:
+    from .cluster_hierarchy import ClusterHierarchy, DEFAULT_HIERARCHY_LEVELS, build_hierarchy, hierarchy_resolutions
+except ImportError:
+    from cluster_hierarchy import ClusterHierarchy, DEFAULT_HIERARCHY_LEVELS, build_hierarchy, hierarchy_resolutions
+
+try:
+    from .consensus import DEFAULT_CONSENSUS_SEEDS, consensus_partition, consensus_seeds
+except ImportError:
+    from consensus import DEFAULT_CONSENSUS_SEEDS, consensus_partition, consensus_seeds
+
+try:
+    from .partition_alignment import DEFAULT_MIN_JACCARD, align_partition, partition_fingerprint, relabel
+except ImportError:
+    from partition_alignment import DEFAULT_MIN_JACCARD, align_partition, partition_fingerprint, relabel
+
+try:
+    from .community_backends import COMMUNITY_BACKENDS, DEFAULT_COMMUNITY_BACKEND
+except ImportError:
+    from community_backends import COMMUNITY_BACKENDS, DEFAULT_COMMUNITY_BACKEND
+
+try:
+    from .text_normalization import normalize_texts
+except ImportError:
+    from text_normalization import normalize_texts
+
+try:
+    from .landmark_umap import fit_landmark_umap, select_landmarks
+except ImportError:
+    from landmark_umap import fit_landmark_umap, select_landmarks
+
+try:
+    from .knn_graph import KNNGraph, build_knn_graph
+except ImportError:
+    from knn_graph import KNNGraph, build_knn_graph
+
+try:
+    from .similarity_index import SimilarityIndex, save_similarity_index, similarity_index_path
+except ImportError:
+    from similarity_index import SimilarityIndex, save_similarity_index, similarity_index_path
+
+try:
+    from .cluster_classifier import (
+        ClusterClassifier,
+        build_cluster_classifier,
+        cluster_classifier_path,
+        load_cluster_classifier,
+        save_cluster_classifier
+    )
+except ImportError:
+    from cluster_classifier import (
+        ClusterClassifier,
+        build_cluster_classifier,
+        cluster_classifier_path,
+        load_cluster_classifier,
+        save_cluster_classifier
+    )
+
+try:
+    from .umap_layouts import fit_layout, fit_layouts
+except ImportError:
+    from umap_layouts import fit_layout, fit_layouts
+
+try:
+    from .quality_metrics import compute_quality_metrics, DEFAULT_SILHOUETTE_SAMPLE_SIZE
+except ImportError:
+    from quality_metrics import compute_quality_metrics, DEFAULT_SILHOUETTE_SAMPLE_SIZE
+
+try:
+    from .title_engines import TITLE_ENGINES, batched_titles, ctfidf_titles
+except ImportError:
+    from title_engines import TITLE_ENGINES, batched_titles, ctfidf_titles
+
+try:
+    from .checkpoints import StageCheckpointer, fingerprint_forces
+except ImportError:
+    from checkpoints import StageCheckpointer, fingerprint_forces
+
+try:
+    from .dedup import DEDUP_MODES, DEFAULT_THRESHOLD as DEFAULT_DEDUP_THRESHOLD, DuplicateGroups, find_duplicates
+except ImportError:
+    from dedup import DEDUP_MODES, DEFAULT_THRESHOLD as DEFAULT_DEDUP_THRESHOLD, DuplicateGroups, find_duplicates
+
+try:
+    from .results_io import load_forces, save_results, to_jsonable
+except ImportError:
+    from results_io import load_forces, save_results, to_jsonable
+
+try:
+    from .profiler import StageProfiler, format_profile, write_chrome_trace
+except ImportError:
+    from profiler import StageProfiler, format_profile, write_chrome_trace
+
+try:
+    from .stopwords import ENGLISH_STOPWORDS
+except ImportError:
+    from stopwords import ENGLISH_STOPWORDS
+
+# Sentence Transformer model used for embeddings (and as KeyBERT backbone)
+EMBEDDING_MODEL_NAME = "all-MiniLM-L6-v2"
+
+# UMAP 3D for visualization (matching original script parameters)
+UMAP_3D_PARAMS = {
+    "n_components": 3,
+    "metric": "cosine",
+    "min_dist": 0.01,    # Tighter cluster packing
+    "spread": 1.0,
+    "n_neighbors": 20    # Stronger cluster structure
+}
+
+# UMAP 2D for clearer, denser cluster plots
+UMAP_2D_PARAMS = {
+    "n_components": 2,
+    "metric": "cosine",
+    "min_dist": 0.001,   # Much tighter clusters
+    "spread": 1.2,       # Slight cluster separation
+    "n_neighbors": 15    # More local structure
+}
+
+# Neighbours per node in the Louvain k-NN graph
+LOUVAIN_NEIGHBORS = 15
+
+# Layouts drawn by every run, fitted concurrently from the shared k-NN graph
+UMAP_LAYOUTS = {"3d": UMAP_3D_PARAMS, "2d": UMAP_2D_PARAMS}
+
+# The shared graph is built at the largest k any consumer needs (Louvain also counts self)
+GRAPH_NEIGHBORS = max(
+    max(params["n_neighbors"] for params in UMAP_LAYOUTS.values()),
+    LOUVAIN_NEIGHBORS + 1
+)
 
 class OrionPreprocessor:
     """
     ORION clustering preprocessing pipeline using modern ML techniques
     """
     
-    def __init__(self, random_state: int = 42):
+    def __init__(
+        self,
+        random_state: int = 42,
+        embedding_cache_dir: Optional[str] = None,
+        n_jobs: Optional[int] = None,
+        silhouette_sample_size: int = DEFAULT_SILHOUETTE_SAMPLE_SIZE,
+        exact_silhouette: bool = False,
+        title_engine: str = "keybert",
+        checkpoint_dir: Optional[str] = None,
+        dedup: str = "near",
+        dedup_threshold: float = DEFAULT_DEDUP_THRESHOLD,
+        embedding_backend: str = "torch",
+        max_seq_length: Optional[int] = None,
+        batch_token_budget: int = DEFAULT_TOKEN_BUDGET,
+        embedding_workers: Optional[int] = None,
+        embedding_store_dir: Optional[str] = None,
+        model_path: Optional[str] = None,
+        umap_landmarks: Optional[int] = None,
+        community_backend: str = DEFAULT_COMMUNITY_BACKEND,
+        hierarchy_levels: int = DEFAULT_HIERARCHY_LEVELS,
+        consensus_seeds: int = DEFAULT_CONSENSUS_SEEDS
+    ):
+        if title_engine not in TITLE_ENGINES:
+            raise ValueError(f"Unknown title engine {title_engine!r}, expected one of {TITLE_ENGINES}")
+        if dedup not in DEDUP_MODES:
+            raise ValueError(f"Unknown dedup mode {dedup!r}, expected one of {DEDUP_MODES}")
+        if embedding_backend not in EMBEDDING_BACKENDS:
+            raise ValueError(f"Unknown embedding backend {embedding_backend!r}, expected one of {EMBEDDING_BACKENDS}")
+        if community_backend not in COMMUNITY_BACKENDS:
+            raise ValueError(f"Unknown community backend {community_backend!r}, expected one of {COMMUNITY_BACKENDS}")
+        if consensus_seeds < 0:
+            raise ValueError(f"consensus_seeds must be >= 0, got {consensus_seeds}")
         self.random_state = random_state
+        self.title_engine = title_engine
+        self.n_jobs = n_jobs
+        self.community_backend = community_backend
+        # Resolutions log-spaced over HIERARCHY_BOUNDS that are partitioned
+        # for the cluster hierarchy (0 disables it)
+        self.hierarchy_levels = hierarchy_levels
+        self.cluster_hierarchy: Optional[ClusterHierarchy] = None
+        # Seeds partitioned at the selected resolution for consensus clustering
+        # (0 or 1 disables it); the stability per point lands in self.cluster_consensus
+        self.consensus_seeds = consensus_seeds
+        self.cluster_consensus: Optional[Dict[str, Any]] = None
+        self.silhouette_sample_size = silhouette_sample_size
+        self.exact_silhouette = exact_silhouette
+        self.checkpoint_dir = checkpoint_dir
+        self.dedup = dedup
+        self.dedup_threshold = dedup_threshold
+        self.model_name = EMBEDDING_MODEL_NAME
+        # Local copy of the model to load instead of the hub name (no download)
+        self.model_path = model_path
+        self.embedding_backend = embedding_backend
+        self.max_seq_length = max_seq_length
+        self.batch_token_budget = batch_token_budget
+        # More than one worker: large corpora are embedded by an EmbeddingPool,
+        # created once and kept (with its loaded models) until close()
+        self.embedding_workers = embedding_workers
+        self._embedding_pool: Optional[EmbeddingPool] = None
         self.embedder = None
+        # Held around every use of the embedder and the embedding pool, which are
+        # not thread-safe; share_models() shares it along with the models
+        self.embedder_lock = threading.RLock()
         self.kw_model = None
         self.stopwords = None
+        self.umap_2d_model = None
+        self.umap_3d_model = None
+        # Landmark mode: UMAP is fitted on this many stratified points when the
+        # corpus is larger, and the rest are placed with transform()
+        self.umap_landmarks = umap_landmarks
+        self._landmarks: Optional[np.ndarray] = None
+        # Called as progress_callback(stage, details) when a pipeline stage starts
+        self.progress_callback: Optional[Callable[[str, Dict[str, Any]], None]] = None
+        # Replaced at the start of every run; its report becomes results["profile"]
+        self.profiler = StageProfiler()
+        self.embedding_cache = (
+            EmbeddingCache(embedding_cache_dir, self.embedding_id) if embedding_cache_dir else None
+        )
+        # Out-of-core mode: embeddings live in memory-mapped files, not in RAM
+        self.embedding_store = EmbeddingStore(embedding_store_dir) if embedding_store_dir else None
         
-    def initialize_models(self):
-        """Initialize all required models and download NLTK data"""
+    def initialize_models(self, load_keybert: Optional[bool] = None):
+        """Initialize all required models and the bundled stopword list.
+        Models that are already loaded (e.g. in daemon mode) are reused."""
         logger.info("Initializing models...")
         
-        # Download NLTK stopwords
-        try:
-            nltk.download("stopwords", quiet=True)
-            self.stopwords = set(stopwords.words("english"))
-        except Exception as e:
-            logger.warning(f"Could not download NLTK stopwords: {e}")
-            self.stopwords = set()
+        if self.stopwords is None:
+            self.stopwords = set(ENGLISH_STOPWORDS)
         
         # Initialize Sentence Transformer
-        logger.info("Loading Sentence Transformer model (all-MiniLM-L6-v2)...")
-        self.embedder = SentenceTransformer("all-MiniLM-L6-v2")
+        if self.embedder is None:
+            logger.info(f"Loading Sentence Transformer model ({self.model_source}, {self.embedding_backend})...")
+            self.embedder = load_embedder(
+                self.model_source,
+                self.embedding_backend,
+                max_seq_length=self.max_seq_length
+            )
         
-        # Initialize KeyBERT
-        logger.info("Initializing KeyBERT model...")
-        self.kw_model = KeyBERT(model=self.embedder)
+        # Initialize KeyBERT (only the keybert title engine uses it)
+        if load_keybert is None:
+            load_keybert = self.title_engine == "keybert"
+        if load_keybert and self.kw_model is None:
+            logger.info("Initializing KeyBERT model...")
+            self.kw_model = self._keybert()
         
         logger.info("All models initialized successfully")
     
+    def share_models(self, other: "OrionPreprocessor") -> None:
+        """
+        Reuse another preprocessor's loaded models instead of loading them again
+        """
+        if other.embedding_id != self.embedding_id:
+            raise ValueError(f"Cannot share models between {other.embedding_id!r} and {self.embedding_id!r}")
+        self.stopwords = other.stopwords
+        self.embedder = other.embedder
+        self.kw_model = other.kw_model
+        self.embedder_lock = other.embedder_lock
+        if (self.embedding_workers or 1) == (other.embedding_workers or 1):
+            self._embedding_pool = other.embedding_pool()
+    
+    def embedding_pool(self) -> Optional[EmbeddingPool]:
+        """
+        The embedding worker pool (None without embedding_workers > 1).
+        Workers start on first use and stay warm until close()
+        """
+        if (self.embedding_workers or 1) > 1 and self._embedding_pool is None:
+            self._embedding_pool = EmbeddingPool(
+                self.model_source,
+                self.embedding_backend,
+                max_seq_length=self.max_seq_length,
+                n_workers=self.embedding_workers,
+                token_budget=self.batch_token_budget
+            )
+        return self._embedding_pool
+    
+    def close(self) -> None:
+        """
+        Stop the embedding workers, if any were started
+        """
+        if self._embedding_pool is not None:
+            self._embedding_pool.close()
+            self._embedding_pool = None
+    
+    def _keybert(self) -> Any:
+        """
+        KeyBERT on the loaded embedder (imported on first use)
+        """
+        from keybert import KeyBERT
+        return KeyBERT(model=self.embedder)
+    
+    @property
+    def model_source(self) -> str:
+        """
+        Where the embedder is loaded from: the local model path, or the hub name
+        """
+        return self.model_path or self.model_name
+    
+    @property
+    def embedding_id(self) -> str:
+        """
+        Model plus the runtime settings that change its vectors (keys caches and checkpoints)
+        """
+        embedding_id = self.model_name
+        if self.embedding_backend != "torch":
+            embedding_id += f"@{self.embedding_backend}"
+        if self.max_seq_length:
+            embedding_id += f":{self.max_seq_length}"
+        return embedding_id
+    
+    def _report_progress(self, stage: str, **details: Any) -> None:
+        """
+        Notify the progress callback that a pipeline stage is starting
+        """
+        if self.progress_callback is not None:
+            self.progress_callback(stage, details)
+    
+    def _run_stage(
+        self,
+        checkpoints: StageCheckpointer,
+        stage: str,
+        params: Dict[str, Any],
+        compute: Callable[[], Any],
+        items: Optional[int] = None,
+        **details: Any
+    ) -> Any:
+        """
+        Report, profile and checkpoint one pipeline stage
+        """
+        self._report_progress(stage, **details)
+        with self.profiler.stage(stage, items=items) as span:
+            value = checkpoints.run(stage, params, compute)
+            span["resumed"] = stage in checkpoints.resumed
+        return value
+    
     def preprocess_text(self, text: str) -> str:
         """
         Preprocess text: lowercase, remove non-alphanumeric, filter stopwords
         """
-        if not text or pd.isna(text):
+        if not text or (isinstance(text, float) and np.isnan(text)):
             return ""
         
         text = str(text).lower()
@@ -92,151 +427,402 @@ class OrionPreprocessor:
     
     def prepare_texts(self, forces_data: List[Dict[str, Any]]) -> List[str]:
         """
-        Prepare text data by combining title, text, and tags
+        Prepare text data by combining title, text, and tags.
+        Normalised in batches, with output identical to preprocess_text per force.
         """
         logger.info(f"Preprocessing {len(forces_data)} text documents...")
         
-        preprocessed_texts = []
-        for force in forces_data:
-            # Combine title + text (description) + tags like in the original script
-            combined_text = " ".join([
+        # Combine title + text (description) + tags like in the original script
+        combined_texts = [
+            " ".join([
                 str(force.get("title", "") or ""),
                 str(force.get("text", "") or ""),
                 str(force.get("tags", "") or "")
             ])
-            
-            preprocessed = self.preprocess_text(combined_text)
-            preprocessed_texts.append(preprocessed)
+            for force in forces_data
+        ]
+        if self.stopwords is None:
+            self.stopwords = set(ENGLISH_STOPWORDS)
+        preprocessed_texts = normalize_texts(combined_texts, self.stopwords)
         
         logger.info(f"Preprocessed {len(preprocessed_texts)} documents")
         return preprocessed_texts
     
-    def generate_embeddings(self, texts: List[str]) -> np.ndarray:
+    def deduplicate_texts(self, texts: List[str]) -> DuplicateGroups:
         """
-        Generate sentence embeddings using Sentence Transformers
+        Group exact and near-duplicate preprocessed texts (per the dedup mode)
         """
-        logger.info("Generating sentence embeddings...")
-        embeddings = self.embedder.encode(
+        return find_duplicates(
             texts,
-            show_progress_bar=True,
-            convert_to_numpy=True
+            mode=self.dedup,
+            threshold=self.dedup_threshold,
+            seed=self.random_state
         )
+    
+    @staticmethod
+    def duplicate_report(duplicates: DuplicateGroups, forces_data: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Duplicate groups keyed by force id, largest first
+        """
+        def force_id(row: int) -> str:
+            return forces_data[row].get("id", f"force_{row}")
+        
+        return [
+            {
+                "representative": force_id(group["representative"]),
+                "title": forces_data[group["representative"]].get("title", ""),
+                "members": [force_id(row) for row in group["members"]],
+                "exact": group["exact"],
+                "min_similarity": group["min_similarity"]
+            }
+            for group in duplicates.groups()
+        ]
+    
+    def generate_embeddings(self, texts: List[str]) -> np.ndarray:
+        """
+        Generate sentence embeddings using Sentence Transformers.
+        When an embedding cache is configured, only unseen texts are encoded.
+        """
+        store = self.embedding_store
+        name = f"embeddings-{content_key(self.embedding_id, texts)[:24]}" if store is not None else None
+        
+        if self.embedding_cache is None:
+            logger.info("Generating sentence embeddings...")
+            self.profiler.annotate(encoded=len(texts), out_of_core=store is not None)
+            if store is None:
+                embeddings = self._encode(texts)
+            else:
+                embeddings = store.finalize(self._encode(texts, out=self._create_mapped(name, len(texts))))
+            logger.info(f"Generated embeddings shape: {embeddings.shape}")
+            return embeddings
+        
+        cache = self.embedding_cache
+        keys = [cache.key(text) for text in texts]
+        rows = cache.lookup(keys)
+        
+        # Encode each unseen text once, even if it repeats within the batch
+        missing = {}
+        for i in np.where(rows < 0)[0]:
+            missing.setdefault(keys[i], i)
+        
+        logger.info(f"Embedding cache: {len(texts) - int(np.sum(rows < 0))} hits, "
+                    f"{len(missing)} unique texts to encode")
+        
+        self.profiler.annotate(
+            cache_hits=len(texts) - int(np.sum(rows < 0)),
+            encoded=len(missing),
+            out_of_core=store is not None
+        )
+        if missing:
+            missing_keys = list(missing.keys())
+            missing_texts = [texts[i] for i in missing.values()]
+            if store is None:
+                cache.add(missing_keys, self._encode(missing_texts))
+            else:
+                new_embeddings = self._encode(missing_texts, out=self._create_mapped(f"{name}-new", len(missing_texts)))
+                for chunk in row_chunks(len(missing_keys)):
+                    cache.add(missing_keys[chunk], new_embeddings[chunk])
+                del new_embeddings
+                store.remove(f"{name}-new")
+            rows = cache.lookup(keys)
+        
+        if store is None:
+            embeddings = cache.get(rows)
+        else:
+            embeddings = self._create_mapped(name, len(texts))
+            for chunk in row_chunks(len(texts)):
+                embeddings[chunk] = cache.get(rows[chunk])
+            embeddings = store.finalize(embeddings)
         logger.info(f"Generated embeddings shape: {embeddings.shape}")
         return embeddings
     
-    def apply_umap_reduction(self, embeddings: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    def _create_mapped(self, name: str, n_rows: int) -> np.ndarray:
+        """
+        Allocate a memory-mapped (n_rows x dim) embedding matrix in the embedding store
+        """
+        return self.embedding_store.create(name, n_rows, self.embedder.get_sentence_embedding_dimension())
+    
+    def embed_query(self, text: str) -> np.ndarray:
+        """
+        Embed a free-text query, preprocessed like a force's title/text/tags
+        """
+        if self.embedder is None:
+            self.initialize_models(load_keybert=False)
+        return self._encode([self.preprocess_text(text)])[0]
+    
+    def _encode(self, texts: List[str], out: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Encode texts with the loaded embedder in length-sorted, token-budgeted batches,
+        or across a pool of pinned worker processes for large corpora.
+        With out (a memory-mapped matrix) embeddings are written into it chunk by chunk.
+        """
+        with self.embedder_lock:
+            pool = self.embedding_pool()
+            if pool is not None and len(texts) >= MIN_POOL_TEXTS:
+                return pool.encode(texts, on_shard=self._embedding_shard_done, out=out)
+            
+            if out is None:
+                return encode_texts(self.embedder, texts, token_budget=self.batch_token_budget)
+            
+            for chunk in row_chunks(len(texts)):
+                out[chunk] = encode_texts(self.embedder, texts[chunk], token_budget=self.batch_token_budget)
+                self._report_progress("embeddings", encoded=chunk.stop, n_texts=len(texts))
+            return out
+    
+    def _embedding_shard_done(self, timing: Dict[str, Any]) -> None:
+        """
+        Record a finished embedding-pool shard in the profile and report progress
+        """
+        timing = dict(timing)
+        done, n_shards = timing.pop("done"), timing.pop("n_shards")
+        self.profiler.record("embedding_shard", **timing)
+        self._report_progress("embeddings", shards_done=done, n_shards=n_shards)
+    
+    def build_knn_graph(self, embeddings: np.ndarray) -> KNNGraph:
+        """
+        Build the approximate k-NN graph shared by UMAP and Louvain
+        """
+        return build_knn_graph(
+            embeddings,
+            n_neighbors=GRAPH_NEIGHBORS,
+            metric="cosine",
+            random_state=self.random_state,
+            n_jobs=self.n_jobs
+        )
+    
+    def apply_umap_reduction(
+        self,
+        embeddings: np.ndarray,
+        knn_graph: Optional[KNNGraph] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
         """
         Apply UMAP dimensionality reduction for both 2D and 3D coordinates
         """
         logger.info("Applying UMAP dimensionality reduction...")
         
-        # UMAP 3D for visualization (matching original script parameters)
-        umap_3d = umap.UMAP(
-            n_components=3,
-            metric="cosine", 
-            random_state=self.random_state,
-            min_dist=0.01,    # Tighter cluster packing
-            spread=1.0,       
-            n_neighbors=20    # Stronger cluster structure
-        )
-        coords_3d = umap_3d.fit_transform(embeddings)
+        if knn_graph is None:
+            knn_graph = self.build_knn_graph(embeddings)
         
-        logger.info("UMAP 3D coordinates range:")
-        logger.info(f"  X: {np.min(coords_3d[:, 0]):.3f} to {np.max(coords_3d[:, 0]):.3f}")
-        logger.info(f"  Y: {np.min(coords_3d[:, 1]):.3f} to {np.max(coords_3d[:, 1]):.3f}")
-        logger.info(f"  Z: {np.min(coords_3d[:, 2]):.3f} to {np.max(coords_3d[:, 2]):.3f}")
+        layouts = self.fit_umap_layouts(embeddings, knn_graph)
+        coords_3d, self.umap_3d_model = layouts["3d"]
+        coords_2d, self.umap_2d_model = layouts["2d"]
         
-        # UMAP 2D for clearer, denser cluster plots
-        umap_2d = umap.UMAP(
-            n_components=2,
-            metric="cosine",
+        return coords_2d, coords_3d
+    
+    def fit_umap_layouts(
+        self,
+        embeddings: np.ndarray,
+        knn_graph: KNNGraph
+    ) -> Dict[str, Tuple[np.ndarray, Any]]:
+        """
+        Fit every layout in UMAP_LAYOUTS, returning coordinates and model per layout.
+        The full fits run concurrently in worker processes; landmark fits run one
+        after the other, since each already projects its points in parallel.
+        """
+        if self.umap_landmarks and len(embeddings) > self.umap_landmarks:
+            layouts = {}
+            for name, params in UMAP_LAYOUTS.items():
+                started_at = time.time()
+                wall_start = time.perf_counter()
+                cpu_start = time.process_time()
+                layouts[name] = self.fit_umap(embeddings, params, knn_graph)
+                self.profiler.record(
+                    f"umap{name}",
+                    started_at=started_at,
+                    wall_s=time.perf_counter() - wall_start,
+                    cpu_s=time.process_time() - cpu_start
+                )
+            return layouts
+        
+        fitted = fit_layouts(
+            embeddings,
+            UMAP_LAYOUTS,
+            knn_graph,
             random_state=self.random_state,
-            min_dist=0.001,   # Much tighter clusters
-            spread=1.2,       # Slight cluster separation
-            n_neighbors=15    # More local structure
+            n_jobs=self.n_jobs
         )
-        coords_2d = umap_2d.fit_transform(embeddings)
-        
-        logger.info("UMAP 2D coordinates range:")
-        logger.info(f"  X: {np.min(coords_2d[:, 0]):.3f} to {np.max(coords_2d[:, 0]):.3f}")
-        logger.info(f"  Y: {np.min(coords_2d[:, 1]):.3f} to {np.max(coords_2d[:, 1]):.3f}")
+        layouts = {}
+        for name, (coords, umap_model, timing) in fitted.items():
+            self.profiler.record(f"umap{name}", **timing)
+            self._log_coordinate_range(coords)
+            layouts[name] = (coords, umap_model)
+        return layouts
+    
+    def fit_umap(
+        self,
+        embeddings: np.ndarray,
+        params: Dict[str, Any],
+        knn_graph: KNNGraph
+    ) -> Tuple[np.ndarray, Any]:
+        """
+        Fit one UMAP layout on the shared k-NN graph, returning coordinates and model.
+        In landmark mode the layout is fitted on a stratified sample instead.
+        """
+        if self.umap_landmarks and len(embeddings) > self.umap_landmarks:
+            coords, umap_model = fit_landmark_umap(
+                embeddings,
+                params,
+                self._umap_landmark_rows(embeddings),
+                random_state=self.random_state,
+                n_jobs=self.n_jobs,
+                on_chunk=lambda timing: self.profiler.record("umap_transform", **timing)
+            )
+        else:
+            coords, umap_model = fit_layout(embeddings, params, knn_graph, self.random_state)
         
-        return coords_2d, coords_3d
+        self._log_coordinate_range(coords)
+        return coords, umap_model
+    
+    @staticmethod
+    def _log_coordinate_range(coords: np.ndarray) -> None:
+        """
+        Log the extent of a layout along each axis
+        """
+        logger.info(f"UMAP {coords.shape[1]}D coordinates range:")
+        for axis, name in enumerate("XYZ"[:coords.shape[1]]):
+            logger.info(f"  {name}: {np.min(coords[:, axis]):.3f} to {np.max(coords[:, axis]):.3f}")
+    
+    def _umap_landmark_rows(self, embeddings: np.ndarray) -> np.ndarray:
+        """
+        Landmarks shared by the 3D and 2D layouts of a run
+        """
+        if self._landmarks is None:
+            with self.profiler.stage("landmarks", items=len(embeddings)):
+                self._landmarks = select_landmarks(embeddings, self.umap_landmarks, self.random_state)
+        return self._landmarks
     
     def perform_louvain_clustering(
         self, 
         embeddings: np.ndarray, 
-        target_clusters: Optional[int] = None
+        target_clusters: Optional[int] = None,
+        knn_graph: Optional[KNNGraph] = None
     ) -> Tuple[np.ndarray, float]:
         """
-        Perform Louvain community detection on k-NN graph
+        Perform Louvain (or Leiden) community detection on k-NN graph.
+        Also leaves the partitions of every evaluated resolution in
+        self.cluster_hierarchy (None when hierarchy_levels is 0), and in
+        consensus mode the per-point stability in self.cluster_consensus.
         """
-        logger.info("Performing Louvain community detection...")
-        
-        # Build k-NN graph
-        knn = NearestNeighbors(n_neighbors=15, metric="cosine").fit(embeddings)
-        knn_graph = knn.kneighbors_graph(mode="connectivity")
+        logger.info(f"Performing community detection ({self.community_backend})...")
         
-        # Create NetworkX graph (handle version differences)
-        if hasattr(nx, "from_scipy_sparse_array"):
-            G = nx.from_scipy_sparse_array(knn_graph)
-        else:  # NetworkX <= 2.8
-            G = nx.from_scipy_sparse_matrix(knn_graph)
+        # 15-NN connectivity from the shared approximate graph
+        if knn_graph is None:
+            knn_graph = self.build_knn_graph(embeddings)
+        connectivity = knn_graph.connectivity(n_neighbors=LOUVAIN_NEIGHBORS)
         
-        # Perform Louvain clustering with resolution tuning
-        best_partition = None
-        best_resolution = 1.4
+        # Perform clustering with resolution tuning: candidate resolutions run in
+        # a process pool and are bisected toward the target. The CSR matrix is
+        # converted to the backend's graph type inside each worker
         target_reached = False
         
-        if target_clusters:
-            # Try to find resolution that gives target number of clusters
-            resolutions = [0.8, 1.0, 1.2, 1.4, 1.6, 1.8, 2.0, 2.2, 2.5, 3.0]
+        with ResolutionSearch(
+            connectivity,
+            random_state=self.random_state,
+            n_jobs=self.n_jobs,
+            backend=self.community_backend
+        ) as search:
+            if target_clusters:
+                cluster_labels, best_resolution, target_reached = search.search(target_clusters)
+            else:
+                best_resolution = DEFAULT_RESOLUTION
+                cluster_labels = search.at(best_resolution)
             
-            for resolution in resolutions:
-                partition = community_louvain.best_partition(
-                    G, 
-                    resolution=resolution, 
+            # Consensus mode: the other seeds run at the selected resolution in
+            # one parallel round on the same worker pool (graphs already built)
+            self.cluster_consensus = None
+            if self.consensus_seeds > 1:
+                seeds = consensus_seeds(self.random_state, self.consensus_seeds)
+                runs = search.at_seeds(best_resolution, seeds)
+                consensus = consensus_partition(
+                    connectivity,
+                    [labels for labels, _ in runs],
+                    best_resolution,
+                    backend=self.community_backend,
                     random_state=self.random_state
                 )
-                n_clusters = len(set(partition.values()))
-                logger.info(f"Resolution {resolution:.1f}: {n_clusters} clusters")
-                
-                if n_clusters == target_clusters:
-                    best_partition = partition
-                    best_resolution = resolution
-                    target_reached = True
-                    break
-                elif best_partition is None or abs(n_clusters - target_clusters) < abs(len(set(best_partition.values())) - target_clusters):
-                    best_partition = partition
-                    best_resolution = resolution
-        
-        if not best_partition:
-            # Fallback to default resolution
-            best_partition = community_louvain.best_partition(
-                G, 
-                resolution=1.4, 
-                random_state=self.random_state
-            )
+                cluster_labels = consensus["labels"]
+                search.partitions[round(best_resolution, 6)] = cluster_labels
+                if target_clusters:
+                    target_reached = len(np.unique(cluster_labels)) == target_clusters
+                self.cluster_consensus = {
+                    "seeds": seeds,
+                    "n_clusters": consensus["n_clusters"],
+                    "disagreement": consensus["disagreement"],
+                    "stability": consensus["stability"]
+                }
+                for seed, (labels, timing) in zip(seeds, runs):
+                    if timing is not None:
+                        self.profiler.record(
+                            "louvain",
+                            backend=self.community_backend,
+                            resolution=best_resolution,
+                            seed=seed,
+                            n_clusters=int(len(np.unique(labels))),
+                            **timing
+                        )
+            
+            # Coarser and finer levels over a wider, log-spaced range than the search
+            self.cluster_hierarchy = None
+            if self.hierarchy_levels:
+                search.evaluate(hierarchy_resolutions(self.hierarchy_levels))
+                self.cluster_hierarchy = build_hierarchy(search.partitions, best_resolution)
+            
+            # One profile span per evaluated resolution, timed in the worker
+            for resolution, timing in sorted(search.timings.items()):
+                self.profiler.record(
+                    "louvain",
+                    backend=self.community_backend,
+                    resolution=resolution,
+                    n_clusters=search.n_clusters(resolution),
+                    **timing
+                )
         
-        # Convert to cluster labels array
-        cluster_labels = np.array([best_partition[i] for i in range(len(embeddings))])
         n_clusters = len(np.unique(cluster_labels))
         
         if target_clusters and not target_reached:
-            logger.warning(f"Could not achieve exactly {target_clusters} clusters. Got {n_clusters} clusters with resolution {best_resolution:.1f}")
+            logger.warning(f"Could not achieve exactly {target_clusters} clusters. Got {n_clusters} clusters with resolution {best_resolution:.3f}")
         else:
-            logger.info(f"Successfully generated {n_clusters} clusters with resolution {best_resolution:.1f}")
+            logger.info(f"Successfully generated {n_clusters} clusters with resolution {best_resolution:.3f}")
         
         return cluster_labels, best_resolution
     
     def generate_cluster_titles(
         self, 
         cluster_labels: np.ndarray, 
-        texts: List[str]
+        texts: List[str],
+        embeddings: Optional[np.ndarray] = None
     ) -> Dict[int, str]:
         """
-        Generate semantic cluster titles using KeyBERT
+        Generate semantic cluster titles with the configured title engine
         """
+        if self.title_engine == "ctfidf":
+            logger.info("Generating cluster titles with c-TF-IDF...")
+            cluster_titles = ctfidf_titles(cluster_labels, texts, stop_words=list(self.stopwords))
+            logger.info(f"Generated titles for {len(cluster_titles)} clusters")
+            return cluster_titles
+        
+        if self.title_engine == "batched" and embeddings is not None:
+            logger.info("Generating cluster titles with batched centroid scoring...")
+            
+            def encode_terms(terms: List[str]) -> np.ndarray:
+                with self.embedder_lock:
+                    return self.embedder.encode(
+                        terms, batch_size=256, show_progress_bar=False, convert_to_numpy=True
+                    )
+            
+            cluster_titles = batched_titles(
+                cluster_labels,
+                texts,
+                embeddings,
+                encode=encode_terms,
+                stop_words=list(self.stopwords)
+            )
+            logger.info(f"Generated titles for {len(cluster_titles)} clusters")
+            return cluster_titles
+        
+        if self.kw_model is None:
+            self.kw_model = self._keybert()
+        
         logger.info("Generating cluster titles with KeyBERT...")
         
         cluster_titles = {}
@@ -254,12 +840,13 @@ class OrionPreprocessor:
             
             if joined_text.strip():
                 try:
-                    # Extract top 2 keywords
-                    keywords = self.kw_model.extract_keywords(
-                        joined_text, 
-                        top_n=2, 
-                        stop_words=list(self.stopwords)
-                    )
+                    # Extract top 2 keywords (KeyBERT encodes with the shared embedder)
+                    with self.embedder_lock:
+                        keywords = self.kw_model.extract_keywords(
+                            joined_text, 
+                            top_n=2, 
+                            stop_words=list(self.stopwords)
+                        )
                     
                     if keywords:
                         cluster_titles[cluster_id] = " & ".join([kw for kw, _ in keywords])
@@ -278,97 +865,533 @@ class OrionPreprocessor:
     def process_forces(
         self, 
         forces_data: List[Dict[str, Any]], 
-        target_clusters: Optional[int] = None
+        target_clusters: Optional[int] = None,
+        artifact_path: Optional[str] = None,
+        previous_artifact: Optional[Dict[str, Any]] = None
     ) -> Dict[str, Any]:
         """
-        Complete preprocessing pipeline for ORION forces
+        Complete preprocessing pipeline for ORION forces.
+        With a previous run's features artifact, clusters keep that run's IDs
+        where their members overlap and results["cluster_diff"] lists the changes.
         """
         logger.info("Starting ORION preprocessing pipeline...")
         
+        self.profiler = StageProfiler()
+        self._landmarks = None
+        n_forces = len(forces_data)
+        
         # Initialize models
-        self.initialize_models()
+        self._report_progress("models")
+        with self.profiler.stage("models"):
+            self.initialize_models()
+        
+        # Stage outputs are checkpointed when a checkpoint directory is configured
+        checkpoints = StageCheckpointer(
+            self.checkpoint_dir,
+            fingerprint_forces(forces_data) if self.checkpoint_dir else ""
+        )
         
         # Step 1: Preprocess texts
-        texts = self.prepare_texts(forces_data)
+        texts = self._run_stage(
+            checkpoints, "texts",
+            {"stopwords": sorted(self.stopwords)},
+            lambda: self.prepare_texts(forces_data),
+            items=n_forces, n_forces=n_forces
+        )
+        
+        # Step 2: Collapse duplicates; the following stages run on one
+        # representative per group and results are fanned back out afterwards
+        duplicates = self._run_stage(
+            checkpoints, "dedup",
+            {"mode": self.dedup, "threshold": self.dedup_threshold, "random_state": self.random_state},
+            lambda: self.deduplicate_texts(texts),
+            items=n_forces
+        )
+        unique_texts = [texts[i] for i in duplicates.representatives]
+        n_unique = duplicates.n_unique
+        
+        # Step 3: Generate embeddings
+        embeddings = self._run_stage(
+            checkpoints, "embeddings",
+            {"model": self.embedding_id},
+            lambda: self.generate_embeddings(unique_texts),
+            items=n_unique, n_texts=n_unique
+        )
+        
+        # Step 4: Build the shared k-NN graph once
+        knn_graph = self._run_stage(
+            checkpoints, "knn",
+            {"metric": "cosine", "n_neighbors": GRAPH_NEIGHBORS, "random_state": self.random_state},
+            lambda: self.build_knn_graph(embeddings),
+            items=n_unique
+        )
+        
+        # Step 5: Apply UMAP reduction (both layouts at once)
+        layouts = self._run_stage(
+            checkpoints, "umap",
+            {"layouts": UMAP_LAYOUTS, "random_state": self.random_state, "landmarks": self.umap_landmarks},
+            lambda: self.fit_umap_layouts(embeddings, knn_graph),
+            items=n_unique
+        )
+        coords_3d, self.umap_3d_model = layouts["3d"]
+        coords_2d, self.umap_2d_model = layouts["2d"]
+        
+        # Step 6: Perform clustering
+        cluster_labels, resolution_used, self.cluster_hierarchy, self.cluster_consensus = self._run_stage(
+            checkpoints, "partition",
+            {
+                "target_clusters": target_clusters,
+                "backend": self.community_backend,
+                "hierarchy_levels": self.hierarchy_levels,
+                "consensus_seeds": self.consensus_seeds,
+                "random_state": self.random_state
+            },
+            lambda: (
+                *self.perform_louvain_clustering(embeddings, target_clusters, knn_graph),
+                self.cluster_hierarchy,
+                self.cluster_consensus
+            ),
+            items=n_unique, target_clusters=target_clusters
+        )
         
-        # Step 2: Generate embeddings
-        embeddings = self.generate_embeddings(texts)
+        force_ids = [force.get("id", f"force_{i}") for i, force in enumerate(forces_data)]
         
-        # Step 3: Apply UMAP reduction
-        coords_2d, coords_3d = self.apply_umap_reduction(embeddings)
+        # Step 6b: Renumber communities to keep the previous run's cluster IDs
+        alignment = None
+        if previous_artifact is not None:
+            alignment = self._run_stage(
+                checkpoints, "align",
+                {
+                    "previous": partition_fingerprint(previous_artifact["ids"], previous_artifact["cluster_labels"]),
+                    "min_jaccard": DEFAULT_MIN_JACCARD
+                },
+                lambda: align_partition(
+                    force_ids,
+                    duplicates.expand(cluster_labels),
+                    previous_artifact["ids"],
+                    previous_artifact["cluster_labels"]
+                ),
+                items=n_forces
+            )
+            cluster_labels = relabel(cluster_labels, alignment["mapping"])
+            if self.cluster_hierarchy is not None:
+                self.cluster_hierarchy = self.cluster_hierarchy.relabel_selected(cluster_labels)
         
-        # Step 4: Perform clustering
-        cluster_labels, resolution_used = self.perform_louvain_clustering(
-            embeddings, target_clusters
+        # Step 7: Generate cluster titles
+        cluster_titles = self._run_stage(
+            checkpoints, "titles",
+            {"engine": self.title_engine},
+            lambda: self.generate_cluster_titles(cluster_labels, unique_texts, embeddings),
+            items=n_unique, n_clusters=int(len(np.unique(cluster_labels)))
         )
         
-        # Step 5: Generate cluster titles
-        cluster_titles = self.generate_cluster_titles(cluster_labels, texts)
+        # Step 8: Calculate quality metrics (sampled silhouette unless exact is requested).
+        # Representatives are weighted by their duplicate group size, so the
+        # metrics describe every force, as without deduplication
+        group_sizes = duplicates.sizes if n_unique < duplicates.n_rows else None
+        quality_metrics = self._run_stage(
+            checkpoints, "metrics",
+            {
+                "sample_size": self.silhouette_sample_size,
+                "exact": self.exact_silhouette,
+                "random_state": self.random_state,
+                "weighted": group_sizes is not None
+            },
+            lambda: compute_quality_metrics(
+                embeddings,
+                cluster_labels,
+                sample_size=self.silhouette_sample_size,
+                exact_silhouette=self.exact_silhouette,
+                metric="cosine",
+                random_state=self.random_state,
+                sample_weight=group_sizes
+            ),
+            items=n_unique
+        )
+        silhouette = quality_metrics["silhouette"]
         
-        # Step 6: Calculate quality metrics
-        silhouette = silhouette_score(embeddings, cluster_labels, metric="cosine")
+        if checkpoints.resumed:
+            logger.info(f"Resumed stages from checkpoints: {', '.join(checkpoints.resumed)}")
         
-        # Step 7: Prepare results
+        # Step 9: Prepare results, fanned out to every input row
+        # (columns stay numpy arrays until they are saved)
         results = {
-            "id": [force.get("id", f"force_{i}") for i, force in enumerate(forces_data)],
-            "cluster_labels": cluster_labels.tolist(),
-            "cluster_titles": cluster_titles,
-            "umap2d_x": coords_2d[:, 0].astype(float).tolist(),
-            "umap2d_y": coords_2d[:, 1].astype(float).tolist(),
-            "tsne_x": coords_3d[:, 0].astype(float).tolist(),  # Using UMAP 3D as tsne for compatibility
-            "tsne_y": coords_3d[:, 1].astype(float).tolist(),
-            "tsne_z": coords_3d[:, 2].astype(float).tolist(),
-            "umap3d_x": coords_3d[:, 0].astype(float).tolist(),
-            "umap3d_y": coords_3d[:, 1].astype(float).tolist(),
-            "umap3d_z": coords_3d[:, 2].astype(float).tolist(),
+            "id": force_ids,
+            "cluster_labels": np.asarray(duplicates.expand(cluster_labels), dtype=np.int32),
+            "cluster_titles": {int(k): v for k, v in cluster_titles.items()},
+            **self._coordinate_columns(duplicates.expand(coords_2d), duplicates.expand(coords_3d)),
             "silhouette_score": float(silhouette),
+            "quality_metrics": quality_metrics,
             "n_clusters": int(len(cluster_titles)),
-            "resolution_used": float(resolution_used)
+            "resolution_used": float(resolution_used),
+            # Level summary only; the labels of every level are in the artifact
+            "cluster_hierarchy": {
+                "levels": self.cluster_hierarchy.levels() if self.cluster_hierarchy is not None else []
+            },
+            "n_unique": int(n_unique),
+            "duplicate_groups": self.duplicate_report(duplicates, forces_data)
         }
+        if alignment is not None:
+            results["cluster_diff"] = alignment["diff"]
+        if self.cluster_consensus is not None:
+            stability = self.cluster_consensus["stability"]
+            results["cluster_stability"] = duplicates.expand(stability)
+            results["cluster_consensus"] = {
+                **{key: value for key, value in self.cluster_consensus.items() if key != "stability"},
+                "mean_stability": float(stability.mean()),
+                "min_stability": float(stability.min())
+            }
+        
+        # Step 10: Persist model state for incremental assignment and similarity search
+        if artifact_path:
+            steep = [force.get("steep") for force in forces_data]
+            force_type = [force.get("type") for force in forces_data]
+            with self.profiler.stage("artifact"):
+                save_features_artifact(artifact_path, {
+                    "model_name": self.model_name,
+                    "embedding_id": self.embedding_id,
+                    "random_state": self.random_state,
+                    "ids": results["id"],
+                    # One row per duplicate group; written straight from the
+                    # (possibly memory-mapped) matrix, never expanded to every force
+                    "embeddings": np.asarray(embeddings, dtype=np.float32),
+                    "cluster_labels": results["cluster_labels"],
+                    "cluster_titles": results["cluster_titles"],
+                    "resolution_used": float(resolution_used),
+                    "umap_2d": self.umap_2d_model,
+                    "umap_3d": self.umap_3d_model,
+                    "steep": steep,
+                    "force_type": force_type,
+                    # The k-NN graph indexes representatives, not rows
+                    "representatives": duplicates.representatives,
+                    "representative_of": duplicates.inverse,
+                    **(
+                        {"cluster_stability": results["cluster_stability"]}
+                        if self.cluster_consensus is not None else {}
+                    ),
+                    **knn_graph.to_dict(),
+                    **(
+                        self.cluster_hierarchy.expand(duplicates.inverse).to_dict()
+                        if self.cluster_hierarchy is not None else {}
+                    ),
+                    **compute_cluster_centroids(embeddings, cluster_labels)
+                })
+            with self.profiler.stage("classifier", items=n_unique):
+                save_cluster_classifier(cluster_classifier_path(artifact_path), build_cluster_classifier(
+                    embeddings,
+                    cluster_labels,
+                    results["cluster_titles"],
+                    ids=[force_ids[row] for row in duplicates.representatives],
+                    model_name=self.model_name,
+                    embedding_id=self.embedding_id
+                ))
+            with self.profiler.stage("similarity_index", items=n_unique):
+                save_similarity_index(similarity_index_path(artifact_path), SimilarityIndex.build(
+                    results["id"],
+                    embeddings,
+                    duplicates.inverse,
+                    results["cluster_labels"],
+                    steep=steep,
+                    force_type=force_type,
+                    search_index=knn_graph.search_index,
+                    random_state=self.random_state,
+                    n_jobs=self.n_jobs
+                ))
         
+        # Without checkpoints nothing refers to the mapped embeddings after this run
+        if self.embedding_store is not None and not checkpoints.enabled:
+            self.embedding_store.discard(embeddings)
+        
+        results["profile"] = self.profiler.report()
+        self._report_progress("done", n_clusters=results["n_clusters"])
         logger.info(f"Preprocessing completed successfully!")
         logger.info(f"Generated {results['n_clusters']} clusters with silhouette score: {silhouette:.3f}")
         
         return results
+    
+    @staticmethod
+    def _coordinate_columns(coords_2d: np.ndarray, coords_3d: np.ndarray) -> Dict[str, np.ndarray]:
+        """
+        float32 coordinate columns; tsne_* alias the UMAP 3D columns for compatibility
+        """
+        coords_2d = np.asarray(coords_2d, dtype=np.float32)
+        coords_3d = np.asarray(coords_3d, dtype=np.float32)
+        return {
+            "umap2d_x": coords_2d[:, 0],
+            "umap2d_y": coords_2d[:, 1],
+            "tsne_x": coords_3d[:, 0],  # Using UMAP 3D as tsne for compatibility
+            "tsne_y": coords_3d[:, 1],
+            "tsne_z": coords_3d[:, 2],
+            "umap3d_x": coords_3d[:, 0],
+            "umap3d_y": coords_3d[:, 1],
+            "umap3d_z": coords_3d[:, 2]
+        }
+    
+    def assign_forces(
+        self,
+        forces_data: List[Dict[str, Any]],
+        artifact: Dict[str, Any],
+        n_neighbors: int = 15
+    ) -> Dict[str, Any]:
+        """
+        Place new forces into the clusters of a previous run without reclustering.
+        Labels come from a nearest-neighbour vote against the stored embeddings
+        (one per duplicate group) and coordinates from the stored UMAP models' transform().
+        """
+        logger.info(f"Assigning {len(forces_data)} new forces to existing clusters...")
+        
+        if artifact["model_name"] != self.model_name:
+            raise ValueError(
+                f"Artifact was built with {artifact['model_name']!r}, "
+                f"but this preprocessor uses {self.model_name!r}"
+            )
+        if artifact.get("embedding_id", artifact["model_name"]) != self.embedding_id:
+            logger.warning(f"Artifact embeddings come from {artifact.get('embedding_id', artifact['model_name'])!r}, "
+                           f"new forces are embedded with {self.embedding_id!r}")
+        
+        self.profiler = StageProfiler()
+        n_forces = len(forces_data)
+        
+        # Only the embedder is needed - skip KeyBERT
+        self._report_progress("models")
+        with self.profiler.stage("models"):
+            self.initialize_models(load_keybert=False)
+        
+        self._report_progress("texts", n_forces=n_forces)
+        with self.profiler.stage("texts", items=n_forces):
+            texts = self.prepare_texts(forces_data)
+        self._report_progress("embeddings", n_texts=len(texts))
+        with self.profiler.stage("embeddings", items=n_forces):
+            embeddings = self.generate_embeddings(texts)
+        
+        self._report_progress("assign")
+        with self.profiler.stage("assign", items=n_forces):
+            reference, reference_labels = vote_reference(artifact)
+            assignment = nearest_neighbor_vote(
+                reference,
+                reference_labels,
+                embeddings,
+                n_neighbors=n_neighbors,
+                normalized=True
+            )
+        cluster_labels = assignment["labels"].astype(np.int32)
+        
+        logger.info("Projecting new forces with stored UMAP models...")
+        with self.profiler.stage("umap3d", items=n_forces):
+            coords_3d = artifact["umap_3d"].transform(embeddings)
+        with self.profiler.stage("umap2d", items=n_forces):
+            coords_2d = artifact["umap_2d"].transform(embeddings)
+        if self.embedding_store is not None:
+            self.embedding_store.discard(embeddings)
+        
+        results = {
+            "id": [force.get("id", f"force_{i}") for i, force in enumerate(forces_data)],
+            "cluster_labels": cluster_labels,
+            "cluster_titles": {int(k): v for k, v in artifact["cluster_titles"].items()},
+            "assignment_confidence": assignment["confidence"].astype(np.float32),
+            **self._coordinate_columns(coords_2d, coords_3d),
+            "n_clusters": int(len(artifact["centroid_labels"])),
+            "resolution_used": artifact.get("resolution_used"),
+            "mode": "assign_only",
+            "profile": self.profiler.report()
+        }
+        
+        self._report_progress("done", n_forces=len(cluster_labels))
+        logger.info(f"Assigned {len(cluster_labels)} forces across "
+                    f"{len(np.unique(cluster_labels))} existing clusters")
+        return results
+
+    def classify_forces(self, forces_data: List[Dict[str, Any]], classifier: ClusterClassifier) -> Dict[str, Any]:
+        """
+        Tag new forces with the nearest cluster of a classifier built by a full run.
+        Needs only the embedder: no UMAP, KeyBERT or stored embeddings.
+        """
+        logger.info(f"Classifying {len(forces_data)} new forces against {classifier.n_clusters} clusters...")
+        
+        if classifier.model_name != self.model_name:
+            raise ValueError(
+                f"Classifier was built with {classifier.model_name!r}, "
+                f"but this preprocessor uses {self.model_name!r}"
+            )
+        if classifier.embedding_id not in (None, self.embedding_id):
+            logger.warning(f"Classifier centroids come from {classifier.embedding_id!r}, "
+                           f"new forces are embedded with {self.embedding_id!r}")
+        
+        self.profiler = StageProfiler()
+        n_forces = len(forces_data)
+        
+        self._report_progress("models")
+        with self.profiler.stage("models"):
+            self.initialize_models(load_keybert=False)
+        
+        self._report_progress("texts", n_forces=n_forces)
+        with self.profiler.stage("texts", items=n_forces):
+            texts = self.prepare_texts(forces_data)
+        self._report_progress("embeddings", n_texts=len(texts))
+        with self.profiler.stage("embeddings", items=n_forces):
+            embeddings = self.generate_embeddings(texts)
+        
+        self._report_progress("classify")
+        with self.profiler.stage("classify", items=n_forces):
+            tags = classifier.classify(embeddings)
+        if self.embedding_store is not None:
+            self.embedding_store.discard(embeddings)
+        
+        results = {
+            "id": [force.get("id", f"force_{i}") for i, force in enumerate(forces_data)],
+            "cluster_labels": tags["labels"].astype(np.int32),
+            "cluster_titles": classifier.cluster_titles,
+            "cluster_similarity": tags["similarity"],
+            "cluster_margin": tags["margin"],
+            "outlier_score": tags["outlier_score"],
+            "outlier": tags["outlier"],
+            "n_clusters": classifier.n_clusters,
+            "mode": "classify_only",
+            "profile": self.profiler.report()
+        }
+        
+        self._report_progress("done", n_forces=n_forces)
+        logger.info(f"Classified {n_forces} forces, {int(tags['outlier'].sum())} flagged as outliers")
+        return results
 
 def main():
     parser = argparse.ArgumentParser(description="ORION Clustering Preprocessing")
-    parser.add_argument("--input", required=True, help="Input JSON file with forces data")
-    parser.add_argument("--output", required=True, help="Output pickle file for results")
+    parser.add_argument("--input", default=None,
+                       help="Input forces: NDJSON (.ndjson/.jsonl) or JSON array file, or - for NDJSON on stdin")
+    parser.add_argument("--output", default=None,
+                       help="Output file: .npz or .arrow/.feather (columnar, float32), "
+                            ".json (compatibility) or pickle (any other extension)")
     parser.add_argument("--target-clusters", type=int, default=None, 
                        help="Target number of clusters (optional)")
     parser.add_argument("--random-state", type=int, default=42,
                        help="Random state for reproducibility")
+    parser.add_argument("--n-jobs", type=int, default=None,
+                       help="Worker processes for parallel stages (default: all available cores)")
+    parser.add_argument("--silhouette-sample-size", type=int, default=DEFAULT_SILHOUETTE_SAMPLE_SIZE,
+                       help="Sample budget for the stratified silhouette estimate")
+    parser.add_argument("--exact-silhouette", action="store_true",
+                       help="Compute the exact O(n^2) silhouette score instead of the estimate")
+    parser.add_argument("--title-engine", choices=TITLE_ENGINES, default="keybert",
+                       help="Cluster title engine: per-cluster KeyBERT, batched centroid scoring, "
+                            "or model-free c-TF-IDF")
+    parser.add_argument("--dedup", choices=DEDUP_MODES, default="near",
+                       help="Collapse exact or near-duplicate texts before embedding (default: near)")
+    parser.add_argument("--dedup-threshold", type=float, default=DEFAULT_DEDUP_THRESHOLD,
+                       help="Minimum estimated shingle Jaccard similarity for near duplicates")
+    parser.add_argument("--embedding-backend", choices=EMBEDDING_BACKENDS, default="torch",
+                       help="Embedding runtime: fp32 PyTorch, ONNX Runtime, or int8-quantized ONNX Runtime")
+    parser.add_argument("--model-path", default=None,
+                       help=f"Local directory with a copy of {EMBEDDING_MODEL_NAME} (nothing is downloaded)")
+    parser.add_argument("--max-seq-length", type=int, default=None,
+                       help="Truncate texts to this many tokens before embedding (default: model setting)")
+    parser.add_argument("--batch-token-budget", type=int, default=DEFAULT_TOKEN_BUDGET,
+                       help="Padded tokens per embedding batch (texts are batched longest first)")
+    parser.add_argument("--embedding-workers", type=int, default=None,
+                       help=f"Embed corpora of {MIN_POOL_TEXTS}+ texts in this many pinned worker processes")
+    parser.add_argument("--embedding-store", default=None,
+                       help="Out-of-core mode: keep embeddings in memory-mapped files in this directory")
+    parser.add_argument("--umap-landmarks", type=int, default=None,
+                       help="Fit UMAP on this many stratified landmarks and transform the rest "
+                            "(only when the corpus is larger)")
+    parser.add_argument("--community-backend", choices=COMMUNITY_BACKENDS, default=DEFAULT_COMMUNITY_BACKEND,
+                       help="Community detection: python-louvain over NetworkX, or igraph Louvain/Leiden on the CSR graph")
+    parser.add_argument("--hierarchy-levels", type=int, default=DEFAULT_HIERARCHY_LEVELS,
+                       help="Resolutions partitioned for the cluster hierarchy stored in the artifact "
+                            "(default 0: no hierarchy; each level costs one extra partition)")
+    parser.add_argument("--consensus-seeds", type=int, default=DEFAULT_CONSENSUS_SEEDS,
+                       help="Partition the selected resolution with this many seeds in parallel and cluster "
+                            "their co-association graph, with per-force stability (0 or 1 disables)")
+    parser.add_argument("--checkpoint-dir", default=None,
+                       help="Directory for per-stage checkpoints; reruns with the same inputs "
+                            "and parameters resume from the last valid stage")
+    parser.add_argument("--embedding-cache", default=os.environ.get("ORION_EMBEDDING_CACHE"),
+                       help="Directory for the persistent embedding cache (default: $ORION_EMBEDDING_CACHE)")
+    parser.add_argument("--artifact", default=None,
+                       help="Features artifact (embeddings, UMAP models, centroids): "
+                            "written by a full run, read by --assign-only")
+    parser.add_argument("--align-to", default=None,
+                       help="Previous features artifact whose cluster IDs are kept where members overlap "
+                            "(may be the same path as --artifact)")
+    parser.add_argument("--cluster-diff", default=None,
+                       help="With --align-to, also write the moved/added/removed forces as JSON to this file")
+    parser.add_argument("--assign-only", action="store_true",
+                       help="Assign input forces to the clusters stored in --artifact "
+                            "instead of recomputing the full pipeline")
+    parser.add_argument("--classify-only", action="store_true",
+                       help="Tag input forces with the nearest cluster of the classifier stored next to "
+                            "--artifact (loads neither UMAP nor KeyBERT)")
+    parser.add_argument("--inspect-artifact", default=None,
+                       help="Print a summary of this features artifact and exit (no pipeline run)")
+    parser.add_argument("--profile-trace", default=None,
+                       help="Also write the per-stage profile as a Chrome trace-event JSON file")
     
     args = parser.parse_args()
     
+    if args.inspect_artifact:
+        print(json.dumps(inspect_features_artifact(args.inspect_artifact), indent=2))
+        return
+    if not args.input or not args.output:
+        parser.error("--input and --output are required")
+    if args.assign_only and not args.artifact:
+        parser.error("--assign-only requires --artifact")
+    if args.classify_only and not args.artifact:
+        parser.error("--classify-only requires --artifact")
+    if args.classify_only and args.assign_only:
+        parser.error("--classify-only and --assign-only are mutually exclusive")
+    if args.cluster_diff and not args.align_to:
+        parser.error("--cluster-diff requires --align-to")
+    
     try:
         # Load input data
-        logger.info(f"Loading data from {args.input}")
-        with open(args.input, 'r') as f:
-            forces_data = json.load(f)
-        
-        if not isinstance(forces_data, list):
-            logger.error("Input data must be a list of force objects")
-            sys.exit(1)
-        
-        logger.info(f"Loaded {len(forces_data)} forces")
+        forces_data = load_forces(args.input)
         
         # Process data
-        preprocessor = OrionPreprocessor(random_state=args.random_state)
-        results = preprocessor.process_forces(forces_data, args.target_clusters)
-        
-        # Save results - support both JSON and pickle formats
-        logger.info(f"Saving results to {args.output}")
+        preprocessor = OrionPreprocessor(
+            random_state=args.random_state,
+            embedding_cache_dir=args.embedding_cache,
+            n_jobs=args.n_jobs,
+            silhouette_sample_size=args.silhouette_sample_size,
+            exact_silhouette=args.exact_silhouette,
+            title_engine=args.title_engine,
+            checkpoint_dir=args.checkpoint_dir,
+            dedup=args.dedup,
+            dedup_threshold=args.dedup_threshold,
+            embedding_backend=args.embedding_backend,
+            max_seq_length=args.max_seq_length,
+            batch_token_budget=args.batch_token_budget,
+            embedding_workers=args.embedding_workers,
+            embedding_store_dir=args.embedding_store,
+            model_path=args.model_path,
+            umap_landmarks=args.umap_landmarks,
+            community_backend=args.community_backend,
+            hierarchy_levels=args.hierarchy_levels,
+            consensus_seeds=args.consensus_seeds
+        )
+        try:
+            if args.assign_only:
+                artifact = load_features_artifact(args.artifact)
+                logger.info(f"Artifact: {artifact_summary(artifact)}")
+                results = preprocessor.assign_forces(forces_data, artifact)
+            elif args.classify_only:
+                classifier = load_cluster_classifier(cluster_classifier_path(args.artifact))
+                logger.info(f"Classifier: {classifier.summary()}")
+                results = preprocessor.classify_forces(forces_data, classifier)
+            else:
+                # Loaded before the run, which may overwrite the same artifact
+                previous = load_features_artifact(args.align_to) if args.align_to else None
+                results = preprocessor.process_forces(
+                    forces_data, args.target_clusters, artifact_path=args.artifact, previous_artifact=previous
+                )
+        finally:
+            preprocessor.close()
         
-        if args.output.endswith('.json'):
-            # Save as JSON for TypeScript integration
-            with open(args.output, 'w') as f:
-                json.dump(results, f, indent=2)
-        else:
-            # Save as pickle (default)
-            with open(args.output, 'wb') as f:
-                pickle.dump(results, f)
+        # Save results - format chosen by the output extension
+        save_results(results, args.output)
+        if args.cluster_diff:
+            with open(args.cluster_diff, "w") as f:
+                json.dump(to_jsonable(results["cluster_diff"]), f)
+        if args.profile_trace:
+            write_chrome_trace(results["profile"], args.profile_trace)
         
         logger.info("✅ ORION preprocessing completed successfully!")
         
@@ -377,11 +1400,24 @@ def main():
         print("PREPROCESSING SUMMARY")
         print("="*50)
         print(f"Input forces: {len(forces_data)}")
-        print(f"Generated clusters: {results['n_clusters']}")
-        print(f"Silhouette score: {results['silhouette_score']:.3f}")
-        print(f"Resolution used: {results['resolution_used']:.2f}")
+        if args.assign_only:
+            print(f"Assigned to existing clusters: {results['n_clusters']}")
+        elif args.classify_only:
+            print(f"Classified against clusters: {results['n_clusters']} "
+                  f"({int(results['outlier'].sum())} outliers)")
+        else:
+            print(f"Unique after deduplication: {results['n_unique']} "
+                  f"({len(results['duplicate_groups'])} duplicate groups)")
+            print(f"Generated clusters: {results['n_clusters']}")
+            print(f"Silhouette score: {results['silhouette_score']:.3f}")
+            print(f"Resolution used: {results['resolution_used']:.2f}")
+            if "cluster_diff" in results:
+                summary = results["cluster_diff"]["summary"]
+                print(f"Moved forces: {summary['n_moved']} of {summary['n_shared']} "
+                      f"({summary['n_new_clusters']} new, {summary['n_retired_clusters']} retired clusters)")
         print(f"Output saved to: {args.output}")
         print("="*50)
+        print(format_profile(results["profile"]))
         
     except Exception as e:
         logger.error(f"Error during preprocessing: {e}")
@@ -0,0 +1,146 @@
+"""
+ORION Partition Alignment - Stable cluster IDs across reruns
+
+Louvain numbers its communities arbitrarily, so every rerun reshuffles the
+cluster IDs even when most forces stay together, and downstream tables have to
+be rewritten in full. This module matches the communities of a new run to the
+clusters of a previous features artifact by member overlap, renumbers them to
+keep the previous IDs, and reports which forces actually changed cluster.
+
+Key Features:
+- Forces matched across runs by id; overlap measured on forces present in both
+- One-to-one matching that maximises total Jaccard overlap (Hungarian method),
+  ignoring pairs below a minimum Jaccard
+- Unmatched communities get fresh IDs above every previous ID, so a retired ID
+  never comes back with a different meaning
+- Diff of moved, added and removed forces plus matched, new and retired clusters
+"""
+
+import json
+import hashlib
+import logging
+from typing import Any, Dict, Sequence
+
+import numpy as np
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Constants
+DEFAULT_MIN_JACCARD = 0.1
+
+
+def partition_fingerprint(ids: Sequence[Any], labels: np.ndarray) -> str:
+    """
+    SHA256 over the ids and labels of a partition (keys alignment checkpoints).
+    """
+    digest = hashlib.sha256(json.dumps([str(i) for i in ids]).encode("utf-8"))
+    digest.update(np.ascontiguousarray(labels, dtype=np.int64).tobytes())
+    return digest.hexdigest()
+
+
+def relabel(labels: np.ndarray, mapping: Dict[int, int]) -> np.ndarray:
+    """Apply a community -> cluster ID mapping to a label array."""
+    labels = np.asarray(labels)
+    communities = np.array(sorted(mapping), dtype=np.int64)
+    targets = np.array([mapping[c] for c in communities], dtype=np.int32)
+    return targets[np.searchsorted(communities, labels)]
+
+
+def align_partition(
+    ids: Sequence[Any],
+    labels: np.ndarray,
+    previous_ids: Sequence[Any],
+    previous_labels: np.ndarray,
+    min_jaccard: float = DEFAULT_MIN_JACCARD
+) -> Dict[str, Any]:
+    """
+    Renumber a new partition to reuse the cluster IDs of a previous one.
+
+    Args:
+        ids: Force id per row of the new run
+        labels: Community label per row of the new run
+        previous_ids: Force id per row of the previous run
+        previous_labels: Cluster label per row of the previous run
+        min_jaccard: Smallest member overlap (Jaccard, over shared forces) that
+            lets a community keep a previous ID
+
+    Returns:
+        Dict: 'mapping' (new community -> cluster ID) and 'diff' with
+        moved/added/removed forces and matched/new/retired clusters
+    """
+    from scipy.optimize import linear_sum_assignment
+
+    labels = np.asarray(labels)
+    previous_labels = np.asarray(previous_labels)
+    previous_row = {force_id: row for row, force_id in enumerate(previous_ids)}
+    shared = np.array([row for row, force_id in enumerate(ids) if force_id in previous_row], dtype=np.int64)
+    shared_previous = np.array([previous_row[ids[row]] for row in shared], dtype=np.int64)
+
+    communities, community_index = np.unique(labels, return_inverse=True)
+    clusters, cluster_index = np.unique(previous_labels, return_inverse=True)
+
+    # Member overlap on forces present in both runs
+    overlap = np.zeros((len(communities), len(clusters)), dtype=np.int64)
+    np.add.at(overlap, (community_index[shared], cluster_index[shared_previous]), 1)
+    community_sizes = overlap.sum(axis=1, keepdims=True)
+    cluster_sizes = overlap.sum(axis=0, keepdims=True)
+    union = community_sizes + cluster_sizes - overlap
+    jaccard = np.divide(overlap, union, out=np.zeros(overlap.shape), where=union > 0)
+
+    mapping: Dict[int, int] = {}
+    matched = []
+    if overlap.size:
+        for row, col in zip(*linear_sum_assignment(jaccard, maximize=True)):
+            if overlap[row, col] > 0 and jaccard[row, col] >= min_jaccard:
+                mapping[int(communities[row])] = int(clusters[col])
+                matched.append({"id": int(clusters[col]), "jaccard": float(jaccard[row, col])})
+
+    # Fresh IDs for the rest, largest community first
+    next_id = int(clusters.max()) + 1 if len(clusters) else 0
+    sizes = np.bincount(community_index, minlength=len(communities))
+    new_clusters = []
+    for index in np.argsort(-sizes, kind="stable"):
+        community = int(communities[index])
+        if community not in mapping:
+            mapping[community] = next_id
+            new_clusters.append(next_id)
+            next_id += 1
+
+    aligned = relabel(labels, mapping)
+    moved = [
+        {"id": ids[row], "from": int(previous_labels[prev]), "to": int(aligned[row])}
+        for row, prev in zip(shared, shared_previous)
+        if aligned[row] != previous_labels[prev]
+    ]
+    current = set(ids)
+    shared_rows = set(shared.tolist())
+    diff = {
+        "moved": moved,
+        "added": [
+            {"id": force_id, "to": int(aligned[row])}
+            for row, force_id in enumerate(ids) if row not in shared_rows
+        ],
+        "removed": [
+            {"id": force_id, "from": int(previous_labels[row])}
+            for row, force_id in enumerate(previous_ids) if force_id not in current
+        ],
+        "matched_clusters": sorted(matched, key=lambda m: m["id"]),
+        "new_clusters": new_clusters,
+        "retired_clusters": sorted(set(int(c) for c in clusters) - set(mapping.values()))
+    }
+    diff["summary"] = {
+        "n_shared": int(len(shared)),
+        "n_moved": len(diff["moved"]),
+        "n_added": len(diff["added"]),
+        "n_removed": len(diff["removed"]),
+        "n_matched_clusters": len(matched),
+        "n_new_clusters": len(new_clusters),
+        "n_retired_clusters": len(diff["retired_clusters"])
+    }
+
+    logger.info(f"Aligned {len(communities)} communities to previous clusters: "
+                f"{len(matched)} matched, {len(new_clusters)} new, "
+                f"{len(diff['retired_clusters'])} retired; "
+                f"{len(moved)} of {len(shared)} shared forces moved")
+    return {"mapping": mapping, "diff": diff}
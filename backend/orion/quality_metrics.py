@@ -0,0 +1,354 @@
+"""
+ORION Quality Metrics - Scalable clustering quality estimates
+
+silhouette_score on the full embedding matrix needs every pairwise distance,
+which is O(n^2) in time and memory. This module estimates the silhouette from a
+stratified per-cluster sample and adds cheaper centroid-based indices.
+
+Key Features:
+- Stratified silhouette estimate with a configurable sample budget
+- 95% confidence interval from the stratified-sampling variance
+- Each sampled point is scored against the full corpus (not just the sample),
+  using per-cluster vector sums for cosine so the cost is O(sample x clusters x dim)
+- Exact sklearn silhouette kept as an opt-in
+- Davies-Bouldin and Calinski-Harabasz indices (both linear in n)
+- Optional point weights (duplicate group sizes): every metric then equals the
+  metric over all forces, with each representative standing in for its group
+"""
+
+import logging
+from typing import Dict, Any, Optional
+
+import numpy as np
+
+try:
+    from .embedding_store import row_chunks
+except ImportError:
+    from embedding_store import row_chunks
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Constants
+DEFAULT_SILHOUETTE_SAMPLE_SIZE = 5000
+Z_95 = 1.959964
+DISTANCE_CHUNK_SIZE = 512
+
+
+def _normalize_rows(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+def _weights(sample_weight: Optional[np.ndarray], n_points: int) -> np.ndarray:
+    """Point weights as float64 (all ones without sample_weight)."""
+    if sample_weight is None:
+        return np.ones(n_points, dtype=np.float64)
+    return np.asarray(sample_weight, dtype=np.float64)
+
+
+def stratified_sample(
+    cluster_labels: np.ndarray,
+    sample_size: int,
+    random_state: Optional[int] = None,
+    sample_weight: Optional[np.ndarray] = None
+) -> np.ndarray:
+    """
+    Draw a per-cluster sample with sizes proportional to cluster sizes.
+
+    Every cluster with at least two members contributes at least two points
+    so its within-cluster variance can be estimated.
+
+    Args:
+        cluster_labels: Cluster label per point
+        sample_size: Total sample budget
+        random_state: Seed for reproducible sampling
+        sample_weight: Weight per point; cluster sizes are then weight totals
+
+    Returns:
+        np.ndarray: Sorted indices of sampled points
+    """
+    rng = np.random.default_rng(random_state)
+    clusters, inverse, counts = np.unique(cluster_labels, return_inverse=True, return_counts=True)
+
+    if sample_size >= len(cluster_labels):
+        return np.arange(len(cluster_labels))
+
+    sizes = np.bincount(inverse, weights=_weights(sample_weight, len(cluster_labels)))
+    quotas = np.floor(sizes * sample_size / sizes.sum()).astype(int)
+    quotas = np.minimum(np.maximum(quotas, np.minimum(counts, 2)), counts)
+
+    sampled = []
+    for cluster_index, quota in enumerate(quotas):
+        members = np.where(inverse == cluster_index)[0]
+        sampled.append(rng.choice(members, size=quota, replace=False))
+
+    return np.sort(np.concatenate(sampled))
+
+
+def _mean_cluster_distances(
+    embeddings: np.ndarray,
+    inverse: np.ndarray,
+    counts: np.ndarray,
+    points: np.ndarray,
+    metric: str,
+    weights: np.ndarray
+) -> np.ndarray:
+    """
+    Summed (weighted) distance from each point in `points` to every member of each cluster.
+
+    Returns:
+        np.ndarray: (len(points) x n_clusters) distance sums
+    """
+    n_clusters = len(counts)
+
+    if metric == "cosine":
+        # sum_j w_j (1 - x_i . x_j) over cluster c == W_c - x_i . S_c for unit vectors;
+        # cluster sums are accumulated in row chunks (embeddings may be memory-mapped)
+        cluster_sums = np.zeros((n_clusters, embeddings.shape[1]), dtype=np.float64)
+        for rows in row_chunks(len(embeddings)):
+            unit = _normalize_rows(np.asarray(embeddings[rows], dtype=np.float64))
+            np.add.at(cluster_sums, inverse[rows], unit * weights[rows, None])
+        unit_points = _normalize_rows(np.asarray(embeddings[points], dtype=np.float64))
+        return counts[None, :] - unit_points @ cluster_sums.T
+
+    from sklearn.metrics import pairwise_distances
+
+    sums = np.zeros((len(points), n_clusters), dtype=np.float64)
+    for start in range(0, len(points), DISTANCE_CHUNK_SIZE):
+        block = points[start:start + DISTANCE_CHUNK_SIZE]
+        distances = pairwise_distances(embeddings[block], embeddings, metric=metric)
+        for cluster_index in range(n_clusters):
+            members = inverse == cluster_index
+            sums[start:start + len(block), cluster_index] = distances[:, members] @ weights[members]
+    return sums
+
+
+def point_silhouettes(
+    embeddings: np.ndarray,
+    cluster_labels: np.ndarray,
+    points: np.ndarray,
+    metric: str = "cosine",
+    sample_weight: Optional[np.ndarray] = None
+) -> np.ndarray:
+    """
+    Exact silhouette values of selected points against the full corpus.
+
+    With sample_weight, point j counts as sample_weight[j] identical points
+    (its duplicate group), which are at distance 0 from each other.
+    Singleton clusters score 0, following sklearn's convention.
+    """
+    _, inverse = np.unique(cluster_labels, return_inverse=True)
+    inverse = inverse.ravel()
+    weights = _weights(sample_weight, len(inverse))
+    counts = np.bincount(inverse, weights=weights)
+    sums = _mean_cluster_distances(embeddings, inverse, counts, points, metric, weights)
+
+    own = inverse[points]
+    own_counts = counts[own]
+    rows = np.arange(len(points))
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        a = np.maximum(sums[rows, own], 0.0) / (own_counts - 1)
+        other = np.maximum(sums, 0.0) / counts[None, :]
+        other[rows, own] = np.inf
+        b = other.min(axis=1)
+        s = (b - a) / np.maximum(a, b)
+
+    s[own_counts == 1] = 0.0
+    return np.nan_to_num(s, nan=0.0)
+
+
+def estimate_silhouette(
+    embeddings: np.ndarray,
+    cluster_labels: np.ndarray,
+    sample_size: int = DEFAULT_SILHOUETTE_SAMPLE_SIZE,
+    metric: str = "cosine",
+    random_state: Optional[int] = None,
+    sample_weight: Optional[np.ndarray] = None
+) -> Dict[str, Any]:
+    """
+    Stratified estimate of the mean silhouette with a 95% confidence interval.
+
+    With sample_weight, strata are weighted by their weight totals and each
+    stratum mean is the weight-weighted (ratio) mean of its sampled points.
+
+    Args:
+        embeddings: Embedding matrix (n_points x dim)
+        cluster_labels: Cluster label per point
+        sample_size: Total sample budget
+        metric: Distance metric
+        random_state: Seed for reproducible sampling
+        sample_weight: Weight per point (e.g. duplicate group size)
+
+    Returns:
+        Dict: estimate, confidence interval and sample size
+    """
+    cluster_labels = np.asarray(cluster_labels)
+    weights = _weights(sample_weight, len(cluster_labels))
+    points = stratified_sample(cluster_labels, sample_size, random_state, sample_weight)
+    values = point_silhouettes(embeddings, cluster_labels, points, metric, sample_weight)
+
+    clusters, inverse, counts = np.unique(cluster_labels, return_inverse=True, return_counts=True)
+    populations = np.bincount(inverse.ravel(), weights=weights)
+    n_total = populations.sum()
+    sampled_labels = cluster_labels[points]
+    sampled_weights = weights[points]
+
+    # Stratified ratio estimate and its linearised variance (with finite
+    # population correction); with unit weights the plain stratified mean
+    estimate = 0.0
+    variance = 0.0
+    for cluster, members, population in zip(clusters, counts, populations):
+        in_stratum = sampled_labels == cluster
+        stratum, stratum_weights = values[in_stratum], sampled_weights[in_stratum]
+        if len(stratum) == 0:
+            continue
+        weight = population / n_total
+        mean = float(np.average(stratum, weights=stratum_weights))
+        estimate += weight * mean
+        if len(stratum) > 1:
+            fpc = 1.0 - len(stratum) / members
+            residuals = stratum_weights * (stratum - mean) / stratum_weights.mean()
+            variance += weight ** 2 * residuals.var(ddof=1) / len(stratum) * fpc
+
+    margin = Z_95 * float(np.sqrt(variance))
+    return {
+        "silhouette": float(estimate),
+        "silhouette_ci95": [float(estimate - margin), float(estimate + margin)],
+        "silhouette_method": "sampled" if len(points) < len(cluster_labels) else "full",
+        "silhouette_sample_size": int(len(points))
+    }
+
+
+def weighted_cluster_indices(
+    embeddings: np.ndarray,
+    cluster_labels: np.ndarray,
+    sample_weight: np.ndarray
+) -> Dict[str, float]:
+    """
+    Davies-Bouldin and Calinski-Harabasz indices with weighted points, equal to
+    sklearn's indices over the data with every point repeated by its weight.
+
+    Returns:
+        Dict: 'davies_bouldin' and 'calinski_harabasz'
+    """
+    _, inverse = np.unique(cluster_labels, return_inverse=True)
+    inverse = inverse.ravel()
+    weights = np.asarray(sample_weight, dtype=np.float64)
+    n_clusters = int(inverse.max()) + 1
+    dim = embeddings.shape[1]
+
+    # Weighted centroids, accumulated in row chunks (embeddings may be memory-mapped)
+    sums = np.zeros((n_clusters, dim), dtype=np.float64)
+    for rows in row_chunks(len(embeddings)):
+        np.add.at(sums, inverse[rows], np.asarray(embeddings[rows], dtype=np.float64) * weights[rows, None])
+    sizes = np.bincount(inverse, weights=weights)
+    centroids = sums / sizes[:, None]
+    overall = sums.sum(axis=0) / sizes.sum()
+
+    # Weighted scatter of each cluster around its centroid
+    spread = np.zeros(n_clusters, dtype=np.float64)
+    within = 0.0
+    for rows in row_chunks(len(embeddings)):
+        offsets = np.asarray(embeddings[rows], dtype=np.float64) - centroids[inverse[rows]]
+        squared = np.einsum("ij,ij->i", offsets, offsets)
+        spread += np.bincount(inverse[rows], weights=weights[rows] * np.sqrt(squared), minlength=n_clusters)
+        within += float(weights[rows] @ squared)
+    spread /= sizes
+
+    between = float(sizes @ ((centroids - overall) ** 2).sum(axis=1))
+    n_total = sizes.sum()
+    calinski_harabasz = 1.0 if within == 0 else between * (n_total - n_clusters) / (within * (n_clusters - 1))
+
+    squared_norms = (centroids ** 2).sum(axis=1)
+    separation = np.sqrt(np.maximum(squared_norms[:, None] + squared_norms[None, :] - 2 * centroids @ centroids.T, 0.0))
+    if np.allclose(spread, 0) or np.allclose(separation, 0):
+        davies_bouldin = 0.0
+    else:
+        with np.errstate(divide="ignore", invalid="ignore"):
+            ratios = (spread[:, None] + spread[None, :]) / separation
+        ratios[~np.isfinite(ratios)] = 0.0
+        np.fill_diagonal(ratios, 0.0)
+        davies_bouldin = float(ratios.max(axis=1).mean())
+
+    return {"davies_bouldin": davies_bouldin, "calinski_harabasz": float(calinski_harabasz)}
+
+
+def compute_quality_metrics(
+    embeddings: np.ndarray,
+    cluster_labels: np.ndarray,
+    sample_size: int = DEFAULT_SILHOUETTE_SAMPLE_SIZE,
+    exact_silhouette: bool = False,
+    metric: str = "cosine",
+    random_state: Optional[int] = None,
+    sample_weight: Optional[np.ndarray] = None
+) -> Dict[str, Any]:
+    """
+    Compute clustering quality metrics for a partition.
+
+    Args:
+        embeddings: Embedding matrix (n_points x dim)
+        cluster_labels: Cluster label per point
+        sample_size: Silhouette sample budget
+        exact_silhouette: Use sklearn's O(n^2) silhouette_score instead of the estimate
+            (every point's weighted silhouette with sample_weight)
+        metric: Distance metric for the silhouette
+        random_state: Seed for reproducible sampling
+        sample_weight: Weight per point (duplicate group size), so the metrics
+            describe all forces rather than the representatives
+
+    Returns:
+        Dict: silhouette (with CI), Davies-Bouldin and Calinski-Harabasz indices
+    """
+    from sklearn.metrics import silhouette_score, davies_bouldin_score, calinski_harabasz_score
+
+    cluster_labels = np.asarray(cluster_labels)
+    n_clusters = len(np.unique(cluster_labels))
+    n_points = int(_weights(sample_weight, len(cluster_labels)).sum())
+
+    if n_clusters < 2 or n_clusters >= n_points:
+        logger.warning(f"Quality metrics undefined for {n_clusters} clusters over {n_points} points")
+        return {
+            "silhouette": 0.0,
+            "silhouette_ci95": [0.0, 0.0],
+            "silhouette_method": "undefined",
+            "silhouette_sample_size": 0,
+            "davies_bouldin": 0.0,
+            "calinski_harabasz": 0.0
+        }
+
+    if exact_silhouette:
+        logger.info("Computing exact silhouette score...")
+        if sample_weight is None:
+            silhouette = float(silhouette_score(embeddings, cluster_labels, metric=metric))
+        else:
+            values = point_silhouettes(
+                embeddings, cluster_labels, np.arange(len(cluster_labels)), metric, sample_weight
+            )
+            silhouette = float(np.average(values, weights=sample_weight))
+        metrics = {
+            "silhouette": silhouette,
+            "silhouette_ci95": [silhouette, silhouette],
+            "silhouette_method": "exact",
+            "silhouette_sample_size": int(len(cluster_labels))
+        }
+    else:
+        logger.info(f"Estimating silhouette score (sample budget {sample_size})...")
+        metrics = estimate_silhouette(embeddings, cluster_labels, sample_size, metric, random_state, sample_weight)
+
+    if sample_weight is None:
+        metrics["davies_bouldin"] = float(davies_bouldin_score(embeddings, cluster_labels))
+        metrics["calinski_harabasz"] = float(calinski_harabasz_score(embeddings, cluster_labels))
+    else:
+        metrics.update(weighted_cluster_indices(embeddings, cluster_labels, sample_weight))
+
+    logger.info(
+        f"Silhouette {metrics['silhouette']:.3f} "
+        f"(95% CI {metrics['silhouette_ci95'][0]:.3f}-{metrics['silhouette_ci95'][1]:.3f}, "
+        f"{metrics['silhouette_method']}), "
+        f"Davies-Bouldin {metrics['davies_bouldin']:.3f}, "
+        f"Calinski-Harabasz {metrics['calinski_harabasz']:.1f}"
+    )
+    return metrics
@@ -0,0 +1,298 @@
+"""
+ORION Resolution Search - Parallel, adaptive community resolution tuning
+
+perform_louvain_clustering needs the Louvain resolution that yields a target
+number of clusters. Instead of scanning a fixed grid one resolution at a time,
+this module evaluates several resolutions at once in a process pool and then
+narrows toward the target by bisecting the bracket around it.
+
+Key Features:
+- Candidate resolutions evaluated in parallel worker processes
+- The sparse graph is shipped to each worker once (pool initializer), not per
+  task, and converted there for the selected community backend
+- Spawned workers (no fork after numba/BLAS threads have started)
+- Worker count bounded by available memory: every worker holds its own copy of
+  the graph, so the pool costs (workers x graph size). More workers evaluate a
+  round faster; fewer keep a large NetworkX graph (~1 KB per edge while
+  python-louvain runs, several GB at 100k forces) from exhausting memory. When
+  only one worker fits, partitions run in this process instead
+- Serially (n_jobs=1, or one worker fits in memory) a round stops at the first
+  resolution that hits the target
+- Bracketing + k-section toward target_clusters, stopping on an exact hit
+- Every computed partition is cached and reused for the final result
+- No dependency on the direction in which cluster count changes with resolution
+- Wall and CPU time of every partition, measured in the worker that ran it
+- Extra seeds at a fixed resolution on the same worker pool (consensus mode)
+"""
+
+import os
+import time
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+try:
+    from .community_backends import DEFAULT_COMMUNITY_BACKEND, prepare_graph, detect_communities
+except ImportError:
+    from community_backends import DEFAULT_COMMUNITY_BACKEND, prepare_graph, detect_communities
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Constants
+DEFAULT_RESOLUTION = 1.4
+RESOLUTION_BOUNDS = (0.8, 3.0)
+MAX_ROUNDS = 6
+# Resolutions per round. Fixed (not tied to n_jobs) so results are identical on every host
+POINTS_PER_ROUND = 8
+MIN_INTERVAL = 0.01
+# Peak memory per undirected edge of a worker's graph while it is partitioned,
+# measured at 20k nodes with 15 neighbours: python-louvain keeps dict-of-dict
+# adjacency plus its induced graphs, igraph flat C edge arrays
+GRAPH_BYTES_PER_EDGE = {"networkx": 1024, "louvain": 256, "leiden": 256}
+# Interpreter, numpy/scipy and the backend library in a freshly spawned worker
+WORKER_BASE_BYTES = 200 * 1024 ** 2
+# Share of the currently available memory the worker pool may use
+POOL_MEMORY_FRACTION = 0.5
+
+# Graph and backend held by each worker process (set by the pool initializer)
+_WORKER_GRAPH = None
+_WORKER_BACKEND = DEFAULT_COMMUNITY_BACKEND
+
+
+def _use_graph(graph, backend: str) -> None:
+    """Make a prepared backend graph the one _partition_at works on."""
+    global _WORKER_GRAPH, _WORKER_BACKEND
+    _WORKER_GRAPH = graph
+    _WORKER_BACKEND = backend
+
+
+def _init_worker(connectivity, backend: str) -> None:
+    """Pool initializer: build the backend graph once per worker for all its tasks."""
+    _use_graph(prepare_graph(connectivity, backend), backend)
+
+
+def _partition_at(resolution: float, random_state: int) -> Tuple[float, np.ndarray, Dict[str, Any]]:
+    """Partition the worker's graph and return dense labels and timing."""
+    started_at = time.time()
+    wall_start = time.perf_counter()
+    cpu_start = time.process_time()
+    labels = detect_communities(_WORKER_GRAPH, resolution, _WORKER_BACKEND, random_state)
+    timing = {
+        "started_at": started_at,
+        "wall_s": time.perf_counter() - wall_start,
+        "cpu_s": time.process_time() - cpu_start,
+        "pid": os.getpid()
+    }
+    return resolution, labels, timing
+
+
+def default_n_jobs() -> int:
+    """Number of worker processes to use when none is configured."""
+    try:
+        return max(1, len(os.sched_getaffinity(0)))
+    except AttributeError:
+        return max(1, os.cpu_count() or 1)
+
+
+def available_memory() -> Optional[int]:
+    """Bytes of memory available to new processes, or None when unknown."""
+    try:
+        with open("/proc/meminfo") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        return os.sysconf("SC_AVPHYS_PAGES") * os.sysconf("SC_PAGE_SIZE")
+    except (AttributeError, ValueError, OSError):
+        return None
+
+
+def worker_memory(connectivity, backend: str) -> int:
+    """Estimated peak bytes of one worker partitioning the graph of a connectivity matrix."""
+    # Stored entries bound the number of undirected edges from above
+    n_edges = int(connectivity.nnz)
+    per_edge = GRAPH_BYTES_PER_EDGE.get(backend, max(GRAPH_BYTES_PER_EDGE.values()))
+    return WORKER_BASE_BYTES + per_edge * n_edges
+
+
+def pool_workers(connectivity, backend: str, n_jobs: int) -> int:
+    """
+    Worker processes for a search: at most n_jobs and POINTS_PER_ROUND, and
+    no more graph copies than fit in POOL_MEMORY_FRACTION of available memory.
+    """
+    workers = max(1, min(n_jobs, POINTS_PER_ROUND))
+    available = available_memory()
+    if available is None:
+        return workers
+    per_worker = worker_memory(connectivity, backend)
+    fit = max(1, int(available * POOL_MEMORY_FRACTION // per_worker))
+    if fit < workers:
+        logger.info(f"Resolution search limited to {fit} worker(s): ~{per_worker / 1024 ** 2:.0f} MB per "
+                    f"{backend} graph, {available / 1024 ** 2:.0f} MB available")
+    return min(workers, fit)
+
+
+class ResolutionSearch:
+    """
+    Finds the Louvain resolution closest to a target cluster count.
+    """
+
+    def __init__(
+        self,
+        connectivity,
+        random_state: int = 42,
+        n_jobs: Optional[int] = None,
+        backend: str = DEFAULT_COMMUNITY_BACKEND
+    ):
+        # Sparse k-NN connectivity; each worker builds its own backend graph from it
+        self.connectivity = connectivity
+        self.backend = backend
+        self.random_state = random_state
+        self.n_jobs = max(1, n_jobs or default_n_jobs())
+        # Each worker builds its own graph, so memory caps the pool below n_jobs
+        self.n_workers = pool_workers(connectivity, backend, self.n_jobs)
+        self.partitions: Dict[float, np.ndarray] = {}
+        # Per-resolution timing: started_at, wall_s, cpu_s, pid
+        self.timings: Dict[float, Dict[str, Any]] = {}
+        self._executor: Optional[ProcessPoolExecutor] = None
+        # Backend graph for partitions computed in this process (built on first use)
+        self._local_graph = None
+
+    def __enter__(self) -> "ResolutionSearch":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def _pool(self) -> ProcessPoolExecutor:
+        """Worker pool holding the backend graph (started on first use)."""
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.n_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(self.connectivity, self.backend)
+            )
+        return self._executor
+
+    def _use_local_graph(self) -> None:
+        """Partition in this process (builds the backend graph on first use)."""
+        if self._local_graph is None:
+            self._local_graph = prepare_graph(self.connectivity, self.backend)
+        _use_graph(self._local_graph, self.backend)
+
+    def n_clusters(self, resolution: float) -> int:
+        return int(len(np.unique(self.partitions[resolution])))
+
+    def evaluate(self, resolutions: List[float]) -> None:
+        """
+        Compute partitions for resolutions not seen before, in parallel.
+        """
+        pending = sorted({round(r, 6) for r in resolutions} - set(self.partitions))
+        if not pending:
+            return
+
+        if self.n_workers == 1 or len(pending) == 1:
+            self._use_local_graph()
+            results = [_partition_at(r, self.random_state) for r in pending]
+        else:
+            results = list(self._pool().map(
+                _partition_at, pending, [self.random_state] * len(pending)
+            ))
+
+        for resolution, labels, timing in results:
+            self.partitions[resolution] = labels
+            self.timings[resolution] = timing
+            logger.info(f"Resolution {resolution:.3f}: {self.n_clusters(resolution)} clusters")
+
+    def at_seeds(self, resolution: float, seeds: List[int]) -> List[Tuple[np.ndarray, Dict[str, Any]]]:
+        """
+        Partitions at one resolution for several seeds, in parallel.
+        The search's own seed reuses its cached partition.
+
+        Returns:
+            List: (labels, timing) per seed; timing is None for a cached partition
+        """
+        resolution = round(resolution, 6)
+        self.evaluate([resolution])
+        pending = [seed for seed in seeds if seed != self.random_state]
+
+        if self.n_workers == 1 or len(pending) <= 1:
+            self._use_local_graph()
+            results = [_partition_at(resolution, seed) for seed in pending]
+        else:
+            results = list(self._pool().map(_partition_at, [resolution] * len(pending), pending))
+
+        computed = {seed: (labels, timing) for seed, (_, labels, timing) in zip(pending, results)}
+        return [
+            (self.partitions[resolution], None) if seed == self.random_state else computed[seed]
+            for seed in seeds
+        ]
+
+    def _best(self, target_clusters: int) -> float:
+        """Closest evaluated resolution; ties go to the lowest resolution."""
+        return min(
+            sorted(self.partitions),
+            key=lambda r: abs(self.n_clusters(r) - target_clusters)
+        )
+
+    def search(self, target_clusters: int) -> Tuple[np.ndarray, float, bool]:
+        """
+        Narrow toward target_clusters by parallel k-section of the bracketing interval.
+
+        Returns:
+            Tuple: (labels, resolution used, whether the target was hit exactly)
+        """
+        lo, hi = RESOLUTION_BOUNDS
+        points = POINTS_PER_ROUND
+
+        candidates = list(np.linspace(lo, hi, points))
+        for round_index in range(MAX_ROUNDS):
+            if self.n_workers == 1:
+                # Serially, stop at the first hit; in ascending order that is the
+                # same resolution a full parallel round would pick
+                for resolution in sorted(round(r, 6) for r in candidates):
+                    self.evaluate([resolution])
+                    if self.n_clusters(resolution) == target_clusters:
+                        break
+            else:
+                self.evaluate(candidates)
+
+            hits = [r for r in sorted(self.partitions) if self.n_clusters(r) == target_clusters]
+            if hits:
+                return self.partitions[hits[0]], hits[0], True
+
+            # Find adjacent evaluated resolutions whose counts straddle the target
+            ordered = [r for r in sorted(self.partitions) if lo <= r <= hi]
+            bracket = None
+            for left, right in zip(ordered, ordered[1:]):
+                if (self.n_clusters(left) - target_clusters) * (self.n_clusters(right) - target_clusters) < 0:
+                    bracket = (left, right)
+                    break
+
+            if bracket is None or bracket[1] - bracket[0] < MIN_INTERVAL:
+                break
+
+            lo, hi = bracket
+            candidates = list(np.linspace(lo, hi, points + 2)[1:-1])
+            logger.debug(f"Round {round_index + 1}: narrowing to [{lo:.3f}, {hi:.3f}]")
+
+        best = self._best(target_clusters)
+        return self.partitions[best], best, False
+
+    def at(self, resolution: float) -> np.ndarray:
+        """Partition for a single resolution (cached)."""
+        resolution = round(resolution, 6)
+        self.evaluate([resolution])
+        return self.partitions[resolution]
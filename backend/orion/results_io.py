@@ -0,0 +1,201 @@
+"""
+ORION Results I/O - Streaming force input and columnar result output
+
+orion_preprocessing.py used to read a pretty-printed JSON array with json.load
+and write its results as indented JSON lists. This module streams the input and
+writes results in compact columnar formats.
+
+Key Features:
+- Input as NDJSON (one force per line) from a file or stdin ("-"); JSON arrays
+  are still accepted
+- Output formats chosen by extension:
+    .npz              - NumPy archive, float32 coordinates, int32 labels
+    .arrow / .feather - Arrow IPC file (requires pyarrow)
+    .json             - compact JSON (compatibility with the Node service)
+    anything else     - pickle of plain lists (compatibility with the FixedClusters loaders)
+- Per-row arrays become columns; scalars and dicts are stored as JSON metadata
+- tsne_* columns (aliases of umap3d_*) are not duplicated in binary files and
+  are restored by load_results()
+"""
+
+import sys
+import json
+import pickle
+import logging
+from typing import Any, Dict, Iterator, List
+
+import numpy as np
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Legacy 3D columns that mirror the UMAP 3D coordinates
+TSNE_ALIASES = {
+    "tsne_x": "umap3d_x",
+    "tsne_y": "umap3d_y",
+    "tsne_z": "umap3d_z"
+}
+
+NDJSON_EXTENSIONS = (".ndjson", ".jsonl")
+ARROW_EXTENSIONS = (".arrow", ".feather")
+METADATA_KEY = "orion_metadata"
+
+
+def _iter_ndjson(stream) -> Iterator[Dict[str, Any]]:
+    for line_number, line in enumerate(stream, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        force = json.loads(line)
+        if not isinstance(force, dict):
+            raise ValueError(f"Line {line_number}: expected a force object")
+        yield force
+
+
+def iter_forces(path: str) -> Iterator[Dict[str, Any]]:
+    """
+    Yield force objects one at a time.
+
+    Args:
+        path: NDJSON file, JSON array file, or "-" for NDJSON on stdin
+    """
+    if path == "-":
+        yield from _iter_ndjson(sys.stdin)
+        return
+
+    with open(path, "r") as f:
+        if path.endswith(NDJSON_EXTENSIONS):
+            yield from _iter_ndjson(f)
+            return
+
+        # Sniff the first non-blank character: '[' means a JSON array
+        first = f.read(1)
+        while first and first.isspace():
+            first = f.read(1)
+        f.seek(0)
+
+        if first == "[":
+            forces = json.load(f)
+            if not isinstance(forces, list):
+                raise ValueError("Input data must be a list of force objects")
+            yield from forces
+        else:
+            yield from _iter_ndjson(f)
+
+
+def load_forces(path: str) -> List[Dict[str, Any]]:
+    """
+    Load the list of force objects written by the Node service
+    """
+    logger.info(f"Loading data from {'stdin' if path == '-' else path}")
+    forces_data = list(iter_forces(path))
+    logger.info(f"Loaded {len(forces_data)} forces")
+    return forces_data
+
+
+def to_jsonable(value: Any) -> Any:
+    """
+    Convert numpy containers and scalars to plain Python for JSON/pickle output.
+    """
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, dict):
+        return {(k.item() if isinstance(k, np.generic) else k): to_jsonable(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [to_jsonable(v) for v in value]
+    return value
+
+
+def _split_columns(results: Dict[str, Any]):
+    """Separate per-row columns from metadata."""
+    n_rows = len(results["id"])
+    columns: Dict[str, np.ndarray] = {"id": np.asarray(results["id"], dtype=str)}
+    metadata: Dict[str, Any] = {}
+
+    for key, value in results.items():
+        if key == "id":
+            continue
+        if key in TSNE_ALIASES and TSNE_ALIASES[key] in results:
+            continue
+        if isinstance(value, (np.ndarray, list)) and len(value) == n_rows and np.ndim(value) == 1:
+            array = np.asarray(value)
+            if np.issubdtype(array.dtype, np.floating):
+                array = array.astype(np.float32)
+            elif np.issubdtype(array.dtype, np.integer):
+                array = array.astype(np.int32)
+            columns[key] = array
+        else:
+            metadata[key] = to_jsonable(value)
+
+    return columns, metadata
+
+
+def save_results(results: Dict[str, Any], path: str) -> None:
+    """
+    Save results in the format implied by the file extension.
+    """
+    logger.info(f"Saving results to {path}")
+
+    if path.endswith(".npz"):
+        columns, metadata = _split_columns(results)
+        with open(path, "wb") as f:
+            np.savez(f, **columns, **{METADATA_KEY: np.array(json.dumps(metadata))})
+
+    elif path.endswith(ARROW_EXTENSIONS):
+        try:
+            import pyarrow as pa
+            import pyarrow.feather as feather
+        except ImportError:
+            raise ImportError("Arrow output requires pyarrow (pip install pyarrow)")
+        columns, metadata = _split_columns(results)
+        table = pa.table(columns).replace_schema_metadata({METADATA_KEY: json.dumps(metadata)})
+        feather.write_feather(table, path, compression="uncompressed")
+
+    elif path.endswith(".json"):
+        # Save as JSON for TypeScript integration
+        with open(path, "w") as f:
+            json.dump(to_jsonable(results), f, separators=(",", ":"))
+
+    else:
+        # Save as pickle of plain lists (read by the FixedClusters loaders)
+        with open(path, "wb") as f:
+            pickle.dump(to_jsonable(results), f)
+
+
+def load_results(path: str) -> Dict[str, Any]:
+    """
+    Load results written by save_results(), restoring tsne_* aliases.
+    """
+    if path.endswith(".npz"):
+        with np.load(path, allow_pickle=False) as archive:
+            results = json.loads(str(archive[METADATA_KEY]))
+            for key in archive.files:
+                if key != METADATA_KEY:
+                    results[key] = archive[key]
+        results["id"] = results["id"].tolist()
+
+    elif path.endswith(ARROW_EXTENSIONS):
+        import pyarrow.feather as feather
+        table = feather.read_table(path)
+        results = json.loads(table.schema.metadata[METADATA_KEY.encode()].decode())
+        for name in table.column_names:
+            results[name] = table.column(name).to_numpy()
+        results["id"] = table.column("id").to_pylist()
+
+    elif path.endswith(".json"):
+        with open(path, "r") as f:
+            return json.load(f)
+
+    else:
+        with open(path, "rb") as f:
+            return pickle.load(f)
+
+    # JSON metadata turns integer dict keys into strings
+    if "cluster_titles" in results:
+        results["cluster_titles"] = {int(k): v for k, v in results["cluster_titles"].items()}
+    for alias, source in TSNE_ALIASES.items():
+        if source in results and alias not in results:
+            results[alias] = results[source]
+    return results
@@ -0,0 +1,441 @@
+#!/usr/bin/env python3
+"""
+ORION Similarity Index - Top-k similar forces over the stored embeddings
+
+The radar's connections and the analysts' related-forces panel need the forces
+most similar to a given force or to a free-text query, answered in
+milliseconds. A full run writes this index next to its features artifact. It
+holds the NN-descent search index the k-NN stage already built, the unit-length
+embeddings, and the metadata used for filtering.
+
+The embeddings are stored once. The NN-descent index keeps its own reordered
+copy of the data, and its compiled search functions capture it again, so both
+are left out of the file and rebuilt from the stored embeddings on load.
+
+Key Features:
+- Queries by force id or by query vector (the daemon embeds free text)
+- Optional pre-filters on cluster, STEEP category and driving-force type
+- Approximate search via the persisted pynndescent index; filtered candidate
+  sets of up to EXACT_SEARCH_ROWS forces are scanned exactly instead
+- Duplicate groups indexed once (by their representative) and fanned out to
+  every member force in the results
+- Similarities are exact cosine similarities, also for approximate hits
+
+Usage:
+    python similarity_index.py --artifact features.pkl --force-id F123 --k 10
+    python similarity_index.py --artifact features.pkl --force-id F123 --steep Social --type T
+"""
+
+import os
+import sys
+import json
+import pickle
+import argparse
+import logging
+from typing import Any, Dict, List, Optional, Sequence, Union
+
+import numpy as np
+
+try:
+    from .features_artifact import normalize_rows, point_embeddings
+    from .knn_graph import DEFAULT_GRAPH_NEIGHBORS, build_knn_graph
+except ImportError:
+    from features_artifact import normalize_rows, point_embeddings
+    from knn_graph import DEFAULT_GRAPH_NEIGHBORS, build_knn_graph
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Constants
+# Version 2: the NN-descent index is stored as state without its data ('search_state')
+SIMILARITY_INDEX_VERSION = 2
+DEFAULT_TOP_K = 10
+# Candidate sets up to this size are scanned exactly (a few ms for 384-d embeddings)
+EXACT_SEARCH_ROWS = 20000
+# Approximate hits fetched per requested result, to leave room for filters
+OVERFETCH = 4
+# Metrics for which the unit-length embeddings can replace the index's own data
+# (neighbours and search trees are unchanged by row scaling)
+REATTACHABLE_METRICS = ("cosine", "dot")
+
+Filter = Optional[Union[Any, Sequence[Any]]]
+
+
+class SimilarityIndexError(Exception):
+    """Raised when a similarity index is missing, malformed or cannot answer a query"""
+    pass
+
+
+def similarity_index_path(artifact_path: str) -> str:
+    """Where the similarity index of a features artifact is stored."""
+    return f"{os.path.splitext(artifact_path)[0]}.similarity.pkl"
+
+
+def _categories(values: Optional[Sequence[Any]], n_rows: int):
+    """Category -> code mapping and code per row (None when the column is missing)."""
+    values = [None] * n_rows if values is None else list(values)
+    categories: Dict[Any, int] = {}
+    codes = np.fromiter((categories.setdefault(v, len(categories)) for v in values), dtype=np.int32, count=n_rows)
+    return categories, codes
+
+
+def _search_state(search_index: Any) -> Optional[Dict[str, Any]]:
+    """
+    Picklable state of an NN-descent index without its data or the compiled
+    search functions that capture it (None when the metric needs the raw data).
+    """
+    if search_index is None or search_index.metric not in REATTACHABLE_METRICS:
+        return None
+    state = search_index.__getstate__()
+    return {key: value for key, value in state.items() if key != "_raw_data" and not hasattr(value, "py_func")}
+
+
+def _restore_search_index(state: Dict[str, Any], embeddings: np.ndarray) -> Any:
+    """NN-descent index from _search_state(), with the embeddings as its data."""
+    from pynndescent import NNDescent
+
+    # A prepared index holds its data in search-tree order
+    order = state.get("_vertex_order")
+    data = embeddings if order is None else embeddings[order]
+    search_index = NNDescent.__new__(NNDescent)
+    search_index.__setstate__({**state, "_raw_data": np.ascontiguousarray(data, dtype=np.float32)})
+    return search_index
+
+
+def _as_values(value: Filter) -> Optional[List[Any]]:
+    if value is None:
+        return None
+    if isinstance(value, (list, tuple, set, np.ndarray)):
+        return list(value)
+    return [value]
+
+
+class SimilarityIndex:
+    """
+    Nearest-neighbour search over the forces of one run.
+
+    Search runs over points (one per duplicate group, embeddings[point]);
+    point_of[row] maps each force row to its point.
+    """
+
+    def __init__(
+        self,
+        ids: Sequence[Any],
+        embeddings: np.ndarray,
+        point_of: np.ndarray,
+        cluster_labels: np.ndarray,
+        steep: Optional[Sequence[Any]] = None,
+        force_type: Optional[Sequence[Any]] = None,
+        search_index: Optional[Any] = None
+    ):
+        self.ids = list(ids)
+        self.embeddings = normalize_rows(embeddings)
+        self.point_of = np.asarray(point_of, dtype=np.int64)
+        self.cluster_labels = np.asarray(cluster_labels)
+        self.steep = _categories(steep, len(self.ids))
+        self.force_type = _categories(force_type, len(self.ids))
+        self.search_index = search_index
+
+        # Member rows of every point, in row order
+        self._member_order = np.argsort(self.point_of, kind="stable")
+        self._member_offsets = np.searchsorted(
+            self.point_of[self._member_order], np.arange(len(self.embeddings) + 1)
+        )
+        self._row_of = {force_id: row for row, force_id in enumerate(self.ids)}
+
+    @property
+    def n_forces(self) -> int:
+        return len(self.ids)
+
+    @property
+    def n_points(self) -> int:
+        return len(self.embeddings)
+
+    @classmethod
+    def build(
+        cls,
+        ids: Sequence[Any],
+        embeddings: np.ndarray,
+        point_of: np.ndarray,
+        cluster_labels: np.ndarray,
+        steep: Optional[Sequence[Any]] = None,
+        force_type: Optional[Sequence[Any]] = None,
+        search_index: Optional[Any] = None,
+        random_state: Optional[int] = None,
+        n_jobs: Optional[int] = None
+    ) -> "SimilarityIndex":
+        """
+        Index a run's forces, reusing the k-NN stage's NN-descent index when given.
+
+        Args:
+            ids: Force id per row
+            embeddings: Embedding per point (n_points x dim), e.g. per duplicate group
+            point_of: Point per row
+            cluster_labels: Cluster label per row
+            steep: STEEP category per row
+            force_type: Driving-force type per row
+            search_index: pynndescent.NNDescent over the same embeddings
+            random_state: Seed when a new NN-descent index has to be built
+            n_jobs: Threads for building a new index
+
+        Returns:
+            SimilarityIndex: Ready to query
+        """
+        if search_index is None and len(embeddings) > EXACT_SEARCH_ROWS:
+            search_index = build_knn_graph(
+                embeddings, n_neighbors=DEFAULT_GRAPH_NEIGHBORS, random_state=random_state, n_jobs=n_jobs
+            ).search_index
+        index = cls(ids, embeddings, point_of, cluster_labels, steep, force_type, search_index)
+        if index.search_index is not None:
+            index.search_index.prepare()
+        logger.info(f"Similarity index: {index.n_forces} forces, {index.n_points} points"
+                    f"{' (approximate search)' if index.search_index is not None else ''}")
+        return index
+
+    @classmethod
+    def from_artifact(cls, artifact: Dict[str, Any], n_jobs: Optional[int] = None) -> "SimilarityIndex":
+        """Build the index from a features artifact (for artifacts written without one)."""
+        embeddings, point_of, _ = point_embeddings(artifact)
+        return cls.build(
+            artifact["ids"],
+            embeddings,
+            point_of,
+            artifact["cluster_labels"],
+            steep=artifact.get("steep"),
+            force_type=artifact.get("force_type"),
+            random_state=artifact.get("random_state"),
+            n_jobs=n_jobs
+        )
+
+    def _members(self, points: np.ndarray) -> np.ndarray:
+        """Rows of the given points."""
+        starts, stops = self._member_offsets[points], self._member_offsets[points + 1]
+        if len(points) == 0:
+            return np.empty(0, dtype=np.int64)
+        return np.concatenate([self._member_order[a:b] for a, b in zip(starts, stops)])
+
+    def _allowed(self, cluster: Filter, steep: Filter, force_type: Filter, exclude: Sequence[Any]) -> Optional[np.ndarray]:
+        """Row mask of the filters, or None when nothing is filtered."""
+        mask = None
+        cluster = _as_values(cluster)
+        if cluster is not None:
+            mask = np.isin(self.cluster_labels, cluster)
+        for (categories, codes), values in ((self.steep, _as_values(steep)), (self.force_type, _as_values(force_type))):
+            if values is not None:
+                matches = np.isin(codes, [categories[v] for v in values if v in categories])
+                mask = matches if mask is None else mask & matches
+        if exclude:
+            if mask is None:
+                mask = np.ones(self.n_forces, dtype=bool)
+            mask[[self._row_of[i] for i in exclude if i in self._row_of]] = False
+        return mask
+
+    def _rank(self, rows: np.ndarray, similarities: np.ndarray, k: int) -> List[Dict[str, Any]]:
+        """Top k rows by similarity (ties by row), as result records."""
+        if len(rows) > k:
+            top = np.argpartition(-similarities, k - 1)[:k]
+            rows, similarities = rows[top], similarities[top]
+        order = np.lexsort((rows, -similarities))
+        steep, force_type = self._values(self.steep), self._values(self.force_type)
+        results = []
+        for i in order:
+            row = rows[i]
+            results.append({
+                "id": self.ids[row],
+                "similarity": float(similarities[i]),
+                "cluster": int(self.cluster_labels[row]),
+                "steep": steep[self.steep[1][row]],
+                "type": force_type[self.force_type[1][row]]
+            })
+        return results
+
+    @staticmethod
+    def _values(column) -> List[Any]:
+        """Value per code of a categorical column."""
+        return list(column[0])
+
+    def _column(self, column) -> List[Any]:
+        """Value per row of a categorical column."""
+        values = self._values(column)
+        return [values[code] for code in column[1]]
+
+    def _exact(self, query: np.ndarray, k: int, allowed: Optional[np.ndarray]) -> List[Dict[str, Any]]:
+        if allowed is None:
+            rows = np.arange(self.n_forces)
+            similarities = (self.embeddings @ query)[self.point_of]
+        else:
+            rows = np.flatnonzero(allowed)
+            similarities = self.embeddings[self.point_of[rows]] @ query
+        return self._rank(rows, similarities, k)
+
+    def _approximate(self, query: np.ndarray, k: int, allowed: Optional[np.ndarray]) -> Optional[List[Dict[str, Any]]]:
+        """Approximate top k, or None when too few hits pass the filters."""
+        n_fetch = min(self.n_points, k * OVERFETCH)
+        points, _ = self.search_index.query(query[None, :], k=n_fetch)
+        points = points[0][points[0] >= 0]
+        rows = self._members(points)
+        if allowed is not None:
+            rows = rows[allowed[rows]]
+        if len(rows) < k and n_fetch < self.n_points:
+            return None
+        similarities = self.embeddings[self.point_of[rows]] @ query
+        return self._rank(rows, similarities, k)
+
+    def search(
+        self,
+        query: np.ndarray,
+        k: int = DEFAULT_TOP_K,
+        cluster: Filter = None,
+        steep: Filter = None,
+        force_type: Filter = None,
+        exclude: Sequence[Any] = ()
+    ) -> List[Dict[str, Any]]:
+        """
+        Forces most similar to a query embedding.
+
+        Args:
+            query: Query embedding (dim,)
+            k: Number of results
+            cluster: Cluster label(s) results must belong to
+            steep: STEEP categories results must have
+            force_type: Driving-force types results must have
+            exclude: Force ids never returned
+
+        Returns:
+            List[Dict]: id, similarity (cosine), cluster, steep and type per
+            result, most similar first
+        """
+        query = normalize_rows(np.asarray(query, dtype=np.float32).reshape(1, -1))[0]
+        if query.shape[0] != self.embeddings.shape[1]:
+            raise SimilarityIndexError(
+                f"Query has dimension {query.shape[0]}, the index {self.embeddings.shape[1]}"
+            )
+        k = max(1, int(k))
+        allowed = self._allowed(cluster, steep, force_type, exclude)
+
+        n_candidates = self.n_forces if allowed is None else int(allowed.sum())
+        if self.search_index is None or n_candidates <= EXACT_SEARCH_ROWS:
+            return self._exact(query, k, allowed)
+        results = self._approximate(query, k, allowed)
+        if results is None:
+            return self._exact(query, k, allowed)
+        return results
+
+    def similar_to(self, force_id: Any, k: int = DEFAULT_TOP_K, **filters: Any) -> List[Dict[str, Any]]:
+        """
+        Forces most similar to an indexed force (the force itself excluded).
+
+        Raises:
+            SimilarityIndexError: If the force id is not in the index
+        """
+        if force_id not in self._row_of:
+            raise SimilarityIndexError(f"Unknown force id: {force_id}")
+        query = self.embeddings[self.point_of[self._row_of[force_id]]]
+        exclude = list(filters.pop("exclude", ())) + [force_id]
+        return self.search(query, k, exclude=exclude, **filters)
+
+    def warm_up(self) -> None:
+        """Run one query so numba compiles the search before the first real request."""
+        if self.n_points:
+            self.search(self.embeddings[0], k=1)
+
+    def to_dict(self) -> Dict[str, Any]:
+        search_state = _search_state(self.search_index)
+        return {
+            "version": SIMILARITY_INDEX_VERSION,
+            "ids": self.ids,
+            "embeddings": self.embeddings,
+            "point_of": self.point_of,
+            "cluster_labels": self.cluster_labels,
+            "steep": self._column(self.steep),
+            "force_type": self._column(self.force_type),
+            # The whole index only for metrics whose data cannot be rebuilt
+            "search_index": self.search_index if search_state is None else None,
+            "search_state": search_state
+        }
+
+
+def save_similarity_index(path: str, index: SimilarityIndex) -> None:
+    """
+    Write a similarity index to disk (atomically, like the features artifact).
+    """
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        pickle.dump(index.to_dict(), f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, path)
+    logger.info(f"Saved similarity index ({index.n_forces} forces) to {path}")
+
+
+def load_similarity_index(path: str) -> SimilarityIndex:
+    """
+    Load a similarity index written by save_similarity_index().
+
+    Raises:
+        SimilarityIndexError: If the file is missing or incompatible
+    """
+    if not os.path.exists(path):
+        raise SimilarityIndexError(f"Similarity index not found: {path}")
+    with open(path, 'rb') as f:
+        state = pickle.load(f)
+    if not isinstance(state, dict) or state.get("version", 0) > SIMILARITY_INDEX_VERSION:
+        raise SimilarityIndexError(f"Similarity index {path} is not a supported version")
+
+    index = SimilarityIndex(
+        state["ids"],
+        state["embeddings"],
+        state["point_of"],
+        state["cluster_labels"],
+        steep=state["steep"],
+        force_type=state["force_type"],
+        search_index=state["search_index"]
+    )
+    if state.get("search_state") is not None:
+        index.search_index = _restore_search_index(state["search_state"], index.embeddings)
+    logger.info(f"Loaded similarity index ({index.n_forces} forces) from {path}")
+    return index
+
+
+def main():
+    """
+    Print the forces most similar to one force of an artifact
+    """
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    from features_artifact import load_features_artifact
+
+    parser = argparse.ArgumentParser(description="ORION Similar Forces Lookup")
+    parser.add_argument("--artifact", required=True,
+                       help="Features artifact written by orion_preprocessing.py --artifact")
+    parser.add_argument("--force-id", required=True,
+                       help="Force whose most similar forces are listed")
+    parser.add_argument("--k", type=int, default=DEFAULT_TOP_K,
+                       help="Number of results")
+    parser.add_argument("--cluster", type=int, action="append", default=None,
+                       help="Only forces of this cluster (repeatable)")
+    parser.add_argument("--steep", action="append", default=None,
+                       help="Only forces of this STEEP category (repeatable)")
+    parser.add_argument("--type", dest="force_type", action="append", default=None,
+                       help="Only forces of this driving-force type, e.g. T or WS (repeatable)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    path = similarity_index_path(args.artifact)
+    if os.path.exists(path):
+        index = load_similarity_index(path)
+    else:
+        logger.info(f"No similarity index at {path}, building one from the artifact")
+        index = SimilarityIndex.from_artifact(load_features_artifact(args.artifact))
+
+    try:
+        results = index.similar_to(
+            args.force_id, args.k, cluster=args.cluster, steep=args.steep, force_type=args.force_type
+        )
+    except SimilarityIndexError as e:
+        logger.error(str(e))
+        sys.exit(1)
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
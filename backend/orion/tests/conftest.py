@@ -0,0 +1,9 @@
+"""
+Test configuration: the pipeline modules import each other as top-level
+modules (as the CLI and daemon run them), so the package directory goes on sys.path.
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,68 @@
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks"))
+
+from cluster_hierarchy import HIERARCHY_BOUNDS, build_hierarchy, hierarchy_resolutions
+from offline_embedder import HashingEmbedder
+from orion_preprocessing import OrionPreprocessor
+from stopwords import ENGLISH_STOPWORDS
+from synthetic_corpus import generate_corpus
+
+
+def test_hierarchy_resolutions_are_log_spaced_over_bounds():
+    resolutions = hierarchy_resolutions(5)
+    assert resolutions[0] == HIERARCHY_BOUNDS[0] and resolutions[-1] == HIERARCHY_BOUNDS[1]
+    ratios = np.diff(np.log(resolutions))
+    assert np.allclose(ratios, ratios[0], rtol=1e-3)
+
+
+def test_hierarchy_levels_cover_different_granularities():
+    preprocessor = OrionPreprocessor(random_state=0, n_jobs=1, community_backend="louvain", hierarchy_levels=8)
+    preprocessor.stopwords = set(ENGLISH_STOPWORDS)
+    texts = preprocessor.prepare_texts(generate_corpus(1500, seed=0))
+    embeddings = np.asarray(HashingEmbedder(seed=0).encode(texts), dtype=np.float32)
+
+    labels, resolution = preprocessor.perform_louvain_clustering(embeddings)
+    hierarchy = preprocessor.cluster_hierarchy
+    n_clusters = hierarchy.n_clusters
+
+    assert n_clusters == sorted(n_clusters)
+    assert n_clusters[-1] >= 3 * n_clusters[0]
+    assert 0 < hierarchy.selected < hierarchy.n_levels - 1
+    assert np.array_equal(hierarchy.labels_at(hierarchy.selected), np.unique(labels, return_inverse=True)[1])
+
+
+def test_relabel_selected_keeps_links_consistent():
+    coarse = np.array([0, 0, 0, 1, 1, 1])
+    selected = np.array([0, 0, 1, 2, 2, 3])
+    fine = np.array([0, 1, 2, 3, 4, 5])
+    hierarchy = build_hierarchy({0.1: coarse, 1.0: selected, 5.0: fine}, 1.0)
+
+    aligned = np.array([7, 7, 3, 12, 12, 5])
+    relabelled = hierarchy.relabel_selected(aligned)
+
+    assert np.array_equal(relabelled.labels_at(relabelled.selected), aligned)
+    assert relabelled.n_clusters == hierarchy.n_clusters
+    parents = relabelled.parents
+    assert [int(parents[1][c]) for c in (7, 3, 12, 5)] == [0, 0, 1, 1]
+    assert [int(parents[2][c]) for c in range(6)] == [7, 7, 3, 12, 12, 5]
+    assert list(relabelled.agreement) == list(hierarchy.agreement)
+
+
+def test_levels_follow_cluster_count_not_resolution():
+    # python-louvain can give more clusters at 0.05 than at 10.0
+    fine = np.array([0, 1, 2, 3, 4, 5])
+    selected = np.array([0, 0, 1, 2, 2, 3])
+    coarse = np.array([0, 0, 0, 1, 1, 1])
+    hierarchy = build_hierarchy({0.05: fine, 1.4: selected, 10.0: coarse}, 1.4)
+
+    assert hierarchy.n_clusters == [2, 4, 6]
+    assert list(hierarchy.resolutions) == [10.0, 1.4, 0.05]
+    assert hierarchy.selected == 1
+    assert list(hierarchy.parents[1]) == [0, 0, 1, 1]
+    assert list(hierarchy.parents[2]) == [0, 0, 1, 2, 2, 3]
+    assert list(hierarchy.agreement) == [1.0, 1.0, 1.0]
+    assert hierarchy.level_for(resolution=0.05) == 2
@@ -0,0 +1,39 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks"))
+
+from community_backends import COMMUNITY_BACKENDS, detect_communities, prepare_graph
+from offline_embedder import HashingEmbedder
+from orion_preprocessing import OrionPreprocessor
+from resolution_search import DEFAULT_RESOLUTION
+from stopwords import ENGLISH_STOPWORDS
+from synthetic_corpus import generate_corpus
+
+
+@pytest.fixture(scope="module")
+def graphs():
+    preprocessor = OrionPreprocessor(random_state=0, n_jobs=1)
+    preprocessor.stopwords = set(ENGLISH_STOPWORDS)
+    texts = preprocessor.prepare_texts(generate_corpus(1500, seed=0))
+    embeddings = np.asarray(HashingEmbedder(seed=0).encode(texts), dtype=np.float32)
+    connectivity = preprocessor.build_knn_graph(embeddings).connectivity(n_neighbors=15)
+    return {backend: prepare_graph(connectivity, backend) for backend in COMMUNITY_BACKENDS}
+
+
+def _n_clusters(graphs, backend, resolution):
+    return len(np.unique(detect_communities(graphs[backend], resolution, backend, random_state=0)))
+
+
+def test_backends_agree_on_cluster_count_at_default_resolution(graphs):
+    counts = {backend: _n_clusters(graphs, backend, DEFAULT_RESOLUTION) for backend in COMMUNITY_BACKENDS}
+
+    assert max(counts.values()) <= 1.2 * min(counts.values()), counts
+
+
+def test_python_louvain_stays_finer_at_low_resolution(graphs):
+    # Documented divergence: python-louvain stops aggregating early below ~1.0
+    assert _n_clusters(graphs, "networkx", 0.05) > 2 * _n_clusters(graphs, "louvain", 0.05)
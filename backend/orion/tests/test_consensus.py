@@ -0,0 +1,61 @@
+import numpy as np
+from scipy.sparse import csr_matrix
+from sklearn.datasets import make_blobs
+from sklearn.neighbors import kneighbors_graph
+
+from community_backends import detect_communities, prepare_graph
+from consensus import coassociation_matrix, consensus_partition
+
+
+def _path_graph(n_points):
+    rows = np.arange(n_points - 1)
+    return csr_matrix((np.ones(n_points - 1), (rows, rows + 1)), shape=(n_points, n_points))
+
+
+def test_coassociation_matrix_on_knn_edges():
+    connectivity = _path_graph(4)
+    runs = [np.array([0, 0, 1, 1]), np.array([0, 0, 0, 1])]
+
+    matrix = coassociation_matrix(connectivity, runs).toarray()
+
+    assert np.allclose(matrix, matrix.T)
+    assert matrix[0, 1] == 1.0 and matrix[1, 2] == 0.5 and matrix[2, 3] == 0.5
+    assert matrix[0, 2] == 0.0
+
+
+def test_consensus_partition_cuts_edges_the_runs_separate():
+    # Two cliques joined by one bridge; two runs each move one bridge endpoint
+    # across it, so the bridge is kept by most runs but every clique edge by more
+    clique = np.ones((4, 4)) - np.eye(4)
+    adjacency = np.zeros((8, 8))
+    adjacency[:4, :4] = adjacency[4:, 4:] = clique
+    adjacency[3, 4] = adjacency[4, 3] = 1
+    connectivity = csr_matrix(adjacency)
+    runs = [
+        np.array([0, 0, 0, 0, 1, 1, 1, 1]),
+        np.array([0, 0, 0, 1, 1, 1, 1, 1]),
+        np.array([0, 0, 0, 0, 0, 1, 1, 1])
+    ]
+
+    consensus = consensus_partition(connectivity, runs, resolution=1.0, backend="louvain", random_state=0)
+
+    assert np.array_equal(consensus['labels'], [0, 0, 0, 0, 1, 1, 1, 1])
+    assert np.isclose(consensus['coassociation'][3, 4], 2 / 3)
+    assert consensus['n_clusters'] == [2, 2, 2]
+    assert consensus['disagreement'][0] < consensus['disagreement'][1]
+    # Bridge endpoints sit on every edge the runs disagree on
+    assert consensus['stability'][3] < consensus['stability'][0] < 1.0
+    assert np.isclose(consensus['stability'][0], consensus['stability'][7])
+
+
+def test_consensus_partition_of_seed_runs_on_blobs():
+    points, truth = make_blobs(600, centers=6, n_features=8, cluster_std=1.0, random_state=0)
+    connectivity = kneighbors_graph(points, 15).tocsr()
+    graph = prepare_graph(connectivity, "louvain")
+    runs = [detect_communities(graph, 1.0, "louvain", seed) for seed in range(5)]
+
+    consensus = consensus_partition(connectivity, runs, resolution=1.0, backend="louvain", random_state=0)
+
+    assert len(consensus['labels']) == len(points)
+    assert min(consensus['n_clusters']) <= len(np.unique(consensus['labels'])) <= max(consensus['n_clusters'])
+    assert np.mean(consensus['stability']) > 0.9
@@ -0,0 +1,22 @@
+import numpy as np
+
+import embedding_backends
+
+
+class _Model:
+    max_seq_length = 256
+
+
+def test_parity_check_restores_reference_max_seq_length(monkeypatch):
+    monkeypatch.setattr(embedding_backends, "load_embedder", lambda *args, **kwargs: _Model())
+    monkeypatch.setattr(
+        embedding_backends, "encode_texts", lambda model, texts, token_budget: np.ones((len(texts), 4), np.float32)
+    )
+    reference = _Model()
+
+    report = embedding_backends.parity_check(
+        "local-model", ["alpha beta", "gamma delta"], backend="onnx", max_seq_length=64, reference=reference
+    )
+
+    assert reference.max_seq_length == 256
+    assert report["backend"] == "onnx"
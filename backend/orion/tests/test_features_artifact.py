@@ -0,0 +1,83 @@
+import numpy as np
+
+from features_artifact import (
+    VOTE_REFERENCE_KEY,
+    nearest_neighbor_vote,
+    normalize_rows,
+    point_embeddings,
+    vote_reference
+)
+
+
+def _artifact(version, embeddings, **extra):
+    return {'version': version, 'ids': ['a', 'b', 'c', 'd'], 'embeddings': embeddings, **extra}
+
+
+def test_point_embeddings_of_deduplicated_artifact():
+    points = np.arange(6, dtype=np.float32).reshape(2, 3)
+    artifact = _artifact(2, points, representatives=np.array([0, 2]), representative_of=np.array([0, 0, 1, 1]))
+
+    embeddings, point_of, representatives = point_embeddings(artifact)
+
+    assert embeddings is points
+    assert point_of.tolist() == [0, 0, 1, 1]
+    assert representatives.tolist() == [0, 2]
+
+
+def test_point_embeddings_of_version_1_artifacts():
+    rows = np.arange(12, dtype=np.float32).reshape(4, 3)
+    deduplicated = _artifact(1, rows, representatives=np.array([0, 2]), representative_of=np.array([0, 0, 1, 1]))
+    embeddings, point_of, _ = point_embeddings(deduplicated)
+    assert np.array_equal(embeddings, rows[[0, 2]])
+    assert point_of.tolist() == [0, 0, 1, 1]
+
+    embeddings, point_of, representatives = point_embeddings(_artifact(1, rows))
+    assert embeddings is rows
+    assert point_of.tolist() == representatives.tolist() == [0, 1, 2, 3]
+
+
+def _loop_vote(reference, reference_labels, queries, k):
+    """Per-query dictionary tally, as nearest_neighbor_vote used to do it."""
+    similarities = normalize_rows(queries) @ normalize_rows(reference).T
+    labels, confidence = [], []
+    for row in similarities:
+        neighbours = np.argsort(-row)[:k]
+        votes = {}
+        for label, weight in zip(reference_labels[neighbours], np.maximum(row[neighbours], 0.0) + 1e-6):
+            votes[label] = votes.get(label, 0.0) + float(weight)
+        winner = max(votes, key=votes.get)
+        labels.append(winner)
+        confidence.append(votes[winner] / sum(votes.values()))
+    return np.array(labels), np.array(confidence)
+
+
+def test_nearest_neighbor_vote_matches_per_query_tally():
+    rng = np.random.default_rng(0)
+    reference = rng.standard_normal((300, 16)).astype(np.float32) * 3
+    reference_labels = rng.choice([-1, 4, 7, 12], size=300)
+    queries = rng.standard_normal((70, 16)).astype(np.float32)
+
+    expected_labels, expected_confidence = _loop_vote(reference, reference_labels, queries, k=9)
+    assignment = nearest_neighbor_vote(reference, reference_labels, queries, n_neighbors=9, chunk_size=32)
+    prenormalized = nearest_neighbor_vote(
+        normalize_rows(reference), reference_labels, queries, n_neighbors=9, chunk_size=32, normalized=True
+    )
+
+    assert np.array_equal(assignment['labels'], expected_labels)
+    assert np.allclose(assignment['confidence'], expected_confidence, atol=1e-5)
+    assert np.array_equal(prenormalized['labels'], assignment['labels'])
+
+
+def test_vote_reference_is_computed_once_per_artifact():
+    points = np.array([[3.0, 4.0], [0.0, 2.0]], dtype=np.float32)
+    artifact = _artifact(
+        2, points, cluster_labels=np.array([5, 5, 8, 8]),
+        representatives=np.array([0, 2]), representative_of=np.array([0, 0, 1, 1])
+    )
+
+    reference, labels = vote_reference(artifact)
+
+    assert np.allclose(reference, [[0.6, 0.8], [0.0, 1.0]])
+    assert labels.tolist() == [5, 8]
+    assert vote_reference(artifact)[0] is reference
+    assert VOTE_REFERENCE_KEY in artifact
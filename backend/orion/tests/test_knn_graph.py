@@ -0,0 +1,24 @@
+import numba
+import numpy as np
+
+from knn_graph import build_knn_graph, nndescent_threads
+
+
+def test_nndescent_threads_limited_to_numba_threads():
+    assert nndescent_threads(None) == -1
+    assert nndescent_threads(numba.config.NUMBA_NUM_THREADS + 1) == -1
+    if numba.config.NUMBA_NUM_THREADS > 1:
+        assert nndescent_threads(1) == 1
+
+
+def test_build_knn_graph_with_more_jobs_than_cores():
+    embeddings = np.random.default_rng(0).normal(size=(300, 16)).astype(np.float32)
+    n_threads = numba.get_num_threads()
+
+    graph = build_knn_graph(
+        embeddings, n_neighbors=10, random_state=0, n_jobs=numba.config.NUMBA_NUM_THREADS + 3
+    )
+
+    assert graph.indices.shape == (300, 10)
+    assert (graph.indices[:, 0] == np.arange(300)).mean() > 0.95
+    assert numba.get_num_threads() == n_threads
@@ -0,0 +1,61 @@
+import os
+import sys
+import threading
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks"))
+
+from offline_embedder import HashingEmbedder
+from orion_daemon import PreprocessingDaemon
+from stopwords import ENGLISH_STOPWORDS
+
+
+class OverlapCheckingEmbedder(HashingEmbedder):
+    """HashingEmbedder that records whether two threads ever encode at once."""
+
+    def __init__(self):
+        super().__init__()
+        self.active = 0
+        self.max_active = 0
+        self._count_lock = threading.Lock()
+
+    def encode(self, sentences, **kwargs):
+        with self._count_lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        time.sleep(0.002)
+        try:
+            return super().encode(sentences, **kwargs)
+        finally:
+            with self._count_lock:
+                self.active -= 1
+
+
+def test_queries_and_jobs_never_encode_concurrently():
+    daemon = PreprocessingDaemon({"embedding_workers": 1})
+    embedder = OverlapCheckingEmbedder()
+    daemon.warm.embedder = embedder
+    daemon.warm.stopwords = set(ENGLISH_STOPWORDS)
+    job = daemon._job_preprocessor({}, lambda stage, details: None)
+    assert job.embedder_lock is daemon.warm.embedder_lock
+
+    texts = [f"energy transition scenario {i} for cities" for i in range(200)]
+
+    def run_job():
+        for _ in range(5):
+            job._encode(texts)
+
+    def run_queries():
+        for i in range(50):
+            assert daemon.warm.embed_query(f"urban mobility {i}").shape == (embedder.dim,)
+
+    threads = [threading.Thread(target=run_job), threading.Thread(target=run_queries)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert embedder.max_active == 1
+    assert np.isfinite(job._encode(texts[:3])).all()
@@ -0,0 +1,43 @@
+import numpy as np
+from sklearn.datasets import make_blobs
+from sklearn.metrics import calinski_harabasz_score, davies_bouldin_score, silhouette_score
+
+from quality_metrics import compute_quality_metrics
+
+
+def _weighted_blobs():
+    points, labels = make_blobs(400, centers=5, n_features=6, cluster_std=2.0, random_state=0)
+    sizes = np.random.default_rng(0).integers(1, 6, len(points))
+    return points, labels, sizes
+
+
+def test_weighted_metrics_equal_metrics_over_expanded_groups():
+    points, labels, sizes = _weighted_blobs()
+    expanded, expanded_labels = np.repeat(points, sizes, axis=0), np.repeat(labels, sizes)
+
+    metrics = compute_quality_metrics(points, labels, exact_silhouette=True, sample_weight=sizes)
+
+    assert np.isclose(metrics["silhouette"], silhouette_score(expanded, expanded_labels, metric="cosine"))
+    assert np.isclose(metrics["davies_bouldin"], davies_bouldin_score(expanded, expanded_labels))
+    assert np.isclose(metrics["calinski_harabasz"], calinski_harabasz_score(expanded, expanded_labels))
+
+
+def test_weighted_silhouette_estimate_covers_expanded_silhouette():
+    points, labels, sizes = _weighted_blobs()
+    exact = silhouette_score(np.repeat(points, sizes, axis=0), np.repeat(labels, sizes), metric="cosine")
+
+    metrics = compute_quality_metrics(points, labels, sample_size=200, random_state=0, sample_weight=sizes)
+
+    assert metrics["silhouette_method"] == "sampled"
+    low, high = metrics["silhouette_ci95"]
+    assert low <= exact <= high
+
+
+def test_unit_weights_match_unweighted_metrics():
+    points, labels, _ = _weighted_blobs()
+    unweighted = compute_quality_metrics(points, labels, sample_size=200, random_state=0)
+    weighted = compute_quality_metrics(points, labels, sample_size=200, random_state=0, sample_weight=np.ones(len(labels)))
+
+    for key in ("silhouette", "davies_bouldin", "calinski_harabasz"):
+        assert np.isclose(unweighted[key], weighted[key])
+    assert np.allclose(unweighted["silhouette_ci95"], weighted["silhouette_ci95"])
@@ -0,0 +1,45 @@
+import numpy as np
+from sklearn.datasets import make_blobs
+from sklearn.neighbors import kneighbors_graph
+
+import resolution_search
+from resolution_search import POINTS_PER_ROUND, ResolutionSearch, worker_memory
+
+
+def _connectivity():
+    points, _ = make_blobs(2000, centers=12, n_features=8, cluster_std=1.0, random_state=0)
+    return kneighbors_graph(points, 15).tocsr()
+
+
+def test_serial_search_stops_at_first_hit_and_matches_parallel():
+    connectivity = _connectivity()
+
+    # The cluster count at the lowest resolution, the first one a round evaluates
+    with ResolutionSearch(connectivity, random_state=42, n_jobs=1, backend="louvain") as search:
+        target = len(np.unique(search.at(0.8)))
+    with ResolutionSearch(connectivity, random_state=42, n_jobs=1, backend="louvain") as serial:
+        serial_labels, serial_resolution, serial_hit = serial.search(target)
+        assert len(serial.partitions) < POINTS_PER_ROUND
+    with ResolutionSearch(connectivity, random_state=42, n_jobs=2, backend="louvain") as parallel:
+        parallel_labels, parallel_resolution, parallel_hit = parallel.search(target)
+
+    assert serial_hit and parallel_hit
+    assert serial_resolution == parallel_resolution
+    assert np.array_equal(serial_labels, parallel_labels)
+
+
+def test_worker_count_is_bounded_by_available_memory(monkeypatch):
+    connectivity = _connectivity()
+    per_worker = worker_memory(connectivity, "networkx")
+    assert per_worker > worker_memory(connectivity, "louvain")
+
+    monkeypatch.setattr(resolution_search, "available_memory", lambda: 2 * per_worker)
+    assert ResolutionSearch(connectivity, n_jobs=8, backend="networkx").n_workers == 1
+    assert ResolutionSearch(connectivity, n_jobs=8, backend="networkx").n_jobs == 8
+
+    monkeypatch.setattr(resolution_search, "available_memory", lambda: 100 * per_worker)
+    assert ResolutionSearch(connectivity, n_jobs=32, backend="networkx").n_workers == POINTS_PER_ROUND
+    assert ResolutionSearch(connectivity, n_jobs=3, backend="networkx").n_workers == 3
+
+    monkeypatch.setattr(resolution_search, "available_memory", lambda: None)
+    assert ResolutionSearch(connectivity, n_jobs=4, backend="networkx").n_workers == 4
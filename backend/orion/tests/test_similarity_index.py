@@ -0,0 +1,32 @@
+import pickle
+
+import numpy as np
+
+import similarity_index
+from knn_graph import build_knn_graph
+from similarity_index import SimilarityIndex, load_similarity_index, save_similarity_index
+
+
+def test_saved_index_stores_embeddings_once_and_answers_like_the_original(tmp_path, monkeypatch):
+    # Small enough to build quickly, large enough for the approximate path
+    monkeypatch.setattr(similarity_index, "EXACT_SEARCH_ROWS", 100)
+    rng = np.random.default_rng(0)
+    embeddings = rng.standard_normal((2000, 16)).astype(np.float32) * rng.uniform(0.5, 3.0, (2000, 1)).astype(np.float32)
+    ids = [f"F{i}" for i in range(len(embeddings))]
+    graph = build_knn_graph(embeddings, n_neighbors=15, random_state=0)
+    index = SimilarityIndex.build(ids, embeddings, np.arange(len(ids)), np.arange(len(ids)) % 5, search_index=graph.search_index)
+
+    path = str(tmp_path / "features.similarity.pkl")
+    save_similarity_index(path, index)
+    with open(path, "rb") as f:
+        state = pickle.load(f)
+    assert state["search_index"] is None
+    assert "_raw_data" not in state["search_state"]
+
+    loaded = load_similarity_index(path)
+    order = loaded.search_index._vertex_order
+    assert np.allclose(loaded.search_index._raw_data, loaded.embeddings[order])
+    for force_id in ids[:20]:
+        expected = index.similar_to(force_id, 10)
+        results = loaded.similar_to(force_id, 10, cluster=[0, 1, 2, 3, 4])
+        assert [r["id"] for r in results] == [r["id"] for r in expected]
@@ -0,0 +1,52 @@
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks"))
+
+from normalization_parity import EDGE_CASES
+from orion_preprocessing import OrionPreprocessor
+from stopwords import ENGLISH_STOPWORDS
+from synthetic_corpus import generate_corpus
+from text_normalization import TextNormalizer, normalize_texts
+
+CASES = EDGE_CASES + [
+    np.nan,
+    float("nan"),
+    None,
+    0,
+    4.5,
+    2030,
+    1e21,
+    "Hello, World! (co-op) e-mail: a.b@c.d #tag $100 50% it's",
+    "Numbers 1 22 333 4444 3.14159 1,000,000 v2 2nd",
+    "the and for with about through THE Through",
+    "a an to of ab xy abc xyz",
+    "Ünïcödé façade Straße Ⅻ ½ ① 𝔘𝔫𝔦 ÀB CD",
+    "tabs\tand em　spaces​zero width",
+]
+
+
+def _preprocessor():
+    preprocessor = OrionPreprocessor()
+    preprocessor.stopwords = set(ENGLISH_STOPWORDS)
+    return preprocessor
+
+
+def test_normalizer_matches_preprocess_text_on_edge_cases():
+    preprocessor = _preprocessor()
+    normalized = TextNormalizer(preprocessor.stopwords).normalize(CASES)
+
+    assert normalized == [preprocessor.preprocess_text(text) for text in CASES]
+    assert normalized[CASES.index("a an to of ab xy abc xyz")] == "abc xyz"
+
+
+def test_normalize_texts_matches_preprocess_text_across_chunks():
+    preprocessor = _preprocessor()
+    forces = generate_corpus(500, seed=0)
+    texts = [" ".join([force.get("title", ""), force.get("text", "")]) for force in forces] + CASES
+
+    normalized = normalize_texts(texts, preprocessor.stopwords, chunk_size=64)
+
+    assert normalized == [preprocessor.preprocess_text(text) for text in texts]
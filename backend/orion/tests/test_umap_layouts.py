@@ -0,0 +1,26 @@
+import numpy as np
+
+from knn_graph import build_knn_graph
+from umap_layouts import fit_layouts
+
+LAYOUTS = {
+    "3d": {"n_components": 3, "n_neighbors": 10, "min_dist": 0.1, "metric": "cosine"},
+    "2d": {"n_components": 2, "n_neighbors": 8, "min_dist": 0.1, "metric": "cosine"}
+}
+
+
+def test_worker_fits_match_serial_fits_and_support_transform():
+    rng = np.random.default_rng(0)
+    embeddings = rng.normal(size=(400, 16)).astype(np.float32)
+    graph = build_knn_graph(embeddings, n_neighbors=10, random_state=0, n_jobs=1)
+
+    serial = fit_layouts(embeddings, LAYOUTS, graph, random_state=0, n_jobs=1)
+    parallel = fit_layouts(embeddings, LAYOUTS, graph, random_state=0, n_jobs=2)
+
+    for name in LAYOUTS:
+        assert np.allclose(serial[name][0], parallel[name][0])
+        model = parallel[name][1]
+        assert model._knn_search_index is graph.search_index
+        assert model._raw_data is embeddings
+        coords = model.transform(embeddings[:5])
+        assert coords.shape == (5, LAYOUTS[name]["n_components"])
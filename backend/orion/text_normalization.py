@@ -0,0 +1,102 @@
+"""
+ORION Text Normalization - Batched preprocessing of force texts
+
+OrionPreprocessor.preprocess_text normalises one text at a time: lowercase,
+drop everything but [a-z0-9] and whitespace, split, and remove stopwords and
+tokens of up to two characters. This module produces identical output for
+whole batches. A chunk of texts is joined into one string, so lowercasing and
+cleaning run once per chunk instead of once per text; only splitting and the
+stopword filter stay per text.
+
+Key Features:
+- Same output as preprocess_text for every input, including NaN/None and
+  numbers, and non-ASCII text (cleaned with the same regex)
+- ASCII chunks (the common case) cleaned with a byte translation table
+- Plain set lookups for stopwords, no per-text regex calls
+"""
+
+import re
+import string
+import logging
+from typing import Any, Iterable, List
+
+import numpy as np
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Constants
+NORMALIZE_CHUNK_SIZE = 1000
+MIN_TOKEN_LENGTH = 3
+
+# Texts are joined on NUL, which the cleaning step would remove anyway
+_SEPARATOR = "\x00"
+_CLEAN = re.compile(r"[^a-z0-9\s\x00]")
+# ASCII bytes _CLEAN removes
+_DELETE_BYTES = bytes(
+    c for c in range(128)
+    if chr(c) not in string.ascii_lowercase + string.digits and not chr(c).isspace() and c != 0
+)
+
+
+def _as_text(text: Any) -> str:
+    """The string preprocess_text works on: '' for empty values and NaN."""
+    if not text or (isinstance(text, float) and np.isnan(text)):
+        return ""
+    return str(text).replace(_SEPARATOR, "")
+
+
+class TextNormalizer:
+    """Batch equivalent of OrionPreprocessor.preprocess_text for one stopword set"""
+
+    def __init__(self, stopwords: Iterable[str]):
+        self.stopwords = set(stopwords)
+
+    def normalize(self, texts: List[Any]) -> List[str]:
+        """
+        Normalise a batch of texts.
+
+        Args:
+            texts: Raw texts (strings, or any value preprocess_text accepts)
+
+        Returns:
+            List[str]: Space-joined kept tokens per text
+        """
+        if not texts:
+            return []
+
+        joined = _SEPARATOR.join(_as_text(text) for text in texts).lower()
+        if joined.isascii():
+            cleaned = joined.encode("ascii").translate(None, _DELETE_BYTES).decode("ascii")
+        else:
+            cleaned = _CLEAN.sub("", joined)
+
+        stopwords = self.stopwords
+        return [
+            " ".join([w for w in text.split() if len(w) >= MIN_TOKEN_LENGTH and w not in stopwords])
+            for text in cleaned.split(_SEPARATOR)
+        ]
+
+
+def normalize_texts(
+    texts: List[Any],
+    stopwords: Iterable[str],
+    chunk_size: int = NORMALIZE_CHUNK_SIZE
+) -> List[str]:
+    """
+    Normalise texts exactly like preprocess_text, a chunk at a time.
+
+    Args:
+        texts: Raw texts
+        stopwords: Stopwords to remove
+        chunk_size: Texts per chunk
+
+    Returns:
+        List[str]: Normalised text per input text
+    """
+    normalizer = TextNormalizer(stopwords)
+    return [
+        text
+        for start in range(0, len(texts), chunk_size)
+        for text in normalizer.normalize(texts[start:start + chunk_size])
+    ]
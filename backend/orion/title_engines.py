@@ -0,0 +1,171 @@
+"""
+ORION Title Engines - Batched cluster-title generation
+
+KeyBERT titles each cluster with its own extract_keywords call, re-embedding
+the cluster document and its candidate words every time. The engines in this
+module title all clusters in one pass.
+
+Key Features:
+- Single CountVectorizer pass builds a cluster x term count matrix for all clusters
+- "batched" engine: embeds the union of candidate terms once and ranks each
+  cluster's candidates by cosine similarity to the cluster's embedding centroid
+- "ctfidf" engine: class-based TF-IDF (BERTopic formulation), no model required
+- Every cluster document is used in full (no 100-doc / 10,000-char truncation)
+"""
+
+import logging
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+try:
+    from .embedding_store import row_chunks
+except ImportError:
+    from embedding_store import row_chunks
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Constants
+TITLE_ENGINES = ("keybert", "batched", "ctfidf")
+DEFAULT_TOP_N = 2
+DEFAULT_MAX_CANDIDATES = 200
+
+
+def _fallback_title(cluster_id: int) -> str:
+    return f"Cluster {cluster_id}"
+
+
+def cluster_term_counts(
+    cluster_labels: np.ndarray,
+    texts: List[str],
+    stop_words: Optional[List[str]] = None
+):
+    """
+    Count every term per cluster in one vectorizer pass.
+
+    Returns:
+        Tuple: (cluster ids, cluster x term count matrix (csr), vocabulary array)
+    """
+    from scipy.sparse import csr_matrix
+    from sklearn.feature_extraction.text import CountVectorizer
+
+    vectorizer = CountVectorizer(ngram_range=(1, 1), stop_words=stop_words or None)
+    try:
+        doc_terms = vectorizer.fit_transform(texts)
+    except ValueError:
+        # Empty vocabulary (all texts blank or stopwords)
+        return np.unique(cluster_labels), csr_matrix((len(np.unique(cluster_labels)), 0)), np.array([])
+
+    clusters, inverse = np.unique(cluster_labels, return_inverse=True)
+    membership = csr_matrix(
+        (np.ones(len(inverse)), (inverse, np.arange(len(inverse)))),
+        shape=(len(clusters), len(inverse))
+    )
+    counts = (membership @ doc_terms).tocsr()
+    return clusters, counts, vectorizer.get_feature_names_out()
+
+
+def _top_terms(scores: np.ndarray, vocabulary: np.ndarray, top_n: int) -> List[str]:
+    """Highest scoring finite terms, best first."""
+    valid = np.where(np.isfinite(scores))[0]
+    if len(valid) == 0:
+        return []
+    order = valid[np.argsort(-scores[valid], kind="stable")][:top_n]
+    return [str(vocabulary[i]) for i in order]
+
+
+def _titles_from_scores(
+    clusters: np.ndarray,
+    scores: np.ndarray,
+    vocabulary: np.ndarray,
+    top_n: int
+) -> Dict[int, str]:
+    titles = {}
+    for row, cluster_id in enumerate(clusters):
+        terms = _top_terms(scores[row], vocabulary, top_n)
+        titles[int(cluster_id)] = " & ".join(terms) if terms else _fallback_title(int(cluster_id))
+    return titles
+
+
+def ctfidf_titles(
+    cluster_labels: np.ndarray,
+    texts: List[str],
+    stop_words: Optional[List[str]] = None,
+    top_n: int = DEFAULT_TOP_N
+) -> Dict[int, str]:
+    """
+    Title clusters by class-based TF-IDF: tf(t, c) * log(1 + A / f(t)), where A is
+    the average number of words per cluster and f(t) the term's corpus frequency.
+    """
+    clusters, counts, vocabulary = cluster_term_counts(cluster_labels, texts, stop_words)
+    if counts.shape[1] == 0:
+        return {int(c): _fallback_title(int(c)) for c in clusters}
+
+    counts = counts.toarray().astype(np.float64)
+    words_per_cluster = counts.sum(axis=1, keepdims=True)
+    tf = counts / np.maximum(words_per_cluster, 1.0)
+    average_words = words_per_cluster.mean()
+    idf = np.log1p(average_words / np.maximum(counts.sum(axis=0), 1.0))
+
+    scores = tf * idf[None, :]
+    scores[counts == 0] = -np.inf
+    return _titles_from_scores(clusters, scores, vocabulary, top_n)
+
+
+def batched_titles(
+    cluster_labels: np.ndarray,
+    texts: List[str],
+    embeddings: np.ndarray,
+    encode: Callable[[List[str]], np.ndarray],
+    stop_words: Optional[List[str]] = None,
+    top_n: int = DEFAULT_TOP_N,
+    max_candidates: int = DEFAULT_MAX_CANDIDATES
+) -> Dict[int, str]:
+    """
+    KeyBERT-style titles for all clusters with a single embedding call.
+
+    Args:
+        cluster_labels: Cluster label per document
+        texts: Preprocessed documents
+        embeddings: Document embeddings (used for cluster centroids)
+        encode: Function embedding a list of strings into a 2D array
+        stop_words: Terms excluded from candidates
+        top_n: Keywords per title
+        max_candidates: Most frequent terms per cluster considered as candidates
+
+    Returns:
+        Dict: cluster id -> title
+    """
+    clusters, counts, vocabulary = cluster_term_counts(cluster_labels, texts, stop_words)
+    if counts.shape[1] == 0:
+        return {int(c): _fallback_title(int(c)) for c in clusters}
+
+    # Candidate mask: each cluster's most frequent terms
+    counts = counts.toarray()
+    candidate_mask = np.zeros(counts.shape, dtype=bool)
+    for row in range(len(clusters)):
+        present = np.nonzero(counts[row])[0]
+        if len(present) > max_candidates:
+            present = present[np.argsort(-counts[row, present], kind="stable")[:max_candidates]]
+        candidate_mask[row, present] = True
+
+    # Embed the union of candidates once
+    union = np.where(candidate_mask.any(axis=0))[0]
+    logger.info(f"Embedding {len(union)} candidate terms for {len(clusters)} clusters...")
+    term_vectors = np.asarray(encode([str(vocabulary[i]) for i in union]), dtype=np.float32)
+    term_vectors /= np.maximum(np.linalg.norm(term_vectors, axis=1, keepdims=True), 1e-12)
+
+    # Cluster centroids in embedding space, accumulated in row chunks
+    _, inverse = np.unique(cluster_labels, return_inverse=True)
+    centroids = np.zeros((len(clusters), embeddings.shape[1]), dtype=np.float32)
+    for rows in row_chunks(len(embeddings)):
+        unit_docs = np.asarray(embeddings[rows], dtype=np.float32)
+        unit_docs = unit_docs / np.maximum(np.linalg.norm(unit_docs, axis=1, keepdims=True), 1e-12)
+        np.add.at(centroids, inverse[rows], unit_docs)
+    centroids /= np.maximum(np.linalg.norm(centroids, axis=1, keepdims=True), 1e-12)
+
+    # Score every cluster against every candidate, then mask non-candidates
+    scores = centroids @ term_vectors.T
+    scores[~candidate_mask[:, union]] = -np.inf
+    return _titles_from_scores(clusters, scores, vocabulary[union], top_n)
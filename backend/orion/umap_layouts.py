@@ -0,0 +1,174 @@
+"""
+ORION UMAP Layouts - Concurrent 2D and 3D UMAP fits on one neighbour graph
+
+The pipeline draws two UMAP layouts of the same embeddings (3D for the globe,
+2D for cluster plots) that differ only in n_neighbors, min_dist and spread.
+Both are derived from the shared k-NN graph, built once at the larger k, and
+each layout is fitted in its own worker process, so the reduction stage takes
+roughly as long as its slowest single fit instead of the sum of both.
+
+Key Features:
+- Each layout receives its own prefix of the shared k-NN graph
+- Workers get only the neighbour arrays and return models without their data;
+  the parent re-attaches the search index and the embeddings, so the fitted
+  models still support transform() and no extra copy of the corpus is pickled
+- Layouts fitted in parallel spawned worker processes; a fit with a fixed
+  random_state is single-threaded in UMAP, so the fits do not compete for cores
+- Memory-mapped embedding matrices are reopened by the workers instead of copied
+- Identical results to fitting the layouts one after the other
+- Wall and CPU time of every fit, measured in the worker that ran it
+"""
+
+import os
+import time
+import logging
+import warnings
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+import numpy as np
+
+try:
+    from .embedding_store import is_mapped_file, open_mapped
+    from .knn_graph import KNNGraph
+    from .resolution_search import default_n_jobs
+except ImportError:
+    from embedding_store import is_mapped_file, open_mapped
+    from knn_graph import KNNGraph
+    from resolution_search import default_n_jobs
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+
+def fit_layout(
+    embeddings: np.ndarray,
+    params: Dict[str, Any],
+    knn_graph: KNNGraph,
+    random_state: Optional[int] = None
+) -> Tuple[np.ndarray, Any]:
+    """
+    Fit one UMAP layout on a prefix of the shared k-NN graph.
+
+    Returns:
+        Tuple: (n_points x n_components) coordinates and the fitted model
+    """
+    return _fit(embeddings, params, knn_graph.umap_knn(params["n_neighbors"]), random_state)
+
+
+def _fit(
+    embeddings: np.ndarray,
+    params: Dict[str, Any],
+    precomputed_knn: Tuple[np.ndarray, np.ndarray, Optional[Any]],
+    random_state: Optional[int]
+) -> Tuple[np.ndarray, Any]:
+    import umap
+
+    umap_model = umap.UMAP(random_state=random_state, precomputed_knn=precomputed_knn, **params)
+    with warnings.catch_warnings():
+        # Without a search index UMAP warns that transform() is unavailable;
+        # fit_layouts() re-attaches the index afterwards
+        warnings.filterwarnings("ignore", message=r"precomputed_knn\[2\]")
+        coords = umap_model.fit_transform(embeddings)
+    return coords, umap_model
+
+
+def _attach_data(umap_model: Any, embeddings: np.ndarray, knn_graph: KNNGraph) -> None:
+    """Give a model fitted in a worker the search index and data transform() needs."""
+    umap_model.precomputed_knn = knn_graph.umap_knn(umap_model.n_neighbors)
+    umap_model.knn_search_index = umap_model._knn_search_index = knn_graph.search_index
+    umap_model._raw_data = embeddings
+
+
+def _fit_in_worker(
+    name: str,
+    embeddings: Any,
+    params: Dict[str, Any],
+    neighbours: Sequence[Any],
+    random_state: Optional[int]
+) -> Tuple[str, np.ndarray, Any, Dict[str, Any]]:
+    """
+    Fit one layout and return it with its timing.
+
+    neighbours is (indices, distances) of the shared graph, or in-process
+    (indices, distances, search_index). Without a search index the model comes
+    back without its training data, to be completed by _attach_data().
+    """
+    if isinstance(embeddings, tuple):
+        embeddings = open_mapped(*embeddings)
+    k = params["n_neighbors"]
+    search_index = neighbours[2] if len(neighbours) > 2 else None
+    started_at = time.time()
+    wall_start = time.perf_counter()
+    cpu_start = time.process_time()
+    coords, umap_model = _fit(
+        embeddings, params, (neighbours[0][:, :k], neighbours[1][:, :k], search_index), random_state
+    )
+    if search_index is None:
+        umap_model._raw_data = None
+    timing = {
+        "started_at": started_at,
+        "wall_s": time.perf_counter() - wall_start,
+        "cpu_s": time.process_time() - cpu_start,
+        "pid": os.getpid()
+    }
+    return name, coords, umap_model, timing
+
+
+def fit_layouts(
+    embeddings: np.ndarray,
+    layouts: Dict[str, Dict[str, Any]],
+    knn_graph: KNNGraph,
+    random_state: Optional[int] = None,
+    n_jobs: Optional[int] = None
+) -> Dict[str, Tuple[np.ndarray, Any, Dict[str, Any]]]:
+    """
+    Fit several UMAP layouts of the same embeddings concurrently.
+
+    Args:
+        embeddings: Embedding matrix (n_points x dim), may be memory-mapped
+        layouts: UMAP parameters per layout name, e.g. {"3d": ..., "2d": ...}
+        knn_graph: Shared k-NN graph with at least max(n_neighbors) columns
+        random_state: UMAP seed (the same for every layout)
+        n_jobs: Worker processes (default: one per layout, capped by the cores)
+
+    Returns:
+        Dict: Per layout name, (coordinates, fitted model, timing) where timing
+        holds started_at, wall_s, cpu_s and pid
+    """
+    largest = max(params["n_neighbors"] for params in layouts.values())
+    if largest > knn_graph.n_neighbors:
+        raise ValueError(f"Graph has {knn_graph.n_neighbors} neighbours, layouts need {largest}")
+
+    n_workers = min(max(1, n_jobs or default_n_jobs()), len(layouts))
+    logger.info(f"Fitting {len(layouts)} UMAP layouts on the shared {knn_graph.n_neighbors}-NN graph "
+                f"({n_workers} workers)...")
+
+    if n_workers <= 1:
+        neighbours = (knn_graph.indices, knn_graph.distances, knn_graph.search_index)
+        results = [
+            _fit_in_worker(name, embeddings, params, neighbours, random_state)
+            for name, params in layouts.items()
+        ]
+    else:
+        # Mapped files are reopened by the workers rather than pickled, and the
+        # search index (which holds its own copy of the data) stays here
+        shipped = embeddings
+        if is_mapped_file(embeddings):
+            shipped = (os.path.abspath(embeddings.filename), embeddings.shape, embeddings.dtype.str)
+        neighbours = (knn_graph.indices, knn_graph.distances)
+        # Spawned, not forked: numba's threading layer is already running after NN-descent
+        with ProcessPoolExecutor(
+            max_workers=n_workers,
+            mp_context=multiprocessing.get_context("spawn")
+        ) as executor:
+            futures = [
+                executor.submit(_fit_in_worker, name, shipped, params, neighbours, random_state)
+                for name, params in layouts.items()
+            ]
+            results = [future.result() for future in futures]
+        for _, _, umap_model, _ in results:
+            _attach_data(umap_model, embeddings, knn_graph)
+
+    return {name: (coords, umap_model, timing) for name, coords, umap_model, timing in results}
@@ -1,6 +1,6 @@
 import type { DrivingForce } from "@shared/schema";
 import type { ClusterResult, ClusteringParams } from "./clustering";
-import { spawn } from "child_process";
+import { spawn, type ChildProcessWithoutNullStreams } from "child_process";
 import { writeFileSync, readFileSync, unlinkSync, existsSync } from "fs";
 import { join } from "path";
 import { nanoid } from "nanoid";
@@ -23,6 +23,8 @@ import { nanoid } from "nanoid";
  * Environment Variables:
  * - STRICT_FEATURES: Enable FixedClusters mode (default: true)
  * - FEATURES_FILE: Path to precomputed features pickle file
+ * - ORION_PREPROCESSING_DAEMON: Route dynamic clustering through a long-lived
+ *   orion_daemon.py process with warm models instead of spawning per run
  */
 
 export interface OrionClusteringResult {
@@ -49,10 +51,100 @@ export interface PrecomputedFeatures {
   umap3d_y?: number[];
   umap3d_z?: number[];
   silhouette_score: number;
+  quality_metrics?: {
+    silhouette: number;
+    silhouette_ci95: [number, number];
+    silhouette_method: string;
+    silhouette_sample_size: number;
+    davies_bouldin: number;
+    calinski_harabasz: number;
+  };
   n_clusters: number;
   resolution_used?: number;
 }
 
+/**
+ * Client for backend/orion/orion_daemon.py (newline-delimited JSON-RPC over stdio).
+ * The Python process is started on first use and kept alive between jobs.
+ */
+class OrionPreprocessingDaemon {
+  private process: ChildProcessWithoutNullStreams | null = null;
+  private buffer = "";
+  private nextId = 1;
+  private pending = new Map<number, { resolve: (value: any) => void; reject: (error: Error) => void }>();
+
+  private start(): ChildProcessWithoutNullStreams {
+    if (this.process) return this.process;
+
+    const daemonScript = join(process.cwd(), "backend/orion/orion_daemon.py");
+    console.log(`Starting ORION preprocessing daemon: python3 ${daemonScript}`);
+
+    const child = spawn("python3", [daemonScript], { stdio: ["pipe", "pipe", "pipe"] });
+
+    child.stdout.on("data", (data) => {
+      this.buffer += data.toString();
+      let newline: number;
+      while ((newline = this.buffer.indexOf("\n")) !== -1) {
+        const line = this.buffer.slice(0, newline).trim();
+        this.buffer = this.buffer.slice(newline + 1);
+        if (line) this.handleMessage(line);
+      }
+    });
+
+    child.stderr.on("data", (data) => {
+      console.error(`[Python Daemon]: ${data.toString().trim()}`);
+    });
+
+    child.on("close", (code) => {
+      console.warn(`ORION preprocessing daemon exited with code ${code}`);
+      this.process = null;
+      this.buffer = "";
+      this.pending.forEach(({ reject }) => reject(new Error(`Preprocessing daemon exited with code ${code}`)));
+      this.pending.clear();
+    });
+
+    this.process = child;
+    return child;
+  }
+
+  private handleMessage(line: string): void {
+    let message: any;
+    try {
+      message = JSON.parse(line);
+    } catch {
+      console.log(`[Python Daemon]: ${line}`);
+      return;
+    }
+
+    if (message.method === "progress") {
+      const { job, stage, ...details } = message.params || {};
+      console.log(`[Python Daemon] job ${job}: ${stage} ${JSON.stringify(details)}`);
+      return;
+    }
+
+    const waiter = this.pending.get(message.id);
+    if (!waiter) return;
+    this.pending.delete(message.id);
+
+    if (message.error) {
+      waiter.reject(new Error(`Preprocessing daemon error ${message.error.code}: ${message.error.message}`));
+    } else {
+      waiter.resolve(message.result);
+    }
+  }
+
+  call<T = any>(method: string, params: Record<string, unknown>): Promise<T> {
+    const child = this.start();
+    const id = this.nextId++;
+    return new Promise<T>((resolve, reject) => {
+      this.pending.set(id, { resolve, reject });
+      child.stdin.write(JSON.stringify({ jsonrpc: "2.0", id, method, params }) + "\n");
+    });
+  }
+}
+
+const preprocessingDaemon = new OrionPreprocessingDaemon();
+
 export class OrionClusteringService {
   private readonly randomSeed = 42;
   private readonly targetClusters = 37;
@@ -65,6 +157,14 @@ export class OrionClusteringService {
     return strictFeatures === 'true' || strictFeatures === '1' || strictFeatures === 'yes';
   }
   
+  /**
+   * Check if dynamic clustering should use the long-lived preprocessing daemon
+   */
+  private isDaemonMode(): boolean {
+    const daemon = process.env.ORION_PREPROCESSING_DAEMON?.toLowerCase();
+    return daemon === 'true' || daemon === '1' || daemon === 'yes';
+  }
+  
   /**
    * Main ORION clustering method - supports both FixedClusters and dynamic computation
    */
@@ -134,8 +234,8 @@ export class OrionClusteringService {
         // Step 4: Calculate overall quality metrics
         const overallQuality = {
           averageSilhouette: features.silhouette_score,
-          daviesBouldinIndex: 0, // Not computed by Louvain but keep for compatibility
-          calinskiHarabaszIndex: 0, // Not computed by Louvain but keep for compatibility
+          daviesBouldinIndex: features.quality_metrics?.davies_bouldin ?? 0,
+          calinskiHarabaszIndex: features.quality_metrics?.calinski_harabasz ?? 0,
           totalInertia: 0 // Not applicable to Louvain but keep for compatibility
         };
         
@@ -251,7 +351,7 @@ export class OrionClusteringService {
    */
   private async runPythonPreprocessing(forces: DrivingForce[]): Promise<PrecomputedFeatures> {
     const sessionId = nanoid();
-    const inputFile = join(process.cwd(), `temp_forces_${sessionId}.json`);
+    const inputFile = join(process.cwd(), `temp_forces_${sessionId}.ndjson`);
     const outputFile = join(process.cwd(), `temp_features_${sessionId}.json`);
     
     try {
@@ -268,47 +368,59 @@ export class OrionClusteringService {
       }));
       
       // Write forces data to temporary JSON file
-      writeFileSync(inputFile, JSON.stringify(forcesData, null, 2));
+      // One force per line: the Python side streams NDJSON instead of parsing one large array
+      writeFileSync(inputFile, forcesData.map(force => JSON.stringify(force)).join("\n") + "\n");
       console.log(`Wrote ${forcesData.length} forces to ${inputFile}`);
       
-      // Call Python preprocessing script
-      const pythonScript = join(process.cwd(), "backend/orion/orion_preprocessing.py");
-      console.log(`Calling Python script: ${pythonScript}`);
-      
-      const pythonArgs = [
-        pythonScript,
-        "--input", inputFile,
-        "--output", outputFile,
-        "--target-clusters", this.targetClusters.toString(),
-        "--random-state", this.randomSeed.toString()
-      ];
-      
-      console.log(`Running: python3 ${pythonArgs.join(" ")}`);
-      
-      const pythonProcess = spawn("python3", pythonArgs, {
-        stdio: ["pipe", "pipe", "pipe"]
-      });
-      
-      let stdout = "";
-      let stderr = "";
-      
-      pythonProcess.stdout.on("data", (data) => {
-        stdout += data.toString();
-        console.log(`[Python]: ${data.toString().trim()}`);
-      });
-      
-      pythonProcess.stderr.on("data", (data) => {
-        stderr += data.toString();
-        console.error(`[Python Error]: ${data.toString().trim()}`);
-      });
-      
-      // Wait for Python process to complete
-      const exitCode = await new Promise<number>((resolve) => {
-        pythonProcess.on("close", resolve);
-      });
-      
-      if (exitCode !== 0) {
-        throw new Error(`Python preprocessing failed with exit code ${exitCode}:\n${stderr}`);
+      if (this.isDaemonMode()) {
+        // Reuse the warm daemon process (models already loaded)
+        const summary = await preprocessingDaemon.call("process_forces", {
+          input: inputFile,
+          output: outputFile,
+          target_clusters: this.targetClusters,
+          random_state: this.randomSeed
+        });
+        console.log(`Preprocessing daemon finished: ${JSON.stringify(summary)}`);
+      } else {
+        // Call Python preprocessing script
+        const pythonScript = join(process.cwd(), "backend/orion/orion_preprocessing.py");
+        console.log(`Calling Python script: ${pythonScript}`);
+        
+        const pythonArgs = [
+          pythonScript,
+          "--input", inputFile,
+          "--output", outputFile,
+          "--target-clusters", this.targetClusters.toString(),
+          "--random-state", this.randomSeed.toString()
+        ];
+        
+        console.log(`Running: python3 ${pythonArgs.join(" ")}`);
+        
+        const pythonProcess = spawn("python3", pythonArgs, {
+          stdio: ["pipe", "pipe", "pipe"]
+        });
+        
+        let stdout = "";
+        let stderr = "";
+        
+        pythonProcess.stdout.on("data", (data) => {
+          stdout += data.toString();
+          console.log(`[Python]: ${data.toString().trim()}`);
+        });
+        
+        pythonProcess.stderr.on("data", (data) => {
+          stderr += data.toString();
+          console.error(`[Python Error]: ${data.toString().trim()}`);
+        });
+        
+        // Wait for Python process to complete
+        const exitCode = await new Promise<number>((resolve) => {
+          pythonProcess.on("close", resolve);
+        });
+        
+        if (exitCode !== 0) {
+          throw new Error(`Python preprocessing failed with exit code ${exitCode}:\n${stderr}`);
+        }
       }
       
       console.log("Python preprocessing completed successfully");